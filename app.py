@@ -5,10 +5,21 @@ import argparse
 import json
 from datetime import datetime
 import os
+import asyncio
+import threading
 
 from reddit_scraper import RedditScraper
 from intent_detector import IntentDetector
 from response_generator import ResponseGenerator
+from cursor_store import SubredditCursorStore
+from checkpoint_store import CycleCheckpointStore
+from database import SessionLocal
+from models import RedditAccount
+from seen_store import SeenItemStore
+from intent_cache import IntentCache
+from model_executor import get_executor
+from pipeline import Pipeline, Stage
+from structured_output import parse_metrics
 import config
 
 # Configure logging
@@ -22,14 +33,59 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Counters every monitoring cycle reports, whichever mode it runs in
+CYCLE_COUNTS = ("posts_scraped", "high_intent_content", "responses_generated", "messages_sent", "comment_fetches")
+
+class JsonArrayWriter:
+    """Write a JSON array to a file one element at a time."""
+    
+    def __init__(self, path):
+        self._file = open(path, "w")
+        self._file.write("[")
+        self._count = 0
+    
+    def write(self, item):
+        self._file.write(",\n" if self._count else "\n")
+        self._file.write(json.dumps(item, indent=2))
+        self._count += 1
+    
+    def close(self):
+        self._file.write("\n]" if self._count else "]")
+        self._file.close()
+
 class RedditBuyerIntentApp:
-    def __init__(self):
-        """Initialize the application components."""
+    def __init__(self, reddit_account_id=None):
+        """
+        Initialize the application components.
+        
+        Args:
+            reddit_account_id (int, optional): RedditAccount to scrape and send messages as, with its own
+                rate limiter (defaults to config.REDDIT_ACCOUNT_ID; app-only credentials if unset)
+        """
+        if reddit_account_id is None:
+            reddit_account_id = config.REDDIT_ACCOUNT_ID
+            
         try:
-            self.scraper = RedditScraper()
+            self.scraper = self._create_scraper(reddit_account_id)
             self.intent_detector = IntentDetector()
             self.response_generator = ResponseGenerator()
             
+            # Remember analyzed posts and comments across cycles so they aren't sent to Gemini again
+            self.seen_store = SeenItemStore() if config.SEEN_STORE_ENABLED else None
+            self.scraper.seen_store = self.seen_store
+            self.intent_detector.seen_store = self.seen_store
+            
+            # Reuse intent analyses for text the model has already seen (crossposts, reposts, quotes)
+            self.intent_cache = IntentCache() if config.INTENT_CACHE_ENABLED else None
+            self.intent_detector.intent_cache = self.intent_cache
+            
+            # Per-item progress of each cycle, so an interrupted cycle can be resumed (created on first use)
+            self.checkpoint_store = None
+            
+            # Start drafting DMs for likely-HIGH items while intent detection is still running
+            if config.SPECULATIVE_RESPONSES_ENABLED:
+                self.intent_detector.speculator = self.response_generator
+            
             # Create data directory if it doesn't exist
             os.makedirs('data', exist_ok=True)
             
@@ -38,8 +94,28 @@ class RedditBuyerIntentApp:
             logger.error(f"Failed to initialize application: {str(e)}")
             raise
     
+    def _create_scraper(self, reddit_account_id):
+        """Create a scraper for a RedditAccount, or with app-only credentials if there is none."""
+        if reddit_account_id is None:
+            return RedditScraper()
+        
+        db = SessionLocal()
+        try:
+            account = db.query(RedditAccount).filter(RedditAccount.id == reddit_account_id).first()
+        finally:
+            db.close()
+            
+        if account is None:
+            logger.warning(f"Reddit account {reddit_account_id} not found; using app-only credentials")
+            return RedditScraper()
+        
+        logger.info(f"Using Reddit account u/{account.username}")
+        return RedditScraper.for_account(account)
+    
     def run_monitoring_cycle(self, subreddits=None, keywords=None, limit=None, min_intent="MEDIUM", 
-                            min_confidence=0.6, send_messages=False):
+                            min_confidence=0.6, send_messages=False, async_scrape=None, incremental=None,
+                            monitoring_session_id=None, combined_listings=None, defer_comments=None,
+                            streaming=None, pipelined=None, resume=False, checkpoint=None):
         """
         Run a full monitoring cycle: scrape, analyze, generate responses, and optionally send DMs.
         
@@ -50,45 +126,155 @@ class RedditBuyerIntentApp:
             min_intent (str): Minimum intent category to consider ("HIGH", "MEDIUM", "LOW")
             min_confidence (float): Minimum confidence score for intent detection
             send_messages (bool): Whether to send DMs to users
+            async_scrape (bool): Use the concurrent scraping engine (defaults to config.ASYNC_SCRAPING_ENABLED)
+            incremental (bool): Only fetch posts newer than the last cycle (defaults to config.INCREMENTAL_SCRAPING_ENABLED)
+            monitoring_session_id (int): MonitoringSession whose subreddit cursors to use
+            combined_listings (bool): Fetch r/a+b+c/new listings for groups of subreddits (defaults to config.COMBINED_LISTINGS_ENABLED)
+            defer_comments (bool): Fetch comments only for posts that pass the intent gate (defaults to config.DEFERRED_COMMENTS_ENABLED)
+            streaming (bool): Stream each post through scrape, analyze and respond as soon as it is fetched
+                instead of finishing each stage for the whole cycle first (defaults to config.STREAMING_PIPELINE_ENABLED).
+                The streaming pipeline scrapes synchronously, so async_scrape is ignored.
+            pipelined (bool): Run scrape, classify, generate and send as concurrent stages connected by bounded
+                queues (defaults to config.PIPELINED_CYCLE_ENABLED). Takes precedence over streaming, and the
+                scrape stage's workers replace async_scrape.
+            resume (bool): Resume the most recent unfinished cycle (of this monitoring session) with its original
+                arguments, instead of starting a new one; starts a new cycle if there is none
+            checkpoint (CycleProgress): Progress of the cycle being resumed (set by resume)
             
         Returns:
             dict: Results of the monitoring cycle
         """
+        if async_scrape is None:
+            async_scrape = config.ASYNC_SCRAPING_ENABLED
+            
+        if incremental is None:
+            incremental = config.INCREMENTAL_SCRAPING_ENABLED
+            
+        if defer_comments is None:
+            defer_comments = config.DEFERRED_COMMENTS_ENABLED
+            
+        if streaming is None:
+            streaming = config.STREAMING_PIPELINE_ENABLED
+            
+        if pipelined is None:
+            pipelined = config.PIPELINED_CYCLE_ENABLED
+            
+        if resume and checkpoint is None:
+            checkpoint = self.get_checkpoint_store().resume_latest(monitoring_session_id)
+            if checkpoint is not None:
+                logger.info(f"Resuming monitoring cycle {checkpoint.checkpoint_id} from its checkpoint")
+                return self.run_monitoring_cycle(**checkpoint.parameters, monitoring_session_id=monitoring_session_id,
+                                                 checkpoint=checkpoint)
+            logger.info("No unfinished monitoring cycle to resume; starting a new one")
+            
+        if checkpoint is None and (resume or config.CYCLE_CHECKPOINTS_ENABLED):
+            parameters = {
+                "subreddits": subreddits,
+                "keywords": keywords,
+                "limit": limit,
+                "min_intent": min_intent,
+                "min_confidence": min_confidence,
+                "send_messages": send_messages,
+                "async_scrape": async_scrape,
+                "incremental": incremental,
+                "combined_listings": combined_listings,
+                "defer_comments": defer_comments,
+                "streaming": streaming,
+                "pipelined": pipelined
+            }
+            checkpoint = self.get_checkpoint_store().start(parameters, monitoring_session_id)
+            
         start_time = datetime.now()
+        parse_baseline = parse_metrics.snapshot()  # Parse metrics are process-wide; report this cycle's share
+        counts = dict.fromkeys(CYCLE_COUNTS, 0)
         logger.info(f"Starting monitoring cycle at {start_time}")
         
         try:
             # 1. Scrape Reddit for potentially relevant posts
-            scraped_data = self.scraper.scrape_multiple_subreddits(subreddit_list=subreddits, 
-                                                                keywords=keywords, 
-                                                                limit=limit)
+            cursor_store = SubredditCursorStore(monitoring_session_id) if incremental else None
+            if pipelined:
+                return self._run_pipelined_cycle(start_time, subreddits, keywords, limit, min_intent, min_confidence,
+                                                 send_messages, cursor_store, combined_listings, defer_comments,
+                                                 checkpoint, parse_baseline, counts)
+            if streaming:
+                return self._run_streaming_cycle(start_time, subreddits, keywords, limit, min_intent, min_confidence,
+                                                 send_messages, cursor_store, combined_listings, defer_comments,
+                                                 checkpoint, parse_baseline, counts)
+            if checkpoint and cursor_store:
+                # Cursors only move once the scraped posts are checkpointed, so a crash can't skip them
+                cursor_store.hold()
+            if checkpoint and checkpoint.failed:
+                # A failed cycle is retried on its checkpointed posts only
+                scraped_data = []
+            elif async_scrape:
+                scraped_data = asyncio.run(self.scraper.scrape_multiple_subreddits_async(subreddit_list=subreddits,
+                                                                                         keywords=keywords,
+                                                                                         limit=limit,
+                                                                                         cursor_store=cursor_store,
+                                                                                         combined=combined_listings,
+                                                                                         fetch_comments=not defer_comments))
+            else:
+                scraped_data = self.scraper.scrape_multiple_subreddits(subreddit_list=subreddits, 
+                                                                    keywords=keywords, 
+                                                                    limit=limit,
+                                                                    cursor_store=cursor_store,
+                                                                    combined=combined_listings,
+                                                                    fetch_comments=not defer_comments)
             logger.info(f"Scraped {len(scraped_data)} posts from {len(subreddits) if subreddits else len(config.MONITORED_SUBREDDITS)} subreddits")
             
+            if checkpoint:
+                # Incremental scraping won't return the posts of an interrupted cycle again, so keep them
+                scraped_data = list(checkpoint.iter_merge_posts(scraped_data))
+                checkpoint.save_posts([post for post in scraped_data if not checkpoint.has_post(post)], "scraped")
+                if cursor_store:
+                    cursor_store.release()
+            counts["posts_scraped"] = len(scraped_data)
+            
             if not scraped_data:
                 logger.info("No relevant posts found. Ending cycle.")
-                return {
-                    "start_time": start_time.isoformat(),
-                    "end_time": datetime.now().isoformat(),
-                    "posts_scraped": 0,
-                    "high_intent_content": 0,
-                    "responses_generated": 0,
-                    "messages_sent": 0
-                }
+                results = self._cycle_results(start_time, counts, parse_baseline, checkpoint)
+                if checkpoint:
+                    checkpoint.complete(results)
+                return results
             
             # 2. Analyze posts and comments for buyer intent
-            analyzed_data = self.intent_detector.analyze_reddit_content(scraped_data)
+            if checkpoint:
+                # Checkpointed posts keep their analysis; the rest are analyzed and checkpointed a chunk at a time
+                pending = [post for post in scraped_data if not checkpoint.is_analyzed(post)]
+                chunk_size = max(1, config.CYCLE_CHECKPOINT_CHUNK_SIZE)
+                for start in range(0, len(pending), chunk_size):
+                    chunk = pending[start:start + chunk_size]
+                    counts["comment_fetches"] += self._analyze_posts(chunk, defer_comments, async_scrape, min_intent,
+                                                                     keywords)
+                    checkpoint.save_posts(chunk, "analyzed")
+                if len(pending) < len(scraped_data):
+                    logger.info(f"Reused checkpointed analyses for {len(scraped_data) - len(pending)} posts")
+            else:
+                counts["comment_fetches"] = self._analyze_posts(scraped_data, defer_comments, async_scrape, min_intent,
+                                                                keywords)
+            analyzed_data = scraped_data
             
             # 3. Filter for high-intent content
             high_intent_content = self.intent_detector.filter_high_intent_content(
                 analyzed_data, min_intent=min_intent, min_confidence=min_confidence
             )
             
+            counts["high_intent_content"] = len(high_intent_content)
             logger.info(f"Found {len(high_intent_content)} posts/comments with {min_intent}+ buyer intent")
             
-            # 4. Generate responses for high-intent content
-            responses = self.response_generator.batch_generate_responses(high_intent_content, min_intent=min_intent)
+            # 4. Generate responses for high-intent content, reusing any checkpointed by an interrupted run
+            responses = []
+            for response in self.response_generator.iter_generate_responses(
+                    high_intent_content, min_intent=min_intent,
+                    completed=checkpoint.response_for if checkpoint else None):
+                if not response.get("error"):
+                    counts["responses_generated"] += 1
+                    if checkpoint:
+                        checkpoint.save_response(response, "responded")
+                responses.append(response)
+            self.response_generator.discard_speculative()
             
-            logger.info(f"Generated {len(responses)} personalized responses")
+            logger.info(f"Generated {counts['responses_generated']} personalized responses")
             
             # 5. Save the data - skip in App Engine environment
             if not os.environ.get('GAE_ENV', '').startswith('standard'):
@@ -103,47 +289,424 @@ class RedditBuyerIntentApp:
                     json.dump(responses, f, indent=2)
             
             # 6. Optionally send DMs to users
-            messages_sent = 0
+            sent = set()
             if send_messages and responses:
                 for response in responses:
+                    if response.get("error"):
+                        continue
+                    
+                    # Never send a DM twice when resuming
+                    if checkpoint and checkpoint.was_sent(response):
+                        counts["messages_sent"] += 1
+                        sent.add(response.get("fullname"))
+                        continue
+                    
                     author = response.get("author")
                     subject = response.get("subject")
                     message = response.get("message")
                     
                     if self.scraper.send_direct_message(author, subject, message):
-                        messages_sent += 1
+                        counts["messages_sent"] += 1
+                        sent.add(response.get("fullname"))
+                        if checkpoint:
+                            checkpoint.save_response(response, "sent")
                 
-                logger.info(f"Sent {messages_sent} direct messages to Reddit users")
-            
-            # 7. Return results
-            end_time = datetime.now()
-            results = {
-                "start_time": start_time.isoformat(),
-                "end_time": end_time.isoformat(),
-                "duration_seconds": (end_time - start_time).total_seconds(),
-                "posts_scraped": len(scraped_data),
-                "high_intent_content": len(high_intent_content),
-                "responses_generated": len(responses),
-                "messages_sent": messages_sent
-            }
+                logger.info(f"Sent {counts['messages_sent']} direct messages to Reddit users")
+            
+            # 7. Record the analyzed items as seen, now that their responses are done
+            if self.seen_store:
+                self._record_seen([item for post in analyzed_data for item in self.intent_detector.seen_items(post)],
+                                  sent)
+            
+            # 8. Return results
+            results = self._cycle_results(start_time, counts, parse_baseline, checkpoint)
+            if checkpoint:
+                checkpoint.complete(results)
             
             logger.info(f"Monitoring cycle completed in {results['duration_seconds']:.2f} seconds")
             return results
             
         except Exception as e:
             logger.error(f"Error during monitoring cycle: {str(e)}")
-            return {
-                "start_time": start_time.isoformat(),
-                "end_time": datetime.now().isoformat(),
-                "error": str(e)
-            }
+            # Counters hold the progress made before the error
+            results = self._cycle_results(start_time, counts, parse_baseline, checkpoint, error=str(e))
+            if checkpoint:
+                checkpoint.fail(results)
+            return results
+        finally:
+            # Drafts still pending when a cycle fails part way would otherwise never be collected
+            self.response_generator.discard_speculative()
+    
+    def _run_streaming_cycle(self, start_time, subreddits, keywords, limit, min_intent, min_confidence,
+                             send_messages, cursor_store, combined_listings, defer_comments, checkpoint=None,
+                             parse_baseline=None, counts=None):
+        """
+        Run a monitoring cycle as a chain of generators.
+        
+        Each post flows through scraping, intent analysis, filtering and
+        response generation (and is written to the data files) as soon as it
+        is fetched, so the first lead is ready without waiting for the whole
+        cycle and memory stays bounded by a single post.
+        
+        Returns:
+            dict: Results of the monitoring cycle, with the same keys as run_monitoring_cycle
+        """
+        if counts is None:
+            counts = dict.fromkeys(CYCLE_COUNTS, 0)
+        seen, sent = [], set()  # Recorded in the seen store once the cycle's responses are done
+        
+        def count(items, key):
+            for item in items:
+                counts[key] += 1
+                yield item
+        
+        def analyze(posts):
+            for post in posts:
+                # Posts checkpointed as analyzed by an interrupted run keep their analysis
+                if not (checkpoint and checkpoint.is_analyzed(post)):
+                    if defer_comments:
+                        # Deferred comment stage: fetch and analyze comments only for posts that pass the intent gate
+                        self.intent_detector.analyze_post(post, include_comments=False, min_intent=min_intent, keywords=keywords)
+                        if self._passes_comment_gate(post):
+                            self.scraper.fetch_comments([post])
+                            self.intent_detector.analyze_post(post, include_posts=False, min_intent=min_intent, keywords=keywords)
+                            counts["comment_fetches"] += 1
+                    else:
+                        self.intent_detector.analyze_post(post, min_intent=min_intent, keywords=keywords)
+                    if checkpoint:
+                        checkpoint.save_posts([post], "analyzed")
+                if self.seen_store:
+                    seen.extend(self.intent_detector.seen_items(post))
+                yield post
+        
+        def save(items, writer):
+            for item in items:
+                if writer:
+                    writer.write(item)
+                yield item
+        
+        # Save the data as it streams - skip in App Engine environment
+        analyzed_writer = responses_writer = None
+        if not os.environ.get('GAE_ENV', '').startswith('standard'):
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            analyzed_writer = JsonArrayWriter(f"data/analyzed_data_{timestamp}.json")
+            responses_writer = JsonArrayWriter(f"data/responses_{timestamp}.json")
+        
+        try:
+            if checkpoint and checkpoint.failed:
+                # A failed cycle is retried on its checkpointed posts only
+                posts = []
+            else:
+                posts = self.scraper.iter_scrape_subreddits(subreddit_list=subreddits,
+                                                            keywords=keywords,
+                                                            limit=limit,
+                                                            cursor_store=cursor_store,
+                                                            combined=combined_listings,
+                                                            fetch_comments=not defer_comments)
+            if checkpoint:
+                # Posts of an interrupted run first, since incremental scraping won't return them again
+                posts = checkpoint.iter_merge_posts(posts)
+            posts = count(posts, "posts_scraped")
+                
+            high_intent = count(self.intent_detector.iter_high_intent_content(save(analyze(posts), analyzed_writer),
+                                                                              min_intent=min_intent,
+                                                                              min_confidence=min_confidence),
+                                "high_intent_content")
+            
+            responses = self.response_generator.iter_generate_responses(
+                high_intent, min_intent=min_intent, completed=checkpoint.response_for if checkpoint else None)
+            for response in save(responses, responses_writer):
+                if not response.get("error"):
+                    counts["responses_generated"] += 1
+                    if checkpoint:
+                        checkpoint.save_response(response, "responded")
+                
+                # Optionally send the DM right away, but never twice when resuming
+                if not send_messages or response.get("error"):
+                    continue
+                if checkpoint and checkpoint.was_sent(response):
+                    counts["messages_sent"] += 1
+                    sent.add(response.get("fullname"))
+                elif self.scraper.send_direct_message(response.get("author"),
+                                                      response.get("subject"),
+                                                      response.get("message")):
+                    counts["messages_sent"] += 1
+                    sent.add(response.get("fullname"))
+                    if checkpoint:
+                        checkpoint.save_response(response, "sent")
+        finally:
+            self.response_generator.discard_speculative()
+            for writer in (analyzed_writer, responses_writer):
+                if writer:
+                    writer.close()
+        
+        self._record_seen(seen, sent)
+        
+        if not defer_comments:
+            counts["comment_fetches"] = counts["posts_scraped"]
+        results = self._cycle_results(start_time, counts, parse_baseline, checkpoint)
+        if checkpoint:
+            checkpoint.complete(results)
+        
+        logger.info(f"Streaming monitoring cycle completed in {results['duration_seconds']:.2f} seconds")
+        return results
+    
+    def _run_pipelined_cycle(self, start_time, subreddits, keywords, limit, min_intent, min_confidence,
+                             send_messages, cursor_store, combined_listings, defer_comments, checkpoint=None,
+                             parse_baseline=None, counts=None):
+        """
+        Run a monitoring cycle as a pipeline of concurrent stages.
+        
+        Scrape, classify, generate and send each run on their own worker
+        threads (config.PIPELINE_*_WORKERS), connected by bounded queues, so
+        Reddit requests for later subreddits overlap with model calls for
+        earlier posts, and a slow stage holds back the stages feeding it
+        instead of letting work pile up. Per-stage throughput, queue depth,
+        idle and blocked time are returned under "pipeline".
+        
+        Returns:
+            dict: Results of the monitoring cycle, with the same keys as run_monitoring_cycle
+        """
+        if subreddits is None:
+            subreddits = config.MONITORED_SUBREDDITS
+        if combined_listings is None:
+            combined_listings = config.COMBINED_LISTINGS_ENABLED
+        
+        if counts is None:
+            counts = dict.fromkeys(CYCLE_COUNTS, 0)
+        seen, sent = [], set()  # Recorded in the seen store once the cycle's responses are done
+        counts_lock = threading.Lock()
+        
+        def add(key, value=1):
+            with counts_lock:
+                counts[key] += value
+        
+        # Save the data as it flows - skip in App Engine environment
+        analyzed_writer = responses_writer = None
+        if not os.environ.get('GAE_ENV', '').startswith('standard'):
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            analyzed_writer = JsonArrayWriter(f"data/analyzed_data_{timestamp}.json")
+            responses_writer = JsonArrayWriter(f"data/responses_{timestamp}.json")
+        writer_lock = threading.Lock()
+        
+        def write(writer, item):
+            if writer:
+                with writer_lock:
+                    writer.write(item)
+        
+        def scrape(group):
+            if isinstance(group, dict):
+                # A post checkpointed by the interrupted run being resumed
+                add("posts_scraped")
+                yield group
+                return
+            
+            # One listing request per subreddit (or per group with combined listings) and its posts' comments
+            for post in self.scraper.iter_scrape_subreddits(subreddit_list=group,
+                                                            keywords=keywords,
+                                                            limit=limit,
+                                                            cursor_store=cursor_store,
+                                                            combined=combined_listings,
+                                                            fetch_comments=not defer_comments):
+                if checkpoint:
+                    if checkpoint.has_post(post):
+                        continue
+                    # The subreddit's cursor may move past the post before it is analyzed
+                    checkpoint.save_posts([post], "scraped")
+                add("posts_scraped")
+                yield post
+        
+        def classify(post):
+            if not (checkpoint and checkpoint.is_analyzed(post)):
+                if defer_comments:
+                    self.intent_detector.analyze_post(post, include_comments=False, min_intent=min_intent, keywords=keywords)
+                    if self._passes_comment_gate(post):
+                        self.scraper.fetch_comments([post])
+                        self.intent_detector.analyze_post(post, include_posts=False, min_intent=min_intent, keywords=keywords)
+                        add("comment_fetches")
+                else:
+                    self.intent_detector.analyze_post(post, min_intent=min_intent, keywords=keywords)
+                if checkpoint:
+                    checkpoint.save_posts([post], "analyzed")
+            write(analyzed_writer, post)
+            if self.seen_store:
+                seen_items = self.intent_detector.seen_items(post)
+                with counts_lock:
+                    seen.extend(seen_items)
+            
+            high_intent = list(self.intent_detector.iter_high_intent_content([post], min_intent=min_intent,
+                                                                             min_confidence=min_confidence))
+            add("high_intent_content", len(high_intent))
+            return self.response_generator.response_targets(high_intent, min_intent)
+        
+        def generate(content_data):
+            response = checkpoint.response_for(content_data) if checkpoint else None
+            if response is None:
+                response = self.response_generator.generate_response_or_error(content_data)
+                if checkpoint and not response.get("error"):
+                    checkpoint.save_response(response, "responded")
+            if not response.get("error"):
+                add("responses_generated")
+            return [response]
+        
+        def send(response):
+            write(responses_writer, response)
+            if not send_messages or response.get("error"):
+                return
+            # Never send a DM twice when resuming
+            if checkpoint and checkpoint.was_sent(response):
+                add("messages_sent")
+            elif self.scraper.send_direct_message(response.get("author"),
+                                                  response.get("subject"),
+                                                  response.get("message")):
+                add("messages_sent")
+                if checkpoint:
+                    checkpoint.save_response(response, "sent")
+            else:
+                return
+            with counts_lock:
+                sent.add(response.get("fullname"))
+        
+        if combined_listings:
+            group_size = max(1, config.COMBINED_LISTING_GROUP_SIZE)
+            groups = [subreddits[i:i + group_size] for i in range(0, len(subreddits), group_size)]
+        else:
+            groups = [[subreddit] for subreddit in subreddits]
+        if checkpoint:
+            # Posts of an interrupted run go straight to classify, since incremental scraping won't return them;
+            # a failed cycle is retried on its checkpointed posts only
+            groups = checkpoint.stored_posts() + ([] if checkpoint.failed else groups)
+        
+        pipeline = Pipeline([
+            Stage("scrape", scrape, workers=config.PIPELINE_SCRAPE_WORKERS),
+            Stage("classify", classify, workers=config.PIPELINE_CLASSIFY_WORKERS),
+            Stage("generate", generate, workers=config.PIPELINE_GENERATE_WORKERS),
+            Stage("send", send, workers=config.PIPELINE_SEND_WORKERS)
+        ])
+        try:
+            pipeline_stats = pipeline.run(groups)
+        finally:
+            self.response_generator.discard_speculative()
+            for writer in (analyzed_writer, responses_writer):
+                if writer:
+                    writer.close()
+        
+        self._record_seen(seen, sent)
+        
+        if not defer_comments:
+            counts["comment_fetches"] = counts["posts_scraped"]
+        results = self._cycle_results(start_time, counts, parse_baseline, checkpoint, pipeline=pipeline_stats)
+        if checkpoint:
+            checkpoint.complete(results)
+        
+        logger.info(f"Pipelined monitoring cycle completed in {results['duration_seconds']:.2f} seconds")
+        return results
+    
+    def _analyze_posts(self, posts, defer_comments, async_scrape, min_intent=None, keywords=None):
+        """
+        Analyze posts and their comments for buyer intent, in place.
+        
+        Returns:
+            int: Number of posts whose comments were fetched
+        """
+        if not defer_comments:
+            self.intent_detector.analyze_reddit_content(posts, min_intent=min_intent, keywords=keywords)
+            return len(posts)
+        
+        self.intent_detector.analyze_reddit_content(posts, include_comments=False, min_intent=min_intent, keywords=keywords)
+        
+        # Only posts that pass the intent gate get their comment trees fetched and analyzed
+        gated_posts = [post for post in posts if self._passes_comment_gate(post)]
+        if async_scrape:
+            asyncio.run(self.scraper.fetch_comments_async(gated_posts))
+        else:
+            self.scraper.fetch_comments(gated_posts)
+        self.intent_detector.analyze_reddit_content(gated_posts, include_posts=False, min_intent=min_intent, keywords=keywords)
+        
+        logger.info(f"Fetched comments for {len(gated_posts)} of {len(posts)} posts that passed the intent gate")
+        return len(gated_posts)
+    
+    def _cycle_results(self, start_time, counts, parse_baseline=None, checkpoint=None, pipeline=None, error=None):
+        """
+        Build the results of a monitoring cycle from its counters and the components' stats.
+        
+        Every cycle mode, and a cycle that ends early or fails, returns the same keys.
+        
+        Args:
+            start_time (datetime): When the cycle started
+            counts (dict): The cycle's CYCLE_COUNTS counters
+            parse_baseline (dict, optional): Parse metrics snapshot taken when the cycle started
+            checkpoint (CycleProgress, optional): Checkpointed progress of the cycle
+            pipeline (dict, optional): Per-stage stats of a pipelined cycle
+            error (str, optional): Why the cycle failed
+            
+        Returns:
+            dict: Results of the monitoring cycle
+        """
+        end_time = datetime.now()
+        return {
+            "start_time": start_time.isoformat(),
+            "end_time": end_time.isoformat(),
+            "duration_seconds": (end_time - start_time).total_seconds(),
+            **{key: counts[key] for key in CYCLE_COUNTS},
+            "reddit_rate_limit": self.scraper.get_rate_limit_stats(),
+            "intent_cache": self.intent_cache.stats() if self.intent_cache else None,
+            "model_executor": get_executor().stats(),
+            "near_duplicates": (self.intent_detector.near_duplicates.stats()
+                                if self.intent_detector.near_duplicates else None),
+            "structured_output": parse_metrics.stats(since=parse_baseline),
+            "model_cascade": self.intent_detector.cascade.stats() if self.intent_detector.cascade else None,
+            "speculative_responses": self.response_generator.speculation_stats(),
+            "pipeline": pipeline,
+            "checkpoint": checkpoint.stats() if checkpoint else None,
+            "error": error
+        }
+    
+    def _record_seen(self, seen_items, sent):
+        """
+        Record a cycle's analyzed items in the seen store.
+        
+        Called once the cycle's responses are done, so items of a cycle that
+        fails part way are analyzed again instead of being skipped as seen.
+        
+        Args:
+            seen_items (list): (fullname, content hash, intent category) tuples from IntentDetector.seen_items
+            sent (set): Fullnames of the items whose DM was sent
+        """
+        if self.seen_store:
+            self.seen_store.mark_many([(fullname, item_hash, category, fullname in sent)
+                                       for fullname, item_hash, category in seen_items])
+    
+    def get_checkpoint_store(self):
+        """Get the cycle checkpoint store, creating its tables on first use."""
+        if self.checkpoint_store is None:
+            self.checkpoint_store = CycleCheckpointStore()
+        return self.checkpoint_store
+    
+    def _passes_comment_gate(self, post):
+        """Check if a post's intent is high enough to be worth fetching its comments."""
+        intent_levels = {
+            "HIGH": 3,
+            "MEDIUM": 2,
+            "LOW": 1,
+            "NONE": 0
+        }
+        
+        analysis = post.get('intent_analysis', {})
+        if analysis.get('already_analyzed'):
+            # A post skipped as seen is gated on the intent it was analyzed as before
+            intent_category = analysis.get('previous_intent_category') or 'NONE'
+        else:
+            intent_category = analysis.get('intent_category', 'NONE')
+        return intent_levels.get(intent_category, 0) >= intent_levels[config.DEFERRED_COMMENTS_MIN_INTENT]
     
-    def schedule_monitoring(self, interval_minutes=None):
+    def schedule_monitoring(self, interval_minutes=None, resume=False):
         """
         Schedule regular monitoring based on the configured interval.
         
         Args:
             interval_minutes (int): Minutes between monitoring cycles
+            resume (bool): Let the first cycle resume the most recent unfinished one
         """
         if interval_minutes is None:
             interval_minutes = config.MONITORING_INTERVAL_MINUTES
@@ -152,7 +715,9 @@ class RedditBuyerIntentApp:
         
         # Create job function that uses default parameters
         def job():
-            self.run_monitoring_cycle()
+            nonlocal resume
+            self.run_monitoring_cycle(resume=resume)
+            resume = False
         
         # Schedule the job
         schedule.every(interval_minutes).minutes.do(job)
@@ -181,11 +746,31 @@ def main():
                         help="Minimum confidence score (0.0-1.0)")
     parser.add_argument("--subreddits", nargs="+", help="Specific subreddits to monitor")
     parser.add_argument("--limit", type=int, help="Limit posts per subreddit")
+    parser.add_argument("--async-scrape", action="store_true", default=None,
+                        help="Scrape subreddits concurrently")
+    parser.add_argument("--incremental", action="store_true", default=None,
+                        help="Only fetch posts newer than each subreddit's stored high-water mark")
+    parser.add_argument("--full-scan", action="store_true",
+                        help="Ignore stored high-water marks and fetch posts from scratch")
+    parser.add_argument("--combined-listings", action="store_true", default=None,
+                        help="Fetch new posts for groups of subreddits in combined requests")
+    parser.add_argument("--stream", action="store_true", default=None,
+                        help="Stream each post through all stages as soon as it is fetched")
+    parser.add_argument("--pipelined", action="store_true", default=None,
+                        help="Run scrape, classify, generate and send as concurrent stages")
+    parser.add_argument("--reddit-account-id", type=int,
+                        help="RedditAccount to scrape and send messages as (defaults to REDDIT_ACCOUNT_ID)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume the most recent unfinished cycle from its checkpoint")
+    parser.add_argument("--defer-comments", action="store_true", default=None,
+                        help="Fetch comments only for posts that pass the intent gate")
+    parser.add_argument("--eager-comments", action="store_true",
+                        help="Fetch comments for every matching post instead of only those passing the intent gate")
     
     args = parser.parse_args()
     
     try:
-        app = RedditBuyerIntentApp()
+        app = RedditBuyerIntentApp(reddit_account_id=args.reddit_account_id)
         
         if args.run_once:
             app.run_monitoring_cycle(
@@ -193,10 +778,17 @@ def main():
                 limit=args.limit,
                 min_intent=args.min_intent,
                 min_confidence=args.min_confidence,
-                send_messages=args.send_messages
+                send_messages=args.send_messages,
+                async_scrape=args.async_scrape,
+                incremental=False if args.full_scan else args.incremental,
+                combined_listings=args.combined_listings,
+                defer_comments=False if args.eager_comments else args.defer_comments,
+                streaming=args.stream,
+                pipelined=args.pipelined,
+                resume=args.resume
             )
         elif args.monitor:
-            app.schedule_monitoring(interval_minutes=args.interval)
+            app.schedule_monitoring(interval_minutes=args.interval, resume=args.resume)
         else:
             parser.print_help()
     except Exception as e:
@@ -0,0 +1,376 @@
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import CycleCheckpoint, CycleCheckpointItem
+from database import engine, SessionLocal
+from seen_store import comment_fullname, post_fullname
+import config
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Stages an item goes through, in order; an item's checkpoint never moves backwards
+STAGES = ("scraped", "analyzed", "responded", "sent")
+
+# Cycle statuses that can still be resumed
+UNFINISHED_STATUSES = ("running", "failed")
+
+def content_fullname(content_data):
+    """Reddit fullname of a scraped post or comment (posts are the ones with a comments list)."""
+    return post_fullname(content_data) if 'comments' in content_data else comment_fullname(content_data)
+
+class CycleProgress:
+    """
+    Checkpointed progress of one monitoring cycle.
+
+    Posts are checkpointed once scraped and again once analyzed, responses
+    once generated and again once their DM is sent. A resumed cycle loads
+    these, so analyzed posts aren't sent to the model again, existing
+    responses are reused and DMs are never sent twice. A resumed cycle that
+    had failed (rather than being interrupted) only finishes its checkpointed
+    posts and doesn't scrape again, so retrying it doesn't keep adding posts.
+    """
+
+    def __init__(self, store, checkpoint_id, parameters, items=(), failed=False):
+        """
+        Initialize the progress of a cycle.
+
+        Args:
+            store (CycleCheckpointStore): Store to write checkpoints to
+            checkpoint_id (int): CycleCheckpoint row id
+            parameters (dict): The cycle's run_monitoring_cycle arguments
+            items (iterable): (item key, stage, data) of checkpointed items, when resuming
+            failed (bool): The cycle being resumed ended with an error
+        """
+        self.store = store
+        self.checkpoint_id = checkpoint_id
+        self.parameters = parameters
+        self.failed = failed
+        self._lock = threading.Lock()
+        self._posts = OrderedDict()  # fullname -> (stage, post)
+        self._responses = {}  # fullname -> (stage, response)
+
+        for item_key, stage, data in items:
+            kind, fullname = item_key.split(":", 1)
+            (self._posts if kind == "post" else self._responses)[fullname] = (stage, data)
+        self.resumed = bool(self._posts or self._responses)
+
+    def _advance(self, entries, kind, stage):
+        """Record a stage for (fullname, data) pairs, skipping items already further along."""
+        table = self._posts if kind == "post" else self._responses
+        changed = []
+        with self._lock:
+            for fullname, data in entries:
+                current = table.get(fullname)
+                if current is not None and STAGES.index(current[0]) > STAGES.index(stage):
+                    continue
+                table[fullname] = (stage, data)
+                changed.append((f"{kind}:{fullname}", stage, data))
+        self.store.save_items(self.checkpoint_id, changed)
+
+    # ---- Posts -------------------------------------------------------
+
+    def iter_merge_posts(self, posts):
+        """
+        Combine checkpointed posts with freshly scraped ones.
+
+        Checkpointed posts come first, since incremental scraping won't return
+        them again, followed by scraped posts the checkpoint doesn't have.
+
+        Args:
+            posts (iterable): Freshly scraped posts
+
+        Yields:
+            dict: Each post once
+        """
+        yield from self.stored_posts()
+        for post in posts:
+            if not self.has_post(post):
+                yield post
+
+    def stored_posts(self):
+        """Get the checkpointed posts, in the order they were first checkpointed."""
+        with self._lock:
+            return [post for _, post in self._posts.values()]
+
+    def has_post(self, post):
+        """Check whether a post was checkpointed at any stage."""
+        with self._lock:
+            return post_fullname(post) in self._posts
+
+    def is_analyzed(self, post):
+        """Check whether a post (and its comments) was analyzed before the checkpoint."""
+        with self._lock:
+            entry = self._posts.get(post_fullname(post))
+        return entry is not None and entry[0] != "scraped"
+
+    def save_posts(self, posts, stage):
+        """
+        Checkpoint posts at a stage.
+
+        Args:
+            posts (list): Post dictionaries
+            stage (str): "scraped" or "analyzed"
+        """
+        self._advance([(post_fullname(post), post) for post in posts], "post", stage)
+
+    # ---- Responses ---------------------------------------------------
+
+    def response_for(self, content_data):
+        """Get the checkpointed response for a post or comment, or None if it has none."""
+        with self._lock:
+            entry = self._responses.get(content_fullname(content_data))
+        return dict(entry[1]) if entry is not None else None
+
+    def save_response(self, response, stage):
+        """
+        Checkpoint a response at a stage.
+
+        Args:
+            response (dict): Response data from ResponseGenerator (with its target's fullname)
+            stage (str): "responded" or "sent"
+        """
+        if response.get("fullname"):
+            self._advance([(response["fullname"], response)], "response", stage)
+
+    def was_sent(self, response):
+        """Check whether a response's DM was already sent."""
+        with self._lock:
+            entry = self._responses.get(response.get("fullname"))
+        return entry is not None and entry[0] == "sent"
+
+    # ---- Cycle -------------------------------------------------------
+
+    def complete(self, results):
+        """Mark the cycle as finished, so it is no longer offered for resuming."""
+        self.store.complete(self.checkpoint_id, results)
+
+    def fail(self, results):
+        """Mark the cycle as failed with its partial results; it can still be resumed."""
+        self.store.fail(self.checkpoint_id, results)
+
+    def stats(self):
+        """Get the number of checkpointed items per stage."""
+        with self._lock:
+            counts = {stage: 0 for stage in STAGES}
+            for stage, _ in list(self._posts.values()) + list(self._responses.values()):
+                counts[stage] += 1
+            return {"checkpoint_id": self.checkpoint_id, "resumed": self.resumed, **counts}
+
+class CycleCheckpointStore:
+    """
+    Persisted monitoring cycle checkpoints.
+
+    Each cycle gets a cycle_checkpoints row holding its parameters, and a
+    cycle_checkpoint_items row per post and response tracking the stage it
+    reached. Cycles that never completed can be resumed from their last
+    checkpointed items: those still "running" were interrupted (a crash, or
+    an App Engine instance being recycled), and "failed" ones ended with an
+    error that is stored with their results.
+    """
+
+    def __init__(self, session_factory=SessionLocal, retention_days=None):
+        """
+        Initialize the store and prune old checkpoints.
+
+        Args:
+            session_factory (callable): SQLAlchemy session factory
+            retention_days (int, optional): Forget cycles started this many days ago
+                (defaults to config.CYCLE_CHECKPOINT_RETENTION_DAYS)
+        """
+        self.session_factory = session_factory
+        self.retention_days = config.CYCLE_CHECKPOINT_RETENTION_DAYS if retention_days is None else retention_days
+        self._lock = threading.Lock()
+
+        # Make sure the tables exist for processes that don't run db_init (e.g. the CLI)
+        CycleCheckpoint.__table__.create(bind=engine, checkfirst=True)
+        CycleCheckpointItem.__table__.create(bind=engine, checkfirst=True)
+        self.prune()
+
+    def prune(self):
+        """Delete checkpoints of cycles started before the retention period."""
+        db = self.session_factory()
+        try:
+            cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+            expired = [row.id for row in db.query(CycleCheckpoint.id).filter(CycleCheckpoint.started_at < cutoff)]
+            if expired:
+                db.query(CycleCheckpointItem).filter(
+                    CycleCheckpointItem.checkpoint_id.in_(expired)).delete(synchronize_session=False)
+                db.query(CycleCheckpoint).filter(CycleCheckpoint.id.in_(expired)).delete(synchronize_session=False)
+                db.commit()
+                logger.info(f"Pruned {len(expired)} expired cycle checkpoints")
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error pruning cycle checkpoints: {str(e)}")
+        finally:
+            db.close()
+
+    def start(self, parameters, monitoring_session_id=None):
+        """
+        Record the start of a new cycle.
+
+        Args:
+            parameters (dict): The cycle's run_monitoring_cycle arguments (JSON-serializable)
+            monitoring_session_id (int, optional): MonitoringSession the cycle belongs to
+
+        Returns:
+            CycleProgress: Progress to checkpoint the cycle's items with
+        """
+        db = self.session_factory()
+        try:
+            checkpoint = CycleCheckpoint(parameters=json.dumps(parameters), status="running",
+                                         monitoring_session_id=monitoring_session_id)
+            db.add(checkpoint)
+            db.commit()
+            return CycleProgress(self, checkpoint.id, parameters)
+        finally:
+            db.close()
+
+    def resume_latest(self, monitoring_session_id=None):
+        """
+        Load the most recent unfinished (interrupted or failed) cycle.
+
+        Args:
+            monitoring_session_id (int, optional): Only consider this MonitoringSession's cycles
+
+        Returns:
+            CycleProgress: Progress of that cycle, or None if every cycle completed
+        """
+        db = self.session_factory()
+        try:
+            checkpoint = db.query(CycleCheckpoint).filter(
+                CycleCheckpoint.status.in_(UNFINISHED_STATUSES),
+                CycleCheckpoint.monitoring_session_id == monitoring_session_id
+            ).order_by(CycleCheckpoint.started_at.desc(), CycleCheckpoint.id.desc()).first()
+            if checkpoint is None:
+                return None
+
+            items = [(item.item_key, item.stage, json.loads(item.data))
+                     for item in db.query(CycleCheckpointItem)
+                                   .filter(CycleCheckpointItem.checkpoint_id == checkpoint.id)
+                                   .order_by(CycleCheckpointItem.id)]
+            return CycleProgress(self, checkpoint.id, json.loads(checkpoint.parameters), items,
+                                 failed=checkpoint.status == "failed")
+        except (SQLAlchemyError, ValueError) as e:
+            logger.error(f"Error loading cycle checkpoint: {str(e)}")
+            return None
+        finally:
+            db.close()
+
+    def save_items(self, checkpoint_id, entries):
+        """
+        Insert or update checkpointed items.
+
+        Args:
+            checkpoint_id (int): CycleCheckpoint row id
+            entries (list): (item key, stage, data) triples
+        """
+        if not entries:
+            return
+
+        # One writer at a time, so concurrent pipeline stages don't insert the same key twice
+        with self._lock:
+            db = self.session_factory()
+            try:
+                keys = [item_key for item_key, _, _ in entries]
+                existing = {
+                    item.item_key: item
+                    for item in db.query(CycleCheckpointItem).filter(
+                        CycleCheckpointItem.checkpoint_id == checkpoint_id,
+                        CycleCheckpointItem.item_key.in_(keys))
+                }
+                for item_key, stage, data in entries:
+                    item = existing.get(item_key)
+                    if item is None:
+                        db.add(CycleCheckpointItem(checkpoint_id=checkpoint_id, item_key=item_key, stage=stage,
+                                                   data=json.dumps(data)))
+                    else:
+                        item.stage = stage
+                        item.data = json.dumps(data)
+                db.query(CycleCheckpoint).filter(CycleCheckpoint.id == checkpoint_id).update(
+                    {CycleCheckpoint.updated_at: datetime.utcnow()}, synchronize_session=False)
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                logger.error(f"Error saving cycle checkpoint: {str(e)}")
+            finally:
+                db.close()
+
+    def complete(self, checkpoint_id, results):
+        """Mark a cycle as completed and store its results."""
+        now = datetime.utcnow()
+        self._finish(checkpoint_id, {
+            CycleCheckpoint.status: "completed",
+            CycleCheckpoint.results: json.dumps(results, default=str),
+            CycleCheckpoint.completed_at: now,
+            CycleCheckpoint.updated_at: now
+        })
+
+    def fail(self, checkpoint_id, results):
+        """Mark a cycle as failed and store its partial results, including the error."""
+        self._finish(checkpoint_id, {
+            CycleCheckpoint.status: "failed",
+            CycleCheckpoint.results: json.dumps(results, default=str),
+            CycleCheckpoint.updated_at: datetime.utcnow()
+        })
+
+    def _finish(self, checkpoint_id, values):
+        """Update a cycle's checkpoint row when the cycle ends."""
+        db = self.session_factory()
+        try:
+            db.query(CycleCheckpoint).filter(CycleCheckpoint.id == checkpoint_id).update(
+                values, synchronize_session=False)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error updating cycle checkpoint {checkpoint_id}: {str(e)}")
+        finally:
+            db.close()
+
+    def unfinished(self, limit=10):
+        """
+        List cycles that started but never completed, newest first.
+
+        Args:
+            limit (int): Maximum number of cycles
+
+        Returns:
+            list: Dicts with id, monitoring_session_id, parameters, status ("running"
+                if interrupted, or "failed"), error, started_at, updated_at and the
+                number of checkpointed items per stage
+        """
+        db = self.session_factory()
+        try:
+            checkpoints = db.query(CycleCheckpoint).filter(
+                CycleCheckpoint.status.in_(UNFINISHED_STATUSES)).order_by(
+                CycleCheckpoint.started_at.desc(), CycleCheckpoint.id.desc()).limit(limit).all()
+            cycles = []
+            for checkpoint in checkpoints:
+                counts = {stage: 0 for stage in STAGES}
+                for (stage,) in db.query(CycleCheckpointItem.stage).filter(
+                        CycleCheckpointItem.checkpoint_id == checkpoint.id):
+                    counts[stage] = counts.get(stage, 0) + 1
+                cycles.append({
+                    "id": checkpoint.id,
+                    "monitoring_session_id": checkpoint.monitoring_session_id,
+                    "parameters": json.loads(checkpoint.parameters),
+                    "status": checkpoint.status,
+                    "error": json.loads(checkpoint.results).get("error") if checkpoint.results else None,
+                    "started_at": checkpoint.started_at.isoformat(),
+                    "updated_at": checkpoint.updated_at.isoformat() if checkpoint.updated_at else None,
+                    "items": counts
+                })
+            return cycles
+        except (SQLAlchemyError, ValueError) as e:
+            logger.error(f"Error listing unfinished cycles: {str(e)}")
+            return []
+        finally:
+            db.close()
@@ -0,0 +1,175 @@
+import logging
+import threading
+from datetime import datetime
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import SubredditCursor
+from database import engine, SessionLocal
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def listing_position(fullname, created_utc):
+    """
+    Sort key of a post in a /new listing.
+
+    Posts created in the same second are ordered by their base36 id, which
+    Reddit assigns sequentially.
+
+    Args:
+        fullname (str): Post fullname (e.g. t3_abc123)
+        created_utc (float): Creation timestamp of the post
+
+    Returns:
+        tuple: (created_utc, id), comparable with other positions
+    """
+    try:
+        post_id = int(fullname.split("_", 1)[-1], 36) if fullname else -1
+    except ValueError:
+        post_id = -1
+    return (created_utc, post_id)
+
+class SubredditCursorStore:
+    """
+    Persisted per-subreddit high-water marks for incremental scraping.
+
+    Each cursor records the fullname and created_utc of the newest post seen
+    in a subreddit, so the next cycle can stop paging as soon as it reaches
+    content it has already fetched. Cursors are scoped to a monitoring session;
+    a store without a session holds the cursors for ad-hoc (CLI) cycles.
+    """
+
+    def __init__(self, monitoring_session_id=None, session_factory=SessionLocal):
+        """
+        Initialize the cursor store.
+
+        Args:
+            monitoring_session_id (int, optional): MonitoringSession the cursors belong to
+            session_factory (callable): SQLAlchemy session factory
+        """
+        self.monitoring_session_id = monitoring_session_id
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._held = None  # subreddit -> (fullname, created_utc) while advances are held
+
+        # Make sure the table exists for processes that don't run db_init (e.g. the CLI)
+        SubredditCursor.__table__.create(bind=engine, checkfirst=True)
+
+    def _query(self, db, subreddit):
+        return db.query(SubredditCursor).filter(
+            SubredditCursor.subreddit == subreddit.lower(),
+            SubredditCursor.monitoring_session_id == self.monitoring_session_id
+        )
+
+    def get(self, subreddit):
+        """
+        Get the high-water mark for a subreddit.
+
+        Args:
+            subreddit (str): Subreddit name
+
+        Returns:
+            dict: Cursor with last_fullname and last_created_utc, or None if never scraped
+        """
+        db = self.session_factory()
+        try:
+            cursor = self._query(db, subreddit).first()
+            if cursor is None:
+                return None
+            return {
+                "last_fullname": cursor.last_fullname,
+                "last_created_utc": cursor.last_created_utc
+            }
+        except SQLAlchemyError as e:
+            logger.error(f"Error loading cursor for r/{subreddit}: {str(e)}")
+            return None
+        finally:
+            db.close()
+
+    def hold(self):
+        """
+        Buffer advance() calls until release().
+
+        Used while scraped posts aren't saved anywhere yet (e.g. before a cycle
+        checkpoints them), so a crash in between can't move a cursor past
+        posts that were never recorded.
+        """
+        with self._lock:
+            if self._held is None:
+                self._held = {}
+
+    def release(self):
+        """Apply the advances buffered since hold() and stop buffering."""
+        with self._lock:
+            held, self._held = self._held or {}, None
+        for subreddit, (fullname, created_utc) in held.items():
+            self.advance(subreddit, fullname, created_utc)
+
+    def advance(self, subreddit, fullname, created_utc):
+        """
+        Move a subreddit's high-water mark forward to the given post.
+
+        The cursor never moves backwards, so a cycle that saw nothing new
+        leaves it unchanged.
+
+        Args:
+            subreddit (str): Subreddit name
+            fullname (str): Fullname of the newest post seen (e.g. t3_abc123)
+            created_utc (float): Creation timestamp of that post
+        """
+        with self._lock:
+            if self._held is not None:
+                held = self._held.get(subreddit.lower())
+                if held is None or listing_position(fullname, created_utc) > listing_position(*held):
+                    self._held[subreddit.lower()] = (fullname, created_utc)
+                return
+
+        db = self.session_factory()
+        try:
+            cursor = self._query(db, subreddit).first()
+            if cursor is None:
+                cursor = SubredditCursor(
+                    subreddit=subreddit.lower(),
+                    monitoring_session_id=self.monitoring_session_id
+                )
+                db.add(cursor)
+            elif cursor.last_created_utc is not None and (
+                    listing_position(fullname, created_utc)
+                    <= listing_position(cursor.last_fullname, cursor.last_created_utc)):
+                return
+
+            cursor.last_fullname = fullname
+            cursor.last_created_utc = created_utc
+            cursor.updated_at = datetime.utcnow()
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error saving cursor for r/{subreddit}: {str(e)}")
+        finally:
+            db.close()
+
+    def reset(self, subreddit=None):
+        """
+        Forget the high-water mark for one subreddit, or all of them.
+
+        Args:
+            subreddit (str, optional): Subreddit to reset; all subreddits if omitted
+        """
+        db = self.session_factory()
+        try:
+            query = db.query(SubredditCursor).filter(
+                SubredditCursor.monitoring_session_id == self.monitoring_session_id
+            )
+            if subreddit:
+                query = query.filter(SubredditCursor.subreddit == subreddit.lower())
+            query.delete(synchronize_session=False)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error resetting cursors: {str(e)}")
+        finally:
+            db.close()
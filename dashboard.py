@@ -28,6 +28,10 @@ import auth
 import auth_routes
 import account_routes
 import models
+import rate_limiter
+from keyword_matcher import get_matcher
+from model_executor import get_executor
+from structured_output import INTENT_SCHEMA, RESPONSE_SCHEMA, StructuredOutputError, generate_json, parse_metrics
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -80,6 +84,9 @@ templates = Jinja2Templates(directory="templates")
 # Create app instance
 reddit_app = RedditBuyerIntentApp()
 
+# Shared scraper used for subreddit search (rate limited with the monitoring cycles)
+scraper = reddit_app.scraper
+
 # Background task status
 task_status = {
     "is_running": False,
@@ -1022,6 +1029,7 @@ async def run_monitoring(data: dict, background_tasks: BackgroundTasks):
     min_confidence = data.get("min_confidence", 0.6)
     limit = data.get("limit")
     send_messages = data.get("send_messages", False)
+    resume = data.get("resume", False)
     
     # Update task status
     task_status["is_running"] = True
@@ -1030,40 +1038,22 @@ async def run_monitoring(data: dict, background_tasks: BackgroundTasks):
         "min_intent": min_intent,
         "min_confidence": min_confidence,
         "limit": limit,
-        "send_messages": send_messages
+        "send_messages": send_messages,
+        "resume": resume
     }
     
     # Define the task function
     def run_task():
         try:
-            # Run monitoring cycle
-            results = {
-                "posts_scraped": 0,
-                "high_intent_content": 0,
-                "responses_generated": 0,
-                "messages_sent": 0,
-                "duration_seconds": 0
-            }
-            
-            start_time = time.time()
-            
-            # Scrape posts from subreddits
-            for subreddit in subreddits:
-                posts = scraper.get_subreddit_posts(subreddit, limit=limit)
-                results["posts_scraped"] += len(posts)
-                
-                # Analyze each post
-                for post in posts:
-                    intent_analysis = intent_detector.analyze(post)
-                    if intent_analysis["intent_category"] == min_intent and intent_analysis["confidence"] >= min_confidence:
-                        results["high_intent_content"] += 1
-                        if send_messages:
-                            response = response_generator.generate_response(post, intent_analysis)
-                            results["responses_generated"] += 1
-                            # Send message logic here
-                            results["messages_sent"] += 1
-            
-            results["duration_seconds"] = time.time() - start_time
+            # Run monitoring cycle; a resumed cycle keeps the arguments it was started with
+            results = reddit_app.run_monitoring_cycle(
+                subreddits=subreddits,
+                limit=limit,
+                min_intent=min_intent,
+                min_confidence=min_confidence,
+                send_messages=send_messages,
+                resume=resume
+            )
             
             # Update task status when complete
             task_status["is_running"] = False
@@ -1088,6 +1078,53 @@ async def get_status():
     """Get the current status of the monitoring task."""
     return task_status
 
+@app.get("/api/rate-limit")
+async def get_rate_limit_status():
+    """Get Reddit quota wait times and remaining headroom for each account."""
+    return rate_limiter.get_all_stats()
+
+@app.get("/api/intent-cache")
+async def get_intent_cache_status():
+    """Get hit/miss counters for the intent analysis cache."""
+    intent_cache = getattr(reddit_app, "intent_cache", None)
+    if intent_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **intent_cache.stats()}
+
+@app.get("/api/model-executor")
+async def get_model_executor_status():
+    """Get the adaptive concurrency limit and retry counters for model calls."""
+    return get_executor().stats()
+
+@app.get("/api/structured-output")
+async def get_structured_output_status():
+    """Get parse and repair counters for model JSON output, since the process started."""
+    return {"enabled": config.STRUCTURED_OUTPUT_ENABLED, **parse_metrics.stats()}
+
+@app.get("/api/model-cascade")
+async def get_model_cascade_status():
+    """Get per-tier call, escalation and latency counters for the intent model cascade."""
+    cascade = reddit_app.intent_detector.cascade
+    if cascade is None:
+        return {"enabled": False}
+    return {"enabled": True, "tiers": cascade.stats()}
+
+@app.get("/api/speculative-responses")
+async def get_speculative_responses_status():
+    """Get counts of speculative DM drafts by outcome and the latency they saved."""
+    return {
+        "enabled": reddit_app.intent_detector.speculator is not None,
+        **reddit_app.response_generator.speculation_stats()
+    }
+
+@app.get("/api/checkpoints")
+async def get_unfinished_cycles():
+    """Get the monitoring cycles that were interrupted or failed and can be resumed."""
+    return {
+        "enabled": config.CYCLE_CHECKPOINTS_ENABLED,
+        "unfinished": reddit_app.get_checkpoint_store().unfinished()
+    }
+
 @app.get("/api/responses")
 async def get_responses():
     """Get the latest responses from the most recent monitoring cycle."""
@@ -1141,11 +1178,34 @@ async def test_intent_prompt(data: dict):
             "intent"
         )
         
+        # Show which buyer intent keywords the scraper prefilter would match
+        result["keyword_matches"] = get_matcher(data.get("keywords")).find_all(content)
+        
         return result
     except Exception as e:
         logger.error(f"Error testing intent prompt: {str(e)}")
         return {"error": str(e)}
 
+@app.post("/api/match-keywords")
+async def match_keywords(data: dict):
+    """
+    Run the scraper's keyword prefilter against a piece of text.
+    
+    Args:
+        data (dict): Contains content, and optionally keywords and whole_words
+        
+    Returns:
+        dict: Whether the text passes the prefilter, the matched keywords and their positions
+    """
+    matcher = get_matcher(data.get("keywords"), whole_words=data.get("whole_words"))
+    matches = matcher.find_all(data.get("content", ""))
+    
+    return {
+        "matched": bool(matches),
+        "keywords": list(dict.fromkeys(match["keyword"] for match in matches)),
+        "matches": matches
+    }
+
 @app.post("/api/test-response-prompt")
 async def test_response_prompt(data: dict):
     """
@@ -1261,63 +1321,25 @@ async def test_custom_prompt(model_instance, prompt_template, content, context,
             else:
                 formatted_prompt = prompt_template.format(content=content)
         
-        # Call Gemini with the formatted prompt
-        response = model_instance.model.generate_content(formatted_prompt)
-        
-        # Extract the response text
-        response_text = response.text
-        
-        # For intent detection, try to parse as JSON
-        if prompt_type == "intent":
-            try:
-                # Find JSON content within the response
-                start_idx = response_text.find('{')
-                end_idx = response_text.rfind('}') + 1
-                
-                if start_idx >= 0 and end_idx > start_idx:
-                    json_str = response_text[start_idx:end_idx]
-                    result = json.loads(json_str)
-                else:
-                    # If no JSON found, try to parse the whole response
-                    result = json.loads(response_text)
-                
-                return {
-                    "raw_prompt": formatted_prompt,
-                    "raw_response": response_text,
-                    "parsed_result": result
-                }
-            except json.JSONDecodeError:
-                return {
-                    "raw_prompt": formatted_prompt,
-                    "raw_response": response_text,
-                    "error": "Could not parse response as JSON"
-                }
-        else:
-            # For response generation, try to parse as JSON but return raw text if that fails
-            try:
-                # Find JSON content within the response
-                start_idx = response_text.find('{')
-                end_idx = response_text.rfind('}') + 1
-                
-                if start_idx >= 0 and end_idx > start_idx:
-                    json_str = response_text[start_idx:end_idx]
-                    result = json.loads(json_str)
-                    
-                    return {
-                        "raw_prompt": formatted_prompt,
-                        "raw_response": response_text,
-                        "parsed_result": result
-                    }
-                else:
-                    return {
-                        "raw_prompt": formatted_prompt,
-                        "raw_response": response_text
-                    }
-            except json.JSONDecodeError:
-                return {
-                    "raw_prompt": formatted_prompt,
-                    "raw_response": response_text
-                }
+        # Call Gemini with the formatted prompt, parsing and repairing the output like the pipeline does
+        schema = INTENT_SCHEMA if prompt_type == "intent" else RESPONSE_SCHEMA
+        try:
+            result, response_text = generate_json(get_executor(), model_instance.model, formatted_prompt,
+                                                  schema, f"{prompt_type}_prompt_test")
+            return {
+                "raw_prompt": formatted_prompt,
+                "raw_response": response_text,
+                "parsed_result": result
+            }
+        except StructuredOutputError as e:
+            # For intent detection the JSON is required; a response prompt's raw text is still useful
+            result = {
+                "raw_prompt": formatted_prompt,
+                "raw_response": e.text
+            }
+            if prompt_type == "intent":
+                result["error"] = f"Could not parse response as JSON: {'; '.join(e.problems)}"
+            return result
                 
     except Exception as e:
         logger.error(f"Error in test_custom_prompt: {str(e)}")
@@ -2093,9 +2115,9 @@ async def save_default_prompt(data: dict):
         
         # Update in-memory templates
         if prompt_type == "intent":
-            # Also update the intent detector if it exists
+            # Also update the intent detector if it exists (invalidates cached analyses for the old prompt)
             if hasattr(reddit_app, "intent_detector"):
-                reddit_app.intent_detector.custom_prompt_template = prompt_template
+                reddit_app.intent_detector.set_prompt_template(prompt_template)
         elif prompt_type == "response":
             # Also update the response generator if it exists
             if hasattr(reddit_app, "response_generator"):
@@ -0,0 +1,405 @@
+import argparse
+import asyncio
+import hashlib
+import logging
+import random
+import threading
+import time
+import uuid
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+import uvicorn
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Words used to build synthetic posts; some titles get a buyer intent phrase
+BUYER_PHRASES = [
+    "looking for", "recommend", "should I buy", "best", "alternative to",
+    "worth it", "thinking about getting", "need advice", "suggest"
+]
+TOPICS = [
+    "a CRM for a small team", "a 27 inch monitor", "project management software", "a mechanical keyboard",
+    "an email marketing tool", "a budget GPU", "a smart thermostat", "note taking apps", "a standing desk",
+    "accounting software", "a mesh wifi system", "a password manager"
+]
+FILLER = [
+    "Just finished setting everything up.", "Here's a photo of my setup.", "Does anyone else have this issue?",
+    "Posting this for visibility.", "Weekly discussion thread.", "Mods please remove if not allowed.",
+    "I've been using it for a year now.", "Happy to answer questions."
+]
+
+DEFAULT_SETTINGS = {
+    "seed": 42,
+    "posts_per_subreddit": 200,  # Posts that exist when the server starts
+    "new_posts_per_minute": 2.0,  # Posts added to each subreddit per minute afterwards
+    "keyword_rate": 0.3,  # Share of posts that contain a buyer intent phrase
+    "comments_per_post": 8,  # Top-level comments per post
+    "reply_depth": 2,  # Levels of replies below each top-level comment
+    "latency_ms": 50.0,  # Mean response latency
+    "latency_jitter_ms": 25.0,  # Uniform jitter around the mean
+    "error_rate": 0.0,  # Share of requests answered with a 5xx error
+    "rate_limit_requests": 1000,  # Requests allowed per token per window
+    "rate_limit_window": 600,  # Window length in seconds
+    "username": "fake_user"
+}
+
+def _fake_id(*parts):
+    """Deterministic base36-looking id for a synthetic thing."""
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return format(int(digest[:12], 16), "x")[:7]
+
+class FakeReddit:
+    """
+    In-memory state of the fake Reddit: synthetic content, tokens and quotas.
+
+    Content is generated deterministically from the seed, so two servers
+    started with the same settings at the same moment serve the same posts.
+    """
+
+    def __init__(self, **settings):
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.settings.update({key: value for key, value in settings.items() if value is not None})
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._windows = {}
+        # Post id -> (subreddit, index) for every post served in a listing
+        self._post_index = {}
+        # (subreddit, index) -> generated post, so paging doesn't rebuild the same posts
+        self._posts = {}
+        self.stats = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {"requests": 0, "errors_injected": 0, "rate_limited": 0, "messages_sent": 0,
+                          "tokens_issued": 0, "by_endpoint": {}}
+
+    # ---- Quotas -------------------------------------------------------
+
+    def consume_quota(self, token, endpoint):
+        """
+        Count a request against the token's window.
+
+        Returns:
+            tuple: (allowed, rate limit headers)
+        """
+        window_length = self.settings["rate_limit_window"]
+        allowed_requests = self.settings["rate_limit_requests"]
+        now = time.time()
+
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["by_endpoint"][endpoint] = self.stats["by_endpoint"].get(endpoint, 0) + 1
+
+            window_start, used = self._windows.get(token, (now, 0))
+            if now - window_start >= window_length:
+                window_start, used = now, 0
+            used += 1
+            self._windows[token] = (window_start, used)
+
+            allowed = used <= allowed_requests
+            if not allowed:
+                self.stats["rate_limited"] += 1
+
+        headers = {
+            "x-ratelimit-used": str(used),
+            "x-ratelimit-remaining": f"{max(allowed_requests - used, 0):.1f}",
+            "x-ratelimit-reset": str(max(int(window_start + window_length - now), 0))
+        }
+        return allowed, headers
+
+    def should_fail(self):
+        if random.random() < self.settings["error_rate"]:
+            with self._lock:
+                self.stats["errors_injected"] += 1
+            return True
+        return False
+
+    async def delay(self):
+        latency = self.settings["latency_ms"] + random.uniform(-1, 1) * self.settings["latency_jitter_ms"]
+        if latency > 0:
+            await asyncio.sleep(latency / 1000.0)
+
+    # ---- Content ------------------------------------------------------
+
+    def post_count(self, subreddit):
+        elapsed_minutes = (time.time() - self.started_at) / 60.0
+        return self.settings["posts_per_subreddit"] + int(elapsed_minutes * self.settings["new_posts_per_minute"])
+
+    def post(self, subreddit, index):
+        """Synthetic post number `index` of a subreddit (higher index = newer)."""
+        subreddit = subreddit.lower()
+        cached = self._posts.get((subreddit, index))
+        if cached is not None:
+            return cached
+
+        rng = random.Random(f"{self.settings['seed']}:{subreddit}:{index}")
+        post_id = _fake_id(self.settings["seed"], subreddit, index)
+        topic = rng.choice(TOPICS)
+
+        if rng.random() < self.settings["keyword_rate"]:
+            title = f"{rng.choice(BUYER_PHRASES).capitalize()} {topic}?"
+            body = f"My budget is around ${rng.randint(50, 2000)}. {rng.choice(FILLER)} Any advice is appreciated."
+        else:
+            title = f"{rng.choice(FILLER)} ({topic})"
+            body = " ".join(rng.choice(FILLER) for _ in range(rng.randint(1, 4)))
+
+        # Posts are spread evenly between the seeded backlog and "now"
+        backlog = self.settings["posts_per_subreddit"]
+        interval = 60.0 / max(self.settings["new_posts_per_minute"], 0.001)
+        created_utc = self.started_at + (index - backlog) * interval
+
+        post = {
+            "kind": "t3",
+            "data": {
+                "id": post_id,
+                "name": f"t3_{post_id}",
+                "title": title,
+                "selftext": body,
+                "author": f"user_{_fake_id(subreddit, index, 'author')}",
+                "subreddit": subreddit,
+                "subreddit_name_prefixed": f"r/{subreddit}",
+                "url": f"https://www.reddit.com/r/{subreddit}/comments/{post_id}/",
+                "permalink": f"/r/{subreddit}/comments/{post_id}/",
+                "created_utc": created_utc,
+                "score": rng.randint(0, 500),
+                "num_comments": self.settings["comments_per_post"],
+                "is_self": True
+            }
+        }
+        self._posts[(subreddit, index)] = post
+        return post
+
+    def find_post(self, post_id):
+        """Locate a post by id; ids are hashes, so only posts already served in a listing are known."""
+        with self._lock:
+            return self._post_index.get(post_id)
+
+    def remember(self, subreddit, index, post_id):
+        with self._lock:
+            self._post_index[post_id] = (subreddit, index)
+
+    def comment_tree(self, subreddit, index, post_id):
+        """Synthetic comment tree for a post."""
+        def build(path, depth, parent_fullname):
+            rng = random.Random(f"{self.settings['seed']}:{post_id}:{path}")
+            comment_id = _fake_id(post_id, path)
+            if rng.random() < self.settings["keyword_rate"]:
+                body = f"I'd {rng.choice(['recommend', 'suggest'])} {rng.choice(TOPICS)}, been happy with it."
+            else:
+                body = rng.choice(FILLER)
+
+            replies = ""
+            if depth < self.settings["reply_depth"]:
+                children = [build(f"{path}.{i}", depth + 1, f"t1_{comment_id}") for i in range(rng.randint(0, 2))]
+                replies = {"kind": "Listing", "data": {"after": None, "before": None, "children": children}}
+
+            return {
+                "kind": "t1",
+                "data": {
+                    "id": comment_id,
+                    "name": f"t1_{comment_id}",
+                    "body": body,
+                    "author": f"user_{_fake_id(post_id, path, 'author')}",
+                    "created_utc": self.started_at + rng.randint(0, 3600),
+                    "score": rng.randint(-5, 200),
+                    "parent_id": parent_fullname,
+                    "link_id": f"t3_{post_id}",
+                    "subreddit": subreddit,
+                    "replies": replies
+                }
+            }
+
+        return [build(str(i), 0, f"t3_{post_id}") for i in range(self.settings["comments_per_post"])]
+
+    def subreddit_about(self, name):
+        rng = random.Random(f"{self.settings['seed']}:about:{name.lower()}")
+        return {
+            "kind": "t5",
+            "data": {
+                "id": _fake_id("subreddit", name.lower()),
+                "name": f"t5_{_fake_id('subreddit', name.lower())}",
+                "display_name": name,
+                "subscribers": rng.randint(1000, 5000000),
+                "public_description": f"Synthetic community about {name}."
+            }
+        }
+
+def listing(children, after=None):
+    return {"kind": "Listing", "data": {"after": after, "before": None, "dist": len(children), "children": children}}
+
+def create_app(**settings):
+    """
+    Create the fake Reddit API application.
+
+    Args:
+        **settings: Overrides for DEFAULT_SETTINGS
+
+    Returns:
+        FastAPI: The application, with its FakeReddit state at app.state.fake
+    """
+    fake = FakeReddit(**settings)
+    app = FastAPI(title="Fake Reddit API")
+    app.state.fake = fake
+
+    def route(path, methods=("GET",)):
+        """Register a path both with and without a trailing slash, as PRAW uses both."""
+        def decorator(func):
+            app.add_api_route(path, func, methods=list(methods))
+            app.add_api_route(path.rstrip("/") + "/", func, methods=list(methods), include_in_schema=False)
+            return func
+        return decorator
+
+    async def respond(request, endpoint, build):
+        """Apply latency, quota and error injection, then build the JSON body."""
+        await fake.delay()
+        token = request.headers.get("authorization", "anonymous")
+        allowed, headers = fake.consume_quota(token, endpoint)
+        if not allowed:
+            return JSONResponse({"message": "Too Many Requests", "error": 429}, status_code=429, headers=headers)
+        if fake.should_fail():
+            status_code = random.choice([500, 502, 503])
+            return JSONResponse({"message": "Injected error", "error": status_code}, status_code=status_code,
+                                headers=headers)
+        return JSONResponse(build(), headers=headers)
+
+    @route("/api/v1/access_token", methods=("POST",))
+    async def access_token(request: Request):
+        form = await request.form()
+        with fake._lock:
+            fake.stats["tokens_issued"] += 1
+        body = {
+            "access_token": f"fake-{uuid.uuid4().hex}",
+            "token_type": "bearer",
+            "expires_in": 3600,
+            "scope": "*"
+        }
+        if form.get("grant_type") in ("refresh_token", "authorization_code"):
+            body["refresh_token"] = form.get("refresh_token") or f"fake-refresh-{uuid.uuid4().hex}"
+        await fake.delay()
+        return JSONResponse(body)
+
+    @route("/r/{subreddits}/new")
+    async def subreddit_new(request: Request, subreddits: str, limit: int = 25, after: str = None):
+        def build():
+            names = [name for name in subreddits.split("+") if name]
+            limit_value = min(max(limit, 1), 100)
+
+            # Merge the newest posts of every subreddit by creation time
+            posts = []
+            for name in names:
+                count = fake.post_count(name)
+                for index in range(count - 1, max(count - 1000, -1), -1):
+                    post = fake.post(name, index)
+                    fake.remember(name.lower(), index, post["data"]["id"])
+                    posts.append(post)
+            posts.sort(key=lambda post: post["data"]["created_utc"], reverse=True)
+
+            if after:
+                fullnames = [post["data"]["name"] for post in posts]
+                start = fullnames.index(after) + 1 if after in fullnames else len(posts)
+                posts = posts[start:]
+
+            page = posts[:limit_value]
+            next_after = page[-1]["data"]["name"] if len(posts) > limit_value else None
+            return listing(page, next_after)
+        return await respond(request, "listing", build)
+
+    @route("/comments/{post_id}")
+    async def comments(request: Request, post_id: str, limit: int = None):
+        def build():
+            location = fake.find_post(post_id)
+            if location is None:
+                return [listing([]), listing([])]
+            subreddit, index = location
+            tree = fake.comment_tree(subreddit, index, post_id)
+            if limit:
+                tree = tree[:limit]
+            return [listing([fake.post(subreddit, index)]), listing(tree)]
+        return await respond(request, "comments", build)
+
+    @route("/r/{name}/about")
+    async def subreddit_about(request: Request, name: str):
+        return await respond(request, "about", lambda: fake.subreddit_about(name))
+
+    @route("/subreddits/popular")
+    async def subreddits_popular(request: Request, limit: int = 25):
+        names = ["buildapc", "gadgets", "homeautomation", "software", "technology", "marketing",
+                 "productivity", "smallbusiness", "startups", "entrepreneur"]
+        return await respond(request, "subreddits",
+                             lambda: listing([fake.subreddit_about(name) for name in names[:limit]]))
+
+    @route("/subreddits/search")
+    async def subreddits_search(request: Request, q: str = "", limit: int = 25):
+        return await respond(request, "subreddits",
+                             lambda: listing([fake.subreddit_about(f"{q}{suffix}")
+                                              for suffix in ["", "help", "deals", "talk"]][:limit]))
+
+    @route("/api/v1/me")
+    async def me(request: Request):
+        return await respond(request, "me", lambda: {
+            "name": fake.settings["username"],
+            "id": _fake_id("me", fake.settings["username"]),
+            "created_utc": fake.started_at - 86400 * 365,
+            "link_karma": 1,
+            "comment_karma": 1
+        })
+
+    @route("/api/compose", methods=("POST",))
+    async def compose(request: Request):
+        def build():
+            with fake._lock:
+                fake.stats["messages_sent"] += 1
+            return {"json": {"errors": []}}
+        return await respond(request, "compose", build)
+
+    # ---- Control endpoints for load tests ------------------------------
+
+    @app.get("/_fake/stats")
+    async def get_stats():
+        return fake.stats
+
+    @app.post("/_fake/reset")
+    async def reset_stats():
+        fake.reset_stats()
+        fake._windows.clear()
+        return {"success": True}
+
+    @app.post("/_fake/settings")
+    async def update_settings(data: dict):
+        fake.settings.update({key: value for key, value in data.items() if key in DEFAULT_SETTINGS})
+        return fake.settings
+
+    return app
+
+def main():
+    """Run the fake Reddit API server."""
+    parser = argparse.ArgumentParser(description="Local stand-in for the Reddit API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--posts-per-subreddit", type=int)
+    parser.add_argument("--new-posts-per-minute", type=float)
+    parser.add_argument("--keyword-rate", type=float, help="Share of posts containing a buyer intent phrase")
+    parser.add_argument("--comments-per-post", type=int)
+    parser.add_argument("--reply-depth", type=int)
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--latency-jitter-ms", type=float)
+    parser.add_argument("--error-rate", type=float, help="Share of requests answered with a 5xx error")
+    parser.add_argument("--rate-limit-requests", type=int, help="Requests allowed per token per window")
+    parser.add_argument("--rate-limit-window", type=int, help="Rate limit window in seconds")
+    args = parser.parse_args()
+
+    settings = {key: value for key, value in vars(args).items() if key not in ("host", "port")}
+    logger.info(f"Starting fake Reddit API on http://{args.host}:{args.port}")
+    logger.info(f"Point the scraper at it with REDDIT_OAUTH_URL=http://{args.host}:{args.port} "
+                f"REDDIT_URL=http://{args.host}:{args.port}")
+    uvicorn.run(create_app(**settings), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
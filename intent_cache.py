@@ -0,0 +1,301 @@
+import copy
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import IntentCacheEntry
+from database import engine, SessionLocal
+from seen_store import content_hash
+import config
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def prompt_version(prompt_template):
+    """Short hash identifying a prompt template; cache entries are tied to it."""
+    return hashlib.sha1((prompt_template or "").encode("utf-8")).hexdigest()[:16]
+
+def cache_key(text, prompt_hash, model_name):
+    """Cache key for analyzing a text with a given prompt version and model."""
+    return f"{model_name}:{prompt_hash}:{content_hash(text)}"
+
+class IntentCache:
+    """
+    Two-tier cache of intent analyses.
+
+    An in-memory LRU sits in front of the intent_cache table. Entries are
+    keyed by the normalized text hash, the prompt version and the model name,
+    so crossposts, reposts and quoted comments are only sent to the model
+    once. Concurrent lookups for the same key are coalesced: the first caller
+    computes the result and the others wait for it.
+    """
+
+    def __init__(self, session_factory=SessionLocal, memory_size=None, ttl_hours=None, max_entries=None):
+        """
+        Initialize the cache and prune expired rows.
+
+        Args:
+            session_factory (callable): SQLAlchemy session factory
+            memory_size (int, optional): Entries kept in memory (defaults to config.INTENT_CACHE_MEMORY_SIZE)
+            ttl_hours (int, optional): Entry lifetime (defaults to config.INTENT_CACHE_TTL_HOURS)
+            max_entries (int, optional): Rows kept in the database (defaults to config.INTENT_CACHE_MAX_ENTRIES)
+        """
+        self.session_factory = session_factory
+        self.memory_size = config.INTENT_CACHE_MEMORY_SIZE if memory_size is None else memory_size
+        self.ttl = timedelta(hours=config.INTENT_CACHE_TTL_HOURS if ttl_hours is None else ttl_hours)
+        self.max_entries = config.INTENT_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+
+        self._memory = OrderedDict()  # key -> (prompt version, created_at, result)
+        self._inflight = {}  # key -> threading.Event set when the computing caller is done
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+
+        # Counters
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+        # Make sure the table exists for processes that don't run db_init (e.g. the CLI)
+        IntentCacheEntry.__table__.create(bind=engine, checkfirst=True)
+        self.prune()
+
+    # ---- Lookups ----------------------------------------------------
+
+    def _get_memory(self, key, now):
+        """Look up a key in the LRU; caller holds the lock."""
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if now - entry[1] > self.ttl:
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return entry[2]
+
+    def _put_memory(self, key, version, created_at, result):
+        """Insert into the LRU, evicting the least recently used entries; caller holds the lock."""
+        self._memory[key] = (version, created_at, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _get_persistent(self, key, now):
+        db = self.session_factory()
+        try:
+            entry = db.query(IntentCacheEntry).filter(IntentCacheEntry.cache_key == key).first()
+            if entry is None:
+                return None
+            if now - entry.created_at > self.ttl:
+                db.delete(entry)
+                db.commit()
+                return None
+
+            entry.last_used = now
+            db.commit()
+            result = json.loads(entry.result)
+            with self._lock:
+                self._put_memory(key, entry.prompt_version, entry.created_at, result)
+            return result
+        except (SQLAlchemyError, ValueError) as e:
+            db.rollback()
+            logger.error(f"Error reading intent cache entry: {str(e)}")
+            return None
+        finally:
+            db.close()
+
+    def _lookup(self, key):
+        """Look up a key in both tiers, counting hits but not misses."""
+        now = datetime.utcnow()
+        with self._lock:
+            result = self._get_memory(key, now)
+            if result is not None:
+                self.memory_hits += 1
+                return copy.deepcopy(result)
+
+        result = self._get_persistent(key, now)
+        if result is None:
+            return None
+        with self._lock:
+            self.persistent_hits += 1
+        return copy.deepcopy(result)
+
+    def get(self, key):
+        """
+        Look up a cached analysis.
+
+        Args:
+            key (str): Key from cache_key()
+
+        Returns:
+            dict: A copy of the cached result, or None on a miss
+        """
+        result = self._lookup(key)
+        if result is None:
+            with self._lock:
+                self.misses += 1
+        return result
+
+    def put(self, key, version, model_name, result):
+        """
+        Store an analysis in both tiers.
+
+        Args:
+            key (str): Key from cache_key()
+            version (str): prompt_version() of the prompt used
+            model_name (str): Model that produced the result
+            result (dict): The intent analysis result
+        """
+        now = datetime.utcnow()
+        with self._lock:
+            self._put_memory(key, version, now, copy.deepcopy(result))
+            self._writes_since_prune += 1
+            prune = self._writes_since_prune >= 500
+
+        db = self.session_factory()
+        try:
+            entry = db.query(IntentCacheEntry).filter(IntentCacheEntry.cache_key == key).first()
+            if entry is None:
+                entry = IntentCacheEntry(cache_key=key)
+                db.add(entry)
+            entry.prompt_version = version
+            entry.model_name = model_name
+            entry.result = json.dumps(result)
+            entry.created_at = now
+            entry.last_used = now
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error saving intent cache entry: {str(e)}")
+        finally:
+            db.close()
+
+        if prune:
+            self.prune()
+
+    def get_or_compute(self, key, version, model_name, compute):
+        """
+        Return the cached analysis for a key, computing it at most once.
+
+        If another thread is already computing the same key, wait for it and
+        reuse its result instead of making a second model call. Results
+        without a raw analysis (failed calls) are returned but not cached.
+
+        Args:
+            key (str): Key from cache_key()
+            version (str): prompt_version() of the prompt used
+            model_name (str): Model that produces the result
+            compute (callable): Produces the result on a miss
+
+        Returns:
+            dict: The intent analysis result
+        """
+        while True:
+            result = self._lookup(key)
+            if result is not None:
+                return result
+
+            with self._lock:
+                event = self._inflight.get(key)
+                if event is None:
+                    self.misses += 1
+                    event = threading.Event()
+                    self._inflight[key] = event
+                    break
+                self.coalesced += 1
+
+            # Another caller is computing this key; wait, then read its result
+            event.wait()
+
+        try:
+            result = compute()
+            if result.get("raw_analysis"):
+                self.put(key, version, model_name, result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
+
+    # ---- Eviction and invalidation -------------------------------------
+
+    def prune(self):
+        """Delete expired rows and the least recently used rows beyond max_entries."""
+        with self._lock:
+            self._writes_since_prune = 0
+
+        db = self.session_factory()
+        try:
+            cutoff = datetime.utcnow() - self.ttl
+            expired = db.query(IntentCacheEntry).filter(IntentCacheEntry.created_at < cutoff).delete(
+                synchronize_session=False)
+
+            overflow = db.query(IntentCacheEntry).count() - self.max_entries
+            if overflow > 0:
+                oldest = db.query(IntentCacheEntry.id).order_by(IntentCacheEntry.last_used).limit(overflow)
+                db.query(IntentCacheEntry).filter(IntentCacheEntry.id.in_(oldest.scalar_subquery())).delete(
+                    synchronize_session=False)
+            db.commit()
+
+            evicted = expired + max(overflow, 0)
+            if evicted:
+                with self._lock:
+                    self.evictions += evicted
+                logger.info(f"Evicted {evicted} intent cache entries")
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error pruning intent cache: {str(e)}")
+        finally:
+            db.close()
+
+    def invalidate_prompt_version(self, version):
+        """
+        Drop every entry produced with a given prompt version.
+
+        Args:
+            version (str): prompt_version() of the retired prompt
+
+        Returns:
+            int: Number of database rows removed
+        """
+        with self._lock:
+            for key in [key for key, entry in self._memory.items() if entry[0] == version]:
+                del self._memory[key]
+
+        db = self.session_factory()
+        try:
+            removed = db.query(IntentCacheEntry).filter(IntentCacheEntry.prompt_version == version).delete(
+                synchronize_session=False)
+            db.commit()
+            logger.info(f"Invalidated {removed} intent cache entries for prompt version {version}")
+            return removed
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error invalidating intent cache: {str(e)}")
+            return 0
+        finally:
+            db.close()
+
+    def stats(self):
+        """Get hit/miss counters and sizes for the cache."""
+        with self._lock:
+            lookups = self.memory_hits + self.persistent_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": round((self.memory_hits + self.persistent_hits) / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory)
+            }
@@ -1,9 +1,21 @@
-import google.generativeai as genai
 import logging
 import json
-import time
+import copy
 import os
+import re
+import time
 import config
+from model_backend import create_backend
+from model_executor import get_executor
+from seen_store import content_hash, post_fullname, comment_fullname, post_text
+from intent_cache import cache_key, prompt_version
+from preclassifier import load_preclassifier
+from near_duplicates import NearDuplicateIndex
+from model_cascade import create_cascade
+from prompt_builder import fit_to_budget
+from keyword_matcher import get_matcher
+from structured_output import (INTENT_SCHEMA, BATCH_INTENT_SCHEMA, COMBINED_SCHEMA, generate_json, iter_json_values,
+                               parse_metrics, validate)
 
 # Configure logging
 logging.basicConfig(
@@ -12,22 +24,68 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+INTENT_LEVELS = {"HIGH": 3, "MEDIUM": 2, "LOW": 1, "NONE": 0}
+
+# Fields of a streamed answer that are complete: a closed string and a number followed by a delimiter
+EARLY_CATEGORY_PATTERN = re.compile(r'"intent_category"\s*:\s*"([A-Z]+)"')
+EARLY_CONFIDENCE_PATTERN = re.compile(r'"confidence"\s*:\s*-?[0-9.]+\s*[,}\n]')
+
 class IntentDetector:
-    def __init__(self):
-        """Initialize the Gemini API client with the API key from config."""
+    def __init__(self, backend=None):
+        """
+        Initialize the model client for intent detection.
+        
+        Args:
+            backend (ModelBackend, optional): Model backend to use; defaults to the
+                one selected by config.MODEL_BACKEND (Gemini unless set to "local")
+        """
         try:
-            # Configure the Gemini API
-            genai.configure(api_key=config.GEMINI_API_KEY)
+            # Set up the model backend (Gemini, or the local stand-in)
+            self.model = backend if backend is not None else create_backend()
             
-            # Set up the gemini-pro model
-            self.model = genai.GenerativeModel('gemini-pro')
+            # Shared executor that runs model calls concurrently with retries and deadlines
+            self.executor = get_executor()
             
             # Load custom prompt if available
             self.custom_prompt_template = self._load_custom_prompt()
             
-            logger.info("Gemini API client initialized successfully")
+            # Optional SeenItemStore; items already analyzed with identical content are skipped
+            self.seen_store = None
+            
+            # Optional IntentCache; identical text is only sent to the model once per prompt version
+            self.intent_cache = None
+            
+            # Optional local pre-classifier; items it scores below the threshold skip the model
+            self.preclassifier = load_preclassifier() if config.PRECLASSIFIER_ENABLED else None
+            self.preclassifier_threshold = config.PRECLASSIFIER_THRESHOLD
+            self.preclassifier_skipped = 0
+            
+            # Optional near-duplicate index; reworded copies of analyzed text reuse its analysis
+            self.near_duplicates = NearDuplicateIndex() if config.NEAR_DUPLICATE_ENABLED else None
+            
+            # Optional cascade; cheaper models classify first and only uncertain or HIGH items reach self.model
+            self.cascade = create_cascade(self.model) if config.MODEL_CASCADE_ENABLED else None
+            
+            # Streamed answers are cut short once they settle below this category (None: no streaming)
+            self.stream_min_intent = config.INTENT_STREAMING_MIN_INTENT if config.INTENT_STREAMING_ENABLED else None
+            
+            # Hierarchical comment analysis: posts first, then a bounded selection of their comments
+            self.hierarchical_comments = config.HIERARCHICAL_COMMENTS_ENABLED
+            self.comments_pruned = 0
+            
+            # Combined mode: likely-HIGH items get their analysis and a DM draft from one prompt
+            self.combined_drafts = config.COMBINED_DRAFT_ENABLED
+            
+            # Speculative responses: a ResponseGenerator (set by the app) that starts drafting
+            # likely-HIGH items' DMs while they are still being classified
+            self.speculator = None
+            
+            # Items per model call when batch classification is enabled
+            self.batch_size = config.INTENT_BATCH_SIZE if config.INTENT_BATCHING_ENABLED else 1
+            
+            logger.info(f"Model backend {self.model.name} initialized for intent detection")
         except Exception as e:
-            logger.error(f"Failed to initialize Gemini API client: {str(e)}")
+            logger.error(f"Failed to initialize model backend for intent detection: {str(e)}")
             raise
     
     def _load_custom_prompt(self):
@@ -43,13 +101,46 @@ class IntentDetector:
         
         return None
     
-    def detect_intent(self, text, context=None):
+    @property
+    def prompt_version(self):
+        """Hash of the prompt template currently in use, for cache keys."""
+        return prompt_version(self.custom_prompt_template or self._get_default_prompt("", "", "", None))
+    
+    @property
+    def combined_prompt_version(self):
+        """Hash of the combined intent and DM draft prompt, for cache keys of detect_intent_with_draft."""
+        return prompt_version(self._get_combined_prompt("", "", "", None))
+    
+    def set_prompt_template(self, prompt_template):
+        """
+        Replace the custom prompt template.
+        
+        Cached analyses made with the old template are invalidated; entries
+        for other prompt versions are kept.
+        
+        Args:
+            prompt_template (str): The new template, or None for the default prompt
+        """
+        old_version = self.prompt_version
+        self.custom_prompt_template = prompt_template
+        
+        if self.intent_cache and self.prompt_version != old_version:
+            self.intent_cache.invalidate_prompt_version(old_version)
+    
+    @property
+    def model_name(self):
+        """Name of the model (or cascade of models) producing results, used in cache keys."""
+        return self.cascade.name if self.cascade else self.model.name
+    
+    def detect_intent(self, text, context=None, min_intent=None):
         """
         Detect buyer intent in the given text using Gemini 2.5 Pro.
         
         Args:
             text (str): The text to analyze for buyer intent
             context (dict, optional): Additional context such as subreddit and title
+            min_intent (str, optional): The cycle's minimum intent; with streaming enabled, answers
+                settled below it are cut short (defaults to config.INTENT_STREAMING_MIN_INTENT)
             
         Returns:
             dict: Intent analysis results containing intent category, confidence, and relevant details
@@ -65,6 +156,30 @@ class IntentDetector:
                 "raw_analysis": {}
             }
         
+        if self.intent_cache:
+            key = cache_key(text, self.prompt_version, self.model_name)
+            result = self.intent_cache.get_or_compute(
+                key, self.prompt_version, self.model_name,
+                lambda: self._detect_intent_uncached(text, context, min_intent=min_intent)
+            )
+            if not self._is_complete_for(result, min_intent):
+                # Cut short for a cycle with a higher minimum; this one needs the whole answer
+                result = self._detect_intent_uncached(text, context, min_intent=min_intent)
+                self._cache_batch_result(text, result)
+            return result
+        
+        return self._detect_intent_uncached(text, context, min_intent=min_intent)
+    
+    def _detect_intent_uncached(self, text, context, start_tier=0, previous=None, min_intent=None):
+        """
+        Send a single intent detection prompt to the model.
+        
+        With a cascade, start_tier and previous let an item the first tier
+        already classified in a batch continue from the next tier.
+        """
+        # Keep long posts within the token budget, around the buying signal
+        text = fit_to_budget(text)
+        
         # Create a prompt for the Gemini model
         subreddit_info = f"Subreddit: r/{context['subreddit']}" if context and 'subreddit' in context else ""
         title_info = f"Post title: {context['title']}" if context and 'title' in context else ""
@@ -87,48 +202,250 @@ class IntentDetector:
             prompt = self._get_default_prompt(text, subreddit_info, title_info, context)
         
         try:
-            # Generate response from Gemini
-            response = self.model.generate_content(prompt)
-            
-            # Extract the JSON data from the response
-            response_text = response.text
-            
-            # Find JSON content within the response
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            
-            if start_idx >= 0 and end_idx > start_idx:
-                json_str = response_text[start_idx:end_idx]
-                analysis = json.loads(json_str)
+            # Generate and parse the analysis, with a repair retry for malformed output
+            stream_min_intent = self._stream_min_intent(min_intent)
+            stop = None
+            if stream_min_intent:
+                stop = lambda partial: self._settled_below_min_intent(partial, stream_min_intent)
+            if self.cascade:
+                analysis, model_name, escalated_from = self.cascade.classify(
+                    self.executor, prompt, start_tier, previous, stop=stop)
             else:
-                # If no JSON found, try to parse the whole response
-                analysis = json.loads(response_text)
+                analysis, _ = generate_json(self.executor, self.model, prompt, INTENT_SCHEMA, "intent", stop=stop)
                 
             # Log the results
             logger.info(f"Detected intent: {analysis['intent_category']} with confidence {analysis['confidence']}")
             
-            return {
-                "intent_category": analysis.get("intent_category", "NONE"),
-                "confidence": analysis.get("confidence", 0.0),
-                "products_services": analysis.get("products_services", []),
-                "needs": analysis.get("needs", []),
-                "timeframe": analysis.get("timeframe", "unknown"),
-                "recommended_response": analysis.get("recommended_response", ""),
-                "raw_analysis": analysis
-            }
+            result = self._result_from_analysis(analysis)
+            if self.cascade:
+                result["model"] = model_name
+                if escalated_from:
+                    result["escalated_from"] = escalated_from
+            return result
             
         except Exception as e:
             logger.error(f"Error detecting intent: {str(e)}")
             # Return a default response in case of an error
-            return {
-                "intent_category": "NONE",
-                "confidence": 0.0,
-                "products_services": [],
-                "needs": [],
-                "timeframe": "unknown",
-                "recommended_response": "",
-                "raw_analysis": {}
-            }
+            return self._result_from_analysis({})
+    
+    def detect_intent_with_draft(self, text, context=None, min_intent=None):
+        """
+        Detect buyer intent and draft a DM in a single model call.
+        
+        The analysis has the same shape as detect_intent's; for MEDIUM or HIGH
+        intent it also carries the draft as draft_response ({subject, message}),
+        which ResponseGenerator sends instead of making its own call. Combined
+        prompts go straight to the main model, since likely-HIGH items would be
+        escalated by a cascade anyway. If the combined call fails, the item is
+        analyzed with the plain intent prompt.
+        
+        Args:
+            text (str): The text to analyze for buyer intent
+            context (dict, optional): Additional context such as subreddit and title
+            min_intent (str, optional): The cycle's minimum intent, for the plain fallback (see detect_intent)
+            
+        Returns:
+            dict: Intent analysis results, with draft_response when one was written
+        """
+        if not text or text.strip() == "":
+            return self.detect_intent(text, context, min_intent)
+        
+        try:
+            if self.intent_cache:
+                # Keyed apart from plain analyses, so those never carry a draft and these always can
+                key = cache_key(text, self.combined_prompt_version, self.model_name)
+                return self.intent_cache.get_or_compute(
+                    key, self.combined_prompt_version, self.model_name,
+                    lambda: self._detect_intent_with_draft_uncached(text, context)
+                )
+            return self._detect_intent_with_draft_uncached(text, context)
+        except Exception as e:
+            # Falls back outside the cache, so a transient failure isn't stored as a draft-less combined result
+            logger.error(f"Error detecting intent with draft: {str(e)}. Falling back to the intent prompt.")
+            return self.detect_intent(text, context, min_intent)
+    
+    def _detect_intent_with_draft_uncached(self, text, context):
+        """Send a combined intent and DM draft prompt to the main model, raising if it fails."""
+        budgeted_text = fit_to_budget(text)
+        subreddit_info = f"Subreddit: r/{context['subreddit']}" if context and 'subreddit' in context else ""
+        title_info = f"Post title: {context['title']}" if context and 'title' in context else ""
+        prompt = self._get_combined_prompt(budgeted_text, subreddit_info, title_info, context)
+        
+        analysis, _ = generate_json(self.executor, self.model, prompt, COMBINED_SCHEMA, "intent_with_draft")
+        draft = analysis.pop("draft_response", None)
+        logger.info(f"Detected intent: {analysis['intent_category']} with confidence {analysis['confidence']} "
+                    f"({'with' if draft else 'without'} a draft response)")
+        
+        result = self._result_from_analysis(analysis)
+        if self.cascade:
+            result["model"] = self.model.name
+        if draft and analysis['intent_category'] in ("HIGH", "MEDIUM"):
+            result["draft_response"] = draft
+        return result
+    
+    def _stream_min_intent(self, min_intent):
+        """Category below which streamed answers are cut short for a cycle (None: streaming disabled)."""
+        if not self.stream_min_intent:
+            return None
+        return min_intent or self.stream_min_intent
+    
+    def _is_complete_for(self, result, min_intent):
+        """Check whether a result has every field a cycle needs; answers cut short only describe non-leads."""
+        if not (result.get("raw_analysis") or {}).get("stopped_early"):
+            return True
+        threshold = min_intent or self.stream_min_intent or config.INTENT_STREAMING_MIN_INTENT
+        return INTENT_LEVELS.get(result.get("intent_category"), 0) < INTENT_LEVELS[threshold]
+    
+    def _settled_below_min_intent(self, text, min_intent):
+        """
+        Check a partly streamed answer for an intent below the cycle's minimum.
+        
+        Once the category and confidence are complete and the category is
+        below min_intent, the rest of the answer only describes a non-lead,
+        so the fields seen so far are used and generation stops.
+        
+        Args:
+            text (str): Answer text streamed so far
+            min_intent (str): The cycle's minimum intent category
+            
+        Returns:
+            dict: The partial analysis, marked stopped_early, or None to keep reading
+        """
+        category = EARLY_CATEGORY_PATTERN.search(text)
+        if not category or category.group(1) not in INTENT_LEVELS or not EARLY_CONFIDENCE_PATTERN.search(text):
+            return None
+        if INTENT_LEVELS[category.group(1)] >= INTENT_LEVELS[min_intent]:
+            return None
+        
+        for value, _ in iter_json_values(text):
+            if isinstance(value, dict) and not validate(value, INTENT_SCHEMA):
+                value["stopped_early"] = True
+                return value
+        return None
+    
+    def _result_from_analysis(self, analysis):
+        """Build an intent result from the model's parsed JSON."""
+        return {
+            "intent_category": analysis.get("intent_category", "NONE"),
+            "confidence": analysis.get("confidence", 0.0),
+            "products_services": analysis.get("products_services", []),
+            "needs": analysis.get("needs", []),
+            "timeframe": analysis.get("timeframe", "unknown"),
+            "recommended_response": analysis.get("recommended_response", ""),
+            "raw_analysis": analysis
+        }
+    
+    def detect_intent_batch(self, items, min_intent=None):
+        """
+        Detect buyer intent for several texts with a single model call.
+        
+        Each item is sent with an ID and the model answers with a JSON array
+        of per-item results. Entries that are missing or fail to parse are
+        retried one at a time with detect_intent, so a single bad entry never
+        costs the whole batch. Items found in the intent cache are not sent.
+        
+        Args:
+            items (list): (text, context) pairs, as passed to detect_intent
+            min_intent (str, optional): The cycle's minimum intent, for items retried with detect_intent
+            
+        Returns:
+            list: Intent analysis results in the same order as items
+        """
+        if not items:
+            return []
+        if len(items) == 1:
+            return [self.detect_intent(*items[0], min_intent=min_intent)]
+        
+        results = [None] * len(items)
+        batch = []
+        for index, (text, context) in enumerate(items):
+            if not text or text.strip() == "":
+                results[index] = self.detect_intent(text, context, min_intent)
+                continue
+            
+            if self.intent_cache:
+                results[index] = self.intent_cache.get(cache_key(text, self.prompt_version, self.model_name))
+            if results[index] is None or not self._is_complete_for(results[index], min_intent):
+                batch.append((str(index + 1), text, context))
+        
+        parsed = {}
+        # With a cascade, the batch goes to the cheapest tier
+        backend = self.cascade.tiers[0] if self.cascade else self.model
+        if batch:
+            started = time.monotonic()
+            try:
+                response = self.executor.generate_content(
+                    backend, self._get_batch_prompt(batch),
+                    response_schema=BATCH_INTENT_SCHEMA if config.STRUCTURED_OUTPUT_ENABLED else None
+                )
+                parsed = self._parse_batch_response(response.text)
+                parse_metrics.record("intent_batch", "parsed" if len(parsed) == len(batch) else "parse_failed")
+            except Exception as e:
+                logger.error(f"Error detecting intent for batch of {len(batch)} items: {str(e)}")
+        
+        retried = 0
+        escalations = []
+        latency_per_item = (time.monotonic() - started) / len(batch) if batch else 0.0
+        for item_id, text, context in batch:
+            index = int(item_id) - 1
+            analysis = parsed.get(item_id)
+            if analysis is None:
+                # Missing or malformed entry: retry just this item
+                retried += 1
+                results[index] = self.detect_intent(text, context, min_intent)
+            elif self.cascade and self.cascade.needs_escalation(analysis, 0):
+                # Uncertain or HIGH: continue with the next tier on its own
+                self.cascade.record(0, latency_per_item, "escalated")
+                escalations.append((index, text, context, {
+                    "model": backend.name,
+                    "intent_category": analysis.get("intent_category"),
+                    "confidence": analysis.get("confidence")
+                }))
+            else:
+                results[index] = self._result_from_analysis(analysis)
+                if self.cascade:
+                    self.cascade.record(0, latency_per_item, "final")
+                    results[index]["model"] = backend.name
+                self._cache_batch_result(text, results[index])
+        
+        escalated = self.executor.map(
+            lambda item: self._detect_intent_uncached(item[1], item[2], start_tier=1, previous=item[3],
+                                                      min_intent=min_intent), escalations)
+        for (index, text, _, _), result in zip(escalations, escalated):
+            results[index] = result
+            self._cache_batch_result(text, result)
+        
+        logger.info(f"Detected intent for {len(batch)} items in one batch ({retried} retried individually)")
+        return results
+    
+    def _cache_batch_result(self, text, result):
+        """Store a result produced outside detect_intent in the intent cache."""
+        if self.intent_cache and result.get("raw_analysis"):
+            self.intent_cache.put(cache_key(text, self.prompt_version, self.model_name),
+                                  self.prompt_version, self.model_name, result)
+    
+    def _parse_batch_response(self, response_text):
+        """
+        Extract per-item analyses from a batch response.
+        
+        Uses the tolerant parser instead of parsing the whole array, so a
+        truncated or partly malformed answer still yields its valid entries.
+        
+        Returns:
+            dict: Item ID -> parsed analysis, for entries matching the intent schema
+        """
+        parsed = {}
+        for value, _ in iter_json_values(response_text):
+            for entry in value if isinstance(value, list) else [value]:
+                if not isinstance(entry, dict):
+                    continue
+                if entry.get("id") is not None:
+                    # Models sometimes answer with numeric IDs
+                    entry["id"] = str(entry["id"])
+                if not validate(entry, BATCH_INTENT_SCHEMA["items"]):
+                    parsed[entry.pop("id")] = entry
+        
+        return parsed
     
     def _get_default_prompt(self, text, subreddit_info, title_info, context):
         """Get the default prompt for intent detection."""
@@ -156,46 +473,548 @@ class IntentDetector:
         Return ONLY a valid JSON object with these fields, nothing else.
         """
     
-    def analyze_reddit_content(self, reddit_data):
+    def _get_combined_prompt(self, text, subreddit_info, title_info, context):
+        """Get the prompt for intent detection combined with a DM draft."""
+        return f"""
+        Analysis task: Detect buyer intent in the following Reddit {context.get('type', 'content') if context else 'content'}, and draft a direct message (DM) to its author.
+        {subreddit_info}
+        {title_info}
+        
+        Content: {text}
+        
+        Return a structured JSON object with the following:
+        
+        1. intent_category: One of ["HIGH", "MEDIUM", "LOW", "NONE"] based on how likely this person is to make a purchase soon
+        2. confidence: A number from 0.0 to 1.0 representing your confidence in this classification
+        3. products_services: A list of specific products, services, or solutions mentioned or implied
+        4. needs: A list of the user's needs, pain points, or requirements
+        5. timeframe: The likely purchasing timeframe (immediate, near future, distant future, unknown)
+        6. recommended_response: A brief suggestion on how to approach this potential buyer
+        7. draft_response: Only if intent_category is HIGH or MEDIUM, an object with "subject" (a professional subject line) and "message" (the complete DM, ready to send)
+        
+        HIGH intent means actively looking to purchase very soon.
+        MEDIUM intent means researching options with a plan to purchase.
+        LOW intent means curious but not actively planning to purchase.
+        NONE means no detectable buyer intent.
+        
+        Requirements for the DM:
+        1. Use a friendly, helpful tone without being pushy or salesy
+        2. Briefly mention you noticed their post/comment about the products or services they are interested in
+        3. Offer genuine value or insights related to their specific needs
+        4. Include 1-2 relevant resources or links that might help them
+        5. End with a clear call-to-action to schedule an appointment or consultation
+        6. The message should be brief (150-200 words maximum)
+        
+        Return ONLY a valid JSON object with these fields, nothing else.
+        """
+    
+    def _get_batch_prompt(self, batch):
+        """Get the prompt for classifying several items in one call."""
+        items_text = ""
+        for item_id, text, context in batch:
+            context = context or {}
+            items_text += f"""
+        Item {item_id}:
+        Type: {context.get('type', 'content')}
+        {f"Subreddit: r/{context['subreddit']}" if 'subreddit' in context else ""}
+        {f"Post title: {context['title']}" if 'title' in context else ""}
+        Content: {fit_to_budget(text)}
+        """
+        
+        return f"""
+        Analysis task: Detect buyer intent in each of the following {len(batch)} Reddit items.
+        {items_text}
+        For each item, return a JSON object with the following:
+        
+        1. id: The item's ID, exactly as given above
+        2. intent_category: One of ["HIGH", "MEDIUM", "LOW", "NONE"] based on how likely this person is to make a purchase soon
+        3. confidence: A number from 0.0 to 1.0 representing your confidence in this classification
+        4. products_services: A list of specific products, services, or solutions mentioned or implied
+        5. needs: A list of the user's needs, pain points, or requirements
+        6. timeframe: The likely purchasing timeframe (immediate, near future, distant future, unknown)
+        7. recommended_response: A brief suggestion on how to approach this potential buyer
+        
+        HIGH intent means actively looking to purchase very soon.
+        MEDIUM intent means researching options with a plan to purchase.
+        LOW intent means curious but not actively planning to purchase.
+        NONE means no detectable buyer intent.
+        
+        Classify every item independently. Return ONLY a valid JSON array with one object per item, nothing else.
+        """
+    
+    def analyze_reddit_content(self, reddit_data, include_posts=True, include_comments=True, min_intent=None,
+                               keywords=None):
         """
         Analyze a list of Reddit posts and comments for buyer intent.
         
         Args:
             reddit_data (list): List of post dictionaries from the Reddit scraper
+            include_posts (bool): Analyze the posts themselves
+            include_comments (bool): Analyze the posts' comments (set False when
+                comments are fetched later by the deferred comment stage)
+            min_intent (str, optional): The cycle's minimum intent category (see detect_intent)
+            keywords (list, optional): The cycle's buyer intent keywords, for comment pruning and
+                picking likely-HIGH items (defaults to config.BUYER_INTENT_KEYWORDS)
             
         Returns:
             list: The same list with added intent analysis data
         """
+        if self.hierarchical_comments and include_posts and include_comments:
+            # Posts first: their intent decides which comments are worth analyzing
+            self.analyze_reddit_content(reddit_data, include_comments=False, min_intent=min_intent, keywords=keywords)
+            return self.analyze_reddit_content(reddit_data, include_posts=False, min_intent=min_intent,
+                                               keywords=keywords)
+        
+        # Collect work across posts, so a cycle's items share batches and run concurrently
+        pending = []
         for post in reddit_data:
-            # Add context information for the intent detector
-            context = {
-                'type': 'post',
-                'subreddit': post['subreddit'],
-                'title': post['title']
-            }
+            pending.extend(self._pending_items(post, include_posts, include_comments, min_intent, keywords))
+        self._analyze_items(pending, min_intent, keywords)
+        
+        return reddit_data
+    
+    def iter_analyze(self, posts, include_posts=True, include_comments=True, min_intent=None, keywords=None):
+        """
+        Stream posts through intent analysis one at a time.
+        
+        Generator counterpart of analyze_reddit_content for chaining with
+        RedditScraper.iter_scrape_subreddits: each post is analyzed and yielded
+        as soon as it arrives, so nothing holds the whole cycle in memory.
+        
+        Args:
+            posts (iterable): Post dictionaries from the Reddit scraper
+            include_posts (bool): Analyze the posts themselves
+            include_comments (bool): Analyze the posts' comments
+            min_intent (str, optional): The cycle's minimum intent category (see detect_intent)
+            keywords (list, optional): The cycle's buyer intent keywords, for comment pruning and
+                picking likely-HIGH items (defaults to config.BUYER_INTENT_KEYWORDS)
             
-            # Analyze the post content
-            post_text = f"{post['title']} {post['content']}"
-            post['intent_analysis'] = self.detect_intent(post_text, context)
+        Yields:
+            dict: Each post with added intent analysis data
+        """
+        for post in posts:
+            yield self.analyze_post(post, include_posts, include_comments, min_intent, keywords)
+    
+    def analyze_post(self, post, include_posts=True, include_comments=True, min_intent=None, keywords=None):
+        """
+        Analyze a single Reddit post and its comments for buyer intent.
+        
+        Args:
+            post (dict): Post dictionary from the Reddit scraper
+            include_posts (bool): Analyze the post itself
+            include_comments (bool): Analyze the post's comments
+            min_intent (str, optional): The cycle's minimum intent category (see detect_intent)
+            keywords (list, optional): The cycle's buyer intent keywords, for comment pruning and
+                picking likely-HIGH items (defaults to config.BUYER_INTENT_KEYWORDS)
             
-            # Sleep to avoid rate limiting
-            time.sleep(1)
+        Returns:
+            dict: The same post with added intent analysis data
+        """
+        if self.hierarchical_comments and include_posts and include_comments:
+            # Posts first: their intent decides which comments are worth analyzing
+            self.analyze_post(post, include_comments=False, min_intent=min_intent, keywords=keywords)
+            return self.analyze_post(post, include_posts=False, min_intent=min_intent, keywords=keywords)
+        
+        pending = self._pending_items(post, include_posts, include_comments, min_intent, keywords)
+        self._analyze_items(pending, min_intent, keywords)
+        return post
+    
+    def _pending_items(self, post, include_posts, include_comments, min_intent=None, keywords=None):
+        """
+        Collect the parts of a post that still need analysis.
+        
+        Items the seen store already knows get their placeholder result here
+        (see _previous_intent); the rest are returned for _analyze_items.
+        
+        Returns:
+            list: Dicts with the target post/comment, its fullname, link, content hash, text and context
+        """
+        pending = []
+        
+        if include_posts:
+            fullname, item_hash = post_fullname(post), content_hash(post_text(post))
             
-            # Analyze each comment
+            previous_intent = self._previous_intent(fullname, item_hash, min_intent)
+            if previous_intent:
+                post['intent_analysis'] = self._already_analyzed_result(previous_intent)
+            else:
+                pending.append({
+                    'target': post,
+                    'fullname': fullname,
+                    'link': f"https://www.reddit.com/comments/{post['id']}/",
+                    'hash': item_hash,
+                    'text': f"{post['title']} {post['content']}",
+                    'context': {
+                        'type': 'post',
+                        'subreddit': post['subreddit'],
+                        'title': post['title']
+                    }
+                })
+        
+        if include_comments:
+            comments = []
             for comment in post['comments']:
-                # Add context for the comment
-                comment_context = {
-                    'type': 'comment',
-                    'subreddit': post['subreddit'],
-                    'title': post['title']
-                }
+                fullname, item_hash = comment_fullname(comment), content_hash(comment['content'])
                 
-                comment['intent_analysis'] = self.detect_intent(comment['content'], comment_context)
-                
-                # Sleep to avoid rate limiting
-                time.sleep(1)
+                previous_intent = self._previous_intent(fullname, item_hash, min_intent)
+                if previous_intent:
+                    comment['intent_analysis'] = self._already_analyzed_result(previous_intent)
+                else:
+                    comments.append((comment, fullname, item_hash))
+            
+            if self.hierarchical_comments:
+                comments = self._select_comments(post, comments, keywords)
+            
+            for comment, fullname, item_hash in comments:
+                pending.append({
+                    'target': comment,
+                    'fullname': fullname,
+                    'link': f"https://www.reddit.com/comments/{post['id']}/_/{comment['id']}/",
+                    'hash': item_hash,
+                    'text': comment['content'],
+                    'context': {
+                        'type': 'comment',
+                        'subreddit': post['subreddit'],
+                        'title': post['title']
+                    }
+                })
         
-        return reddit_data
+        return pending
+    
+    def _select_comments(self, post, comments, keywords=None):
+        """
+        Pick the comments of a thread worth analyzing; the rest get a pruned placeholder.
+        
+        Threads whose post came back NONE, with no buyer intent keyword in the
+        post or any comment, are pruned entirely. Otherwise, optionally only
+        top-level comments and the OP's side of the conversation (comments by
+        the OP and direct replies to them) are kept, and of those at most
+        HIERARCHICAL_MAX_COMMENTS are analyzed: keyword matches first, then
+        the rest by score or recency. Analysis calls per post are bounded by
+        that limit however large the thread is.
+        
+        Args:
+            post (dict): Post dictionary, analyzed already
+            comments (list): (comment, fullname, content hash) tuples not yet analyzed
+            keywords (list, optional): The cycle's buyer intent keywords (defaults to config.BUYER_INTENT_KEYWORDS)
+            
+        Returns:
+            list: The selected (comment, fullname, content hash) tuples
+        """
+        matcher = get_matcher(keywords)
+        matches = {comment['id'] for comment, _, _ in comments if matcher.matched_keywords(comment['content'])}
+        post_analysis = post.get('intent_analysis') or {}
+        
+        if (self._post_intent(post_analysis) == 'NONE'
+                and not matches and not matcher.matched_keywords(post_text(post))):
+            selected = []
+        else:
+            selected = comments
+            if config.HIERARCHICAL_TOP_LEVEL_AND_OP_ONLY:
+                op_comments = {f"t1_{comment['id']}" for comment in post['comments']
+                               if comment.get('author') == post.get('author')}
+                selected = [
+                    item for item in selected
+                    if item[0].get('depth', 0) == 0
+                    or item[0].get('author') == post.get('author')
+                    or item[0].get('parent_id') in op_comments
+                ]
+            
+            sort_field = 'created_utc' if config.HIERARCHICAL_COMMENT_SORT == 'recency' else 'score'
+            selected = sorted(selected, key=lambda item: (item[0]['id'] in matches, item[0].get(sort_field) or 0),
+                              reverse=True)[:config.HIERARCHICAL_MAX_COMMENTS]
+        
+        selected_ids = {comment['id'] for comment, _, _ in selected}
+        for comment, _, _ in comments:
+            if comment['id'] not in selected_ids:
+                comment['intent_analysis'] = self._pruned_result()
+        
+        pruned = len(comments) - len(selected)
+        if pruned:
+            self.comments_pruned += pruned
+            logger.info(f"Analyzing {len(selected)} of {len(comments)} comments on post {post['id']}")
+        # Keep thread order, so comments still batch together as they appear
+        return [item for item in comments if item[0]['id'] in selected_ids]
+    
+    def _pruned_result(self):
+        """Intent result for comments left out by hierarchical comment selection."""
+        return {
+            "intent_category": "NONE",
+            "confidence": 0.0,
+            "products_services": [],
+            "needs": [],
+            "timeframe": "unknown",
+            "recommended_response": "",
+            "raw_analysis": {},
+            "pruned": True
+        }
+    
+    def _is_likely_high(self, item, min_score=None, min_keywords=None, keywords=None):
+        """
+        Check whether an item is likely HIGH intent, by pre-classifier score
+        if it was scored, otherwise by the number of buyer intent keywords.
+        
+        Args:
+            item (dict): Pending item
+            min_score (float, optional): Minimum pre-classifier score (defaults to config.COMBINED_DRAFT_MIN_SCORE)
+            min_keywords (int, optional): Minimum keyword matches (defaults to config.COMBINED_DRAFT_MIN_KEYWORDS)
+            keywords (list, optional): The cycle's buyer intent keywords (defaults to config.BUYER_INTENT_KEYWORDS)
+        """
+        if min_score is None:
+            min_score = config.COMBINED_DRAFT_MIN_SCORE
+        if min_keywords is None:
+            min_keywords = config.COMBINED_DRAFT_MIN_KEYWORDS
+        
+        if 'preclassifier_score' in item:
+            return item['preclassifier_score'] >= min_score
+        return len(get_matcher(keywords).matched_keywords(item['text'])) >= min_keywords
+    
+    def _batching(self):
+        """Batch classification only applies to the built-in prompt; custom prompts are sent per item."""
+        return self.batch_size > 1 and not self.custom_prompt_template
+    
+    def _analyze_items(self, pending, min_intent=None, keywords=None):
+        """
+        Run intent detection for pending items concurrently, in batches when
+        enabled.
+        """
+        # Reworded or cross-posted copies reuse an existing analysis, and
+        # obvious NONE cases are settled locally; neither reaches the model
+        to_model, duplicates = self._split_near_duplicates(pending)
+        to_model = self._apply_preclassifier(to_model)
+        
+        # Likely-HIGH items go first, each with one prompt for the analysis and the DM draft
+        combined = []
+        if self.combined_drafts and not self.custom_prompt_template:
+            remaining = []
+            for item in to_model:
+                (combined if self._is_likely_high(item, keywords=keywords) else remaining).append(item)
+            to_model = remaining
+        
+        # Start drafting DMs for promising items now, so they are ready (or nearly) once they classify
+        speculated = []
+        if self.speculator:
+            speculated = [item for item in to_model
+                          if self._is_likely_high(item, config.SPECULATIVE_RESPONSES_MIN_SCORE,
+                                                  config.SPECULATIVE_RESPONSES_MIN_KEYWORDS, keywords)]
+            for item in speculated:
+                self.speculator.speculate(item['target'])
+        
+        if combined:
+            results = self.executor.map(
+                lambda item: self.detect_intent_with_draft(item['text'], item['context'], min_intent), combined)
+            for item, result in zip(combined, results):
+                item['target']['intent_analysis'] = result
+        
+        if self._batching():
+            chunks = [to_model[start:start + self.batch_size] for start in range(0, len(to_model), self.batch_size)]
+            results = self.executor.map(
+                lambda chunk: self.detect_intent_batch([(item['text'], item['context']) for item in chunk],
+                                                       min_intent),
+                chunks
+            )
+            for chunk, chunk_results in zip(chunks, results):
+                for item, result in zip(chunk, chunk_results):
+                    item['target']['intent_analysis'] = result
+        else:
+            results = self.executor.map(lambda item: self.detect_intent(item['text'], item['context'], min_intent),
+                                        to_model)
+            for item, result in zip(to_model, results):
+                item['target']['intent_analysis'] = result
+        
+        self._resolve_near_duplicates(combined + to_model, duplicates)
+        
+        # Drafts for items that classified below the cycle's response threshold won't be used
+        response_min_intent = min_intent or config.SPECULATIVE_RESPONSES_MIN_INTENT
+        for item in speculated:
+            category = item['target']['intent_analysis'].get('intent_category', 'NONE')
+            if INTENT_LEVELS.get(category, 0) < INTENT_LEVELS[response_min_intent]:
+                self.speculator.discard_speculative(item['target'])
+    
+    def seen_items(self, post):
+        """
+        Get the parts of a post analyzed in this cycle, for recording in the seen store.
+        
+        Failed analyses (empty raw_analysis), pruned comments and items skipped
+        as already analyzed are left out, so they are retried (or keep their
+        earlier record) next cycle.
+        
+        Args:
+            post (dict): Analyzed post dictionary
+            
+        Returns:
+            list: (fullname, content hash, intent category) tuples
+        """
+        items = [(post, post_fullname(post), content_hash(post_text(post)))]
+        items.extend((comment, comment_fullname(comment), content_hash(comment['content']))
+                     for comment in post.get('comments', []))
+        
+        seen = []
+        for target, fullname, item_hash in items:
+            analysis = target.get('intent_analysis')
+            if analysis and analysis.get('raw_analysis'):
+                seen.append((fullname, item_hash, analysis.get('intent_category', 'NONE')))
+        return seen
+    
+    def _post_intent(self, analysis):
+        """Intent category of a post's analysis, or the one recorded earlier if it was skipped as seen."""
+        if analysis.get('already_analyzed'):
+            return analysis.get('previous_intent_category') or 'NONE'
+        return analysis.get('intent_category', 'NONE')
+    
+    def _split_near_duplicates(self, pending):
+        """
+        Separate near-duplicates from the items that need their own analysis.
+        
+        Items close to text analyzed earlier reuse that analysis right away.
+        Items close to another pending item wait for that item's result.
+        
+        Returns:
+            tuple: (items still to analyze, (item, original item, similarity) triples for
+                items waiting on another pending item)
+        """
+        if not self.near_duplicates:
+            return pending, []
+        
+        # Index of this call's own items, so copies within one cycle are analyzed once
+        originals = NearDuplicateIndex(threshold=self.near_duplicates.threshold,
+                                       min_tokens=self.near_duplicates.min_tokens,
+                                       max_entries=max(len(pending), 1))
+        remaining, duplicates = [], []
+        
+        for item in pending:
+            item['signature'] = self.near_duplicates.signature(item['text'])
+            if item['signature'] is None:
+                remaining.append(item)
+                continue
+            
+            # An edited item is re-analyzed, not matched against its own earlier text
+            match = self.near_duplicates.find(signature=item['signature'], exclude=item['fullname'])
+            if match is not None:
+                _, source, similarity = match
+                item['target']['intent_analysis'] = self._duplicate_result(source['analysis'], source, similarity)
+                continue
+            
+            match = originals.find(signature=item['signature'])
+            if match is not None:
+                duplicates.append((item, match[1], match[2]))
+                continue
+            
+            originals.add(item['fullname'], payload=item, signature=item['signature'])
+            remaining.append(item)
+        
+        if len(remaining) < len(pending):
+            logger.info(f"Reusing analyses for {len(pending) - len(remaining)} near-duplicate items")
+        return remaining, duplicates
+    
+    def _resolve_near_duplicates(self, analyzed_items, duplicates):
+        """Index freshly analyzed items and copy their results to their near-duplicates."""
+        if not self.near_duplicates:
+            return
+        
+        for item in analyzed_items:
+            analysis = item['target']['intent_analysis']
+            if analysis['raw_analysis'] and item.get('signature') is not None:
+                self.near_duplicates.add(
+                    item['fullname'],
+                    payload={'fullname': item['fullname'], 'link': item['link'], 'analysis': analysis},
+                    signature=item['signature']
+                )
+        
+        for item, original, similarity in duplicates:
+            analysis = original['target']['intent_analysis']
+            if analysis['raw_analysis']:
+                item['target']['intent_analysis'] = self._duplicate_result(analysis, original, similarity)
+            else:
+                # The original failed or was pre-filtered; share that outcome without a link
+                item['target']['intent_analysis'] = copy.deepcopy(analysis)
+    
+    def _duplicate_result(self, analysis, source, similarity):
+        """Copy of another item's analysis, linked to that item."""
+        result = copy.deepcopy(analysis)
+        # A draft was written for the other author; ResponseGenerator decides whether to reuse responses
+        result.pop('draft_response', None)
+        result['duplicate_of'] = {
+            'fullname': source['fullname'],
+            'link': source['link'],
+            'similarity': similarity
+        }
+        return result
+    
+    def _apply_preclassifier(self, pending):
+        """
+        Score pending items with the local pre-classifier.
+        
+        Items below the threshold get a NONE result right away.
+        
+        Returns:
+            list: The items that should still go to the model
+        """
+        if not self.preclassifier or not pending:
+            return pending
+        
+        scores = self.preclassifier.score([item['text'] for item in pending])
+        remaining = []
+        for item, score in zip(pending, scores):
+            if score >= self.preclassifier_threshold:
+                item['preclassifier_score'] = float(score)
+                remaining.append(item)
+            else:
+                item['target']['intent_analysis'] = self._prefiltered_result(score)
+        
+        skipped = len(pending) - len(remaining)
+        self.preclassifier_skipped += skipped
+        logger.info(f"Pre-classifier settled {skipped} of {len(pending)} items without a model call")
+        return remaining
+    
+    def _prefiltered_result(self, score):
+        """Intent result for items the pre-classifier scored below the threshold."""
+        return {
+            "intent_category": "NONE",
+            "confidence": round(1.0 - float(score), 3),
+            "products_services": [],
+            "needs": [],
+            "timeframe": "unknown",
+            "recommended_response": "",
+            "raw_analysis": {},
+            "prefiltered": True,
+            "preclassifier_score": round(float(score), 3)
+        }
+    
+    def _previous_intent(self, fullname, item_hash, min_intent=None):
+        """
+        Get the intent an earlier cycle recorded for an item with identical content.
+        
+        Items at or above the cycle's min_intent whose DM was never sent count
+        as unseen, so this cycle analyzes them again and can respond to them.
+        
+        Returns:
+            str: The recorded intent category, or None if the item needs analysis
+        """
+        if not self.seen_store:
+            return None
+        
+        seen = self.seen_store.get_seen(fullname, item_hash)
+        if seen is None:
+            return None
+        category = seen['intent_category'] or 'NONE'
+        if min_intent and not seen['message_sent'] and INTENT_LEVELS.get(category, 0) >= INTENT_LEVELS[min_intent]:
+            return None
+        return category
+    
+    def _already_analyzed_result(self, previous_intent_category):
+        """Intent result for items skipped because an earlier cycle already analyzed them."""
+        return {
+            "intent_category": "NONE",
+            "confidence": 0.0,
+            "products_services": [],
+            "needs": [],
+            "timeframe": "unknown",
+            "recommended_response": "",
+            "raw_analysis": {},
+            "already_analyzed": True,
+            "previous_intent_category": previous_intent_category
+        }
     
     def filter_high_intent_content(self, reddit_data, min_intent="MEDIUM", min_confidence=0.6):
         """
@@ -209,6 +1028,22 @@ class IntentDetector:
         Returns:
             list: Filtered list of posts and comments with high buyer intent
         """
+        return list(self.iter_high_intent_content(reddit_data, min_intent, min_confidence))
+    
+    def iter_high_intent_content(self, posts, min_intent="MEDIUM", min_confidence=0.6):
+        """
+        Stream only the high-intent posts and comments.
+        
+        Generator counterpart of filter_high_intent_content.
+        
+        Args:
+            posts (iterable): Post dictionaries with intent analysis
+            min_intent (str): Minimum intent category to include ("HIGH", "MEDIUM", "LOW")
+            min_confidence (float): Minimum confidence score to include
+            
+        Yields:
+            dict: Copies of qualifying posts with only their high-intent comments
+        """
         intent_levels = {
             "HIGH": 3,
             "MEDIUM": 2,
@@ -217,9 +1052,8 @@ class IntentDetector:
         }
         
         min_intent_level = intent_levels[min_intent]
-        high_intent_posts = []
         
-        for post in reddit_data:
+        for post in posts:
             post_intent_level = intent_levels[post['intent_analysis']['intent_category']]
             post_confidence = post['intent_analysis']['confidence']
             
@@ -240,6 +1074,4 @@ class IntentDetector:
                 # Create a copy of the post with only high intent comments
                 filtered_post = post.copy()
                 filtered_post['comments'] = high_intent_comments
-                high_intent_posts.append(filtered_post)
-        
-        return high_intent_posts 
\ No newline at end of file
+                yield filtered_post
\ No newline at end of file
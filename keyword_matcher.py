@@ -0,0 +1,160 @@
+import logging
+from collections import deque
+from functools import lru_cache
+import config
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a set of keywords and phrases.
+
+    The automaton is compiled once per keyword set and finds every keyword
+    in a single pass over the text, regardless of how many keywords there
+    are. Matching is case-insensitive; with whole_words enabled a match must
+    not be preceded or followed by a letter, digit or underscore, so "app"
+    no longer matches inside "happy".
+    """
+
+    def __init__(self, keywords, whole_words=False):
+        """
+        Compile the automaton.
+
+        Args:
+            keywords (iterable): Keywords or multi-word phrases to match
+            whole_words (bool): Only report matches on word boundaries
+        """
+        self.keywords = sorted({keyword.lower().strip() for keyword in keywords if keyword and keyword.strip()})
+        self.whole_words = whole_words
+
+        # Trie: per-state transitions, failure links and the keywords ending at each state
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(index)
+
+        # Breadth-first pass to build failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def _is_boundary(self, text, index):
+        """Check that the character at index is outside the text or not a word character."""
+        return index < 0 or index >= len(text) or not (text[index].isalnum() or text[index] == '_')
+
+    def _scan(self, text):
+        """Yield (keyword index, start, end) for every match in the text."""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+
+        for position, char in enumerate(text.lower()):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for index in output[state]:
+                end = position + 1
+                start = end - len(self.keywords[index])
+                if self.whole_words and not (self._is_boundary(text, start - 1) and self._is_boundary(text, end)):
+                    continue
+                yield index, start, end
+
+    def find_all(self, text):
+        """
+        Find every keyword occurrence in the text.
+
+        Args:
+            text (str): Text to search
+
+        Returns:
+            list: Matches as dicts with keyword, start and end offsets, in text order
+        """
+        if not text or not self.keywords:
+            return []
+        return [
+            {"keyword": self.keywords[index], "start": start, "end": end}
+            for index, start, end in self._scan(text)
+        ]
+
+    def matched_keywords(self, text):
+        """
+        Get the distinct keywords found in the text, in order of first occurrence.
+
+        Args:
+            text (str): Text to search
+
+        Returns:
+            list: Matched keywords
+        """
+        if not text or not self.keywords:
+            return []
+        seen = {}
+        for index, _, _ in self._scan(text):
+            seen.setdefault(index, None)
+        return [self.keywords[index] for index in seen]
+
+    def search(self, text):
+        """
+        Check whether the text contains any keyword, stopping at the first match.
+
+        Args:
+            text (str): Text to search
+
+        Returns:
+            bool: True if any keyword matches
+        """
+        if not text or not self.keywords:
+            return False
+        return next(self._scan(text), None) is not None
+
+@lru_cache(maxsize=64)
+def _compile(keyword_set, whole_words):
+    logger.info(f"Compiling keyword matcher for {len(keyword_set)} keywords")
+    return KeywordMatcher(keyword_set, whole_words=whole_words)
+
+def get_matcher(keywords=None, whole_words=None):
+    """
+    Get a compiled matcher for a keyword set, reusing it if the set was seen before.
+
+    Args:
+        keywords (iterable, optional): Keywords to match (defaults to config.BUYER_INTENT_KEYWORDS)
+        whole_words (bool, optional): Only match on word boundaries (defaults to config.KEYWORD_MATCH_WHOLE_WORDS)
+
+    Returns:
+        KeywordMatcher: The compiled matcher
+    """
+    if keywords is None:
+        keywords = config.BUYER_INTENT_KEYWORDS
+    if whole_words is None:
+        whole_words = config.KEYWORD_MATCH_WHOLE_WORDS
+    if isinstance(keywords, KeywordMatcher):
+        return keywords
+
+    keyword_set = frozenset(keyword.lower().strip() for keyword in keywords if keyword and keyword.strip())
+    return _compile(keyword_set, whole_words)
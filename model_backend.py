@@ -0,0 +1,311 @@
+import hashlib
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+import config
+from keyword_matcher import get_matcher
+from structured_output import schema_instruction
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_CHARS = 16  # Roughly four tokens per streamed chunk from the local stand-in
+
+class ModelResponse:
+    """Minimal stand-in for a google.generativeai response: only .text is used."""
+
+    def __init__(self, text):
+        self.text = text
+
+class ModelBackend:
+    """
+    Interface for the language model behind IntentDetector and ResponseGenerator.
+
+    Backends mirror the part of genai.GenerativeModel the app uses, so callers
+    keep calling ``backend.generate_content(prompt).text``.
+    """
+
+    name = "base"
+
+    def generate_content(self, prompt, response_schema=None):
+        """
+        Generate a completion for a prompt.
+
+        Args:
+            prompt (str): The full prompt
+            response_schema (dict, optional): Schema the answer must follow
+                (structured output mode); see structured_output.py
+
+        Returns:
+            ModelResponse: Object with the generated text in .text
+        """
+        raise NotImplementedError
+
+    def stream_content(self, prompt, response_schema=None):
+        """
+        Generate a completion for a prompt, yielding text as it is produced.
+
+        Closing the generator early stops the generation. Backends that can't
+        stream yield the whole completion at once.
+
+        Args:
+            prompt (str): The full prompt
+            response_schema (dict, optional): Schema the answer must follow
+
+        Yields:
+            str: Successive chunks of the generated text
+        """
+        yield self.generate_content(prompt, response_schema=response_schema).text
+
+class GeminiBackend(ModelBackend):
+    """Backend that calls the Gemini API."""
+
+    def __init__(self, model_name=None):
+        if model_name is None:
+            model_name = config.GEMINI_MODEL_NAME
+
+        genai.configure(api_key=config.GEMINI_API_KEY)
+        self.name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+        # Native JSON mode needs a recent SDK and model; otherwise the schema goes in the prompt
+        self.json_mode = "response_mime_type" in getattr(genai.GenerationConfig, "__dataclass_fields__", {})
+
+    def _generate(self, prompt, response_schema, stream):
+        if response_schema is None:
+            return self.model.generate_content(prompt, stream=stream)
+
+        if self.json_mode:
+            try:
+                return self.model.generate_content(prompt, stream=stream, generation_config={
+                    "response_mime_type": "application/json",
+                    "response_schema": response_schema
+                })
+            except google_exceptions.InvalidArgument as e:
+                logger.warning(f"{self.name} rejected JSON mode ({str(e)}); describing the schema in the prompt instead")
+                self.json_mode = False
+
+        return self.model.generate_content(f"{prompt}\n\n{schema_instruction(response_schema)}", stream=stream)
+
+    def generate_content(self, prompt, response_schema=None):
+        return self._generate(prompt, response_schema, stream=False)
+
+    def stream_content(self, prompt, response_schema=None):
+        response = self._generate(prompt, response_schema, stream=True)
+        try:
+            for chunk in response:
+                yield chunk.text
+        finally:
+            # Cancel the underlying gRPC stream so the server stops generating once we stop reading
+            stream = getattr(response, "_iterator", None)
+            if hasattr(stream, "cancel"):
+                stream.cancel()
+
+class LocalModelBackend(ModelBackend):
+    """
+    Offline stand-in for Gemini for load testing.
+
+    Answers intent prompts with schema-valid intent JSON (a JSON array for
+    batch prompts) and response prompts with a subject/message JSON object.
+    The content of an answer depends only on the prompt, so repeated prompts
+    get repeated answers; latency, API errors and malformed output are drawn
+    at random per call.
+    """
+
+    name = "local-stand-in"
+
+    def __init__(self, latency_distribution=None, latency_ms=None, latency_jitter_ms=None,
+                 failure_rate=None, rate_limit_rate=None, malformed_rate=None, seed=None):
+        """
+        Initialize the stand-in.
+
+        Args:
+            latency_distribution (str, optional): "fixed", "uniform" or "lognormal"
+            latency_ms (float, optional): Mean latency per call
+            latency_jitter_ms (float, optional): Half-width (uniform) or standard deviation (lognormal)
+            failure_rate (float, optional): Share of calls that raise a 500/503 error
+            rate_limit_rate (float, optional): Share of calls that raise a 429 error
+            malformed_rate (float, optional): Share of calls that return unparseable output
+            seed (int, optional): Seed for the random draws
+
+        Any argument left as None falls back to the matching LOCAL_MODEL_* config value.
+        """
+        self.latency_distribution = latency_distribution or config.LOCAL_MODEL_LATENCY_DISTRIBUTION
+        self.latency_ms = config.LOCAL_MODEL_LATENCY_MS if latency_ms is None else latency_ms
+        self.latency_jitter_ms = config.LOCAL_MODEL_LATENCY_JITTER_MS if latency_jitter_ms is None else latency_jitter_ms
+        self.failure_rate = config.LOCAL_MODEL_FAILURE_RATE if failure_rate is None else failure_rate
+        self.rate_limit_rate = config.LOCAL_MODEL_RATE_LIMIT_RATE if rate_limit_rate is None else rate_limit_rate
+        self.malformed_rate = config.LOCAL_MODEL_MALFORMED_RATE if malformed_rate is None else malformed_rate
+
+        self._rng = random.Random(config.LOCAL_MODEL_SEED if seed is None else seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _draw(self):
+        """Draw this call's latency and outcome."""
+        with self._lock:
+            self.calls += 1
+            mean = max(self.latency_ms, 0.0)
+            jitter = max(self.latency_jitter_ms, 0.0)
+
+            if self.latency_distribution == "uniform":
+                latency = self._rng.uniform(mean - jitter, mean + jitter)
+            elif self.latency_distribution == "lognormal" and mean > 0:
+                sigma = math.sqrt(math.log(1 + (jitter / mean) ** 2))
+                latency = self._rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+            else:
+                latency = mean
+
+            roll = self._rng.random()
+            if roll < self.rate_limit_rate:
+                outcome = "rate_limited"
+            elif roll < self.rate_limit_rate + self.failure_rate:
+                outcome = "failed"
+            elif roll < self.rate_limit_rate + self.failure_rate + self.malformed_rate:
+                outcome = "malformed"
+            else:
+                outcome = "ok"
+            return max(latency, 0.0) / 1000.0, outcome, self._rng.random()
+
+    def generate_content(self, prompt, response_schema=None):
+        latency, outcome, variant = self._draw()
+        if latency:
+            time.sleep(latency)
+        return ModelResponse(self._answer(prompt, outcome, variant))
+
+    def stream_content(self, prompt, response_schema=None):
+        latency, outcome, variant = self._draw()
+        # A quarter of the latency passes before the first chunk; the rest is spread over the chunks
+        if latency:
+            time.sleep(latency * 0.25)
+
+        text = self._answer(prompt, outcome, variant)
+        chunks = [text[start:start + STREAM_CHUNK_CHARS] for start in range(0, len(text), STREAM_CHUNK_CHARS)]
+        for chunk in chunks:
+            if latency:
+                time.sleep(latency * 0.75 / len(chunks))
+            yield chunk
+
+    def _answer(self, prompt, outcome, variant):
+        """Produce the text of an answer, or raise the drawn API error."""
+        if outcome == "rate_limited":
+            raise google_exceptions.ResourceExhausted("Resource has been exhausted (local stand-in)")
+        if outcome == "failed":
+            error_class = google_exceptions.ServiceUnavailable if variant < 0.5 else google_exceptions.InternalServerError
+            raise error_class("Simulated model failure (local stand-in)")
+
+        items = re.split(r"\n\s*Item (\S+):\n", prompt)
+        if "JSON array" in prompt and len(items) > 1:
+            # Batch prompt: one answer per "Item <id>:" block
+            payload = [
+                dict(id=item_id, **self._intent_answer(block))
+                for item_id, block in zip(items[1::2], items[2::2])
+            ]
+        elif "intent_category" in prompt:
+            payload = self._intent_answer(prompt)
+            if "draft_response" in prompt and payload["intent_category"] in ("HIGH", "MEDIUM"):
+                payload["draft_response"] = self._response_answer(prompt, payload["products_services"])
+        elif '"subject"' in prompt or "subject line" in prompt:
+            payload = self._response_answer(prompt)
+        else:
+            return "This is a canned answer from the local model stand-in."
+
+        text = json.dumps(payload, indent=2)
+        if outcome == "malformed":
+            text = self._malform(text, variant)
+        return text
+
+    def _content_of(self, prompt):
+        """Pull the Reddit text out of a prompt, falling back to the whole prompt."""
+        match = re.search(r"(?:Content|Comment):\s*(.+?)(?:\n\s*\n|$)", prompt, re.S)
+        return match.group(1).strip() if match else prompt
+
+    def _intent_answer(self, prompt):
+        content = self._content_of(prompt)
+        rng = random.Random(hashlib.sha1(prompt.encode("utf-8")).hexdigest())
+        matched = get_matcher().matched_keywords(content)
+
+        if len(matched) >= 2:
+            category = "HIGH"
+        elif matched:
+            category = rng.choice(["MEDIUM", "MEDIUM", "LOW"])
+        else:
+            category = rng.choice(["NONE", "NONE", "NONE", "LOW"])
+
+        # Treat what follows a buyer phrase as the product ("looking for a standing desk")
+        products = [
+            product.strip()
+            for product in re.findall(
+                r"(?:looking for|recommend|buy|getting|alternative to)\s+(?:an?\s+|the\s+)?([\w\s-]{3,40}?)[?.!,\n]",
+                content, re.I
+            )
+        ]
+
+        return {
+            "intent_category": category,
+            "confidence": round(rng.uniform(0.55, 0.95) if category != "NONE" else rng.uniform(0.7, 0.99), 2),
+            "products_services": products[:3],
+            "needs": [f"Advice on {keyword}" for keyword in matched[:2]],
+            "timeframe": {"HIGH": "immediate", "MEDIUM": "near future"}.get(category, "unknown"),
+            "recommended_response": "Offer a short, helpful comparison and ask about their budget."
+        }
+
+    def _response_answer(self, prompt, products_services=None):
+        products = re.search(r"Products/Services of Interest:\s*(.+)", prompt)
+        if products_services:
+            topic = ", ".join(products_services)
+        elif products and products.group(1).strip() != "Unknown":
+            topic = products.group(1).strip()
+        else:
+            topic = "your question"
+        return {
+            "subject": f"Re: {topic}",
+            "message": (
+                f"Hi! I saw your post about {topic} and thought I could help. "
+                "We've helped a lot of people in the same spot compare their options. "
+                "Would you be open to a quick call this week?"
+            )
+        }
+
+    def _malform(self, text, variant):
+        """Corrupt a JSON answer the way real model output tends to go wrong."""
+        if variant < 0.4:
+            return text[:len(text) // 2]
+        if variant < 0.7:
+            return text.replace('"', "'")
+        return "I'm sorry, I can't classify this content."
+
+def create_backend(backend=None, model_name=None):
+    """
+    Create the model backend selected in config.
+
+    Args:
+        backend (str, optional): "gemini" or "local" (defaults to config.MODEL_BACKEND)
+        model_name (str, optional): Gemini model name (defaults to config.GEMINI_MODEL_NAME)
+
+    Returns:
+        ModelBackend: The backend instance
+    """
+    if backend is None:
+        backend = config.MODEL_BACKEND
+
+    if backend == "local":
+        logger.info("Using the local model stand-in instead of Gemini")
+        local = LocalModelBackend()
+        if model_name:
+            # Keep stand-ins for different models apart, e.g. in cache keys
+            local.name = f"{local.name}:{model_name}"
+        return local
+    if backend == "gemini":
+        return GeminiBackend(model_name)
+    raise ValueError(f"Unknown model backend: {backend}")
@@ -0,0 +1,167 @@
+import logging
+import threading
+import time
+import config
+from model_backend import create_backend
+from structured_output import INTENT_SCHEMA, generate_json
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+class ModelCascade:
+    """
+    Tiered intent classification: cheap models first, the main model last.
+
+    Each tier classifies an item, and the item only moves on to the next
+    tier when the answer is uncertain (confidence inside the uncertain band),
+    falls in a category that always gets a second opinion (HIGH by default,
+    since those are the leads that get messaged), or the call fails. The last
+    tier's answer is final.
+    """
+
+    def __init__(self, tiers, uncertain_min=None, uncertain_max=None, escalate_categories=None):
+        """
+        Initialize the cascade.
+
+        Args:
+            tiers (list): ModelBackends, cheapest first
+            uncertain_min (float, optional): Lower end of the uncertain confidence band
+                (defaults to config.MODEL_CASCADE_UNCERTAIN_MIN)
+            uncertain_max (float, optional): Upper end (exclusive) of the band
+                (defaults to config.MODEL_CASCADE_UNCERTAIN_MAX)
+            escalate_categories (iterable, optional): Categories that are always escalated
+                (defaults to config.MODEL_CASCADE_ESCALATE_CATEGORIES)
+        """
+        self.tiers = list(tiers)
+        self.uncertain_min = config.MODEL_CASCADE_UNCERTAIN_MIN if uncertain_min is None else uncertain_min
+        self.uncertain_max = config.MODEL_CASCADE_UNCERTAIN_MAX if uncertain_max is None else uncertain_max
+        self.escalate_categories = set(
+            config.MODEL_CASCADE_ESCALATE_CATEGORIES if escalate_categories is None else escalate_categories)
+
+        # Name used in cache keys: the result depends on every tier
+        self.name = ">".join(tier.name for tier in self.tiers)
+
+        self._lock = threading.Lock()
+        self._stats = [
+            {"model": tier.name, "calls": 0, "escalated": 0, "failures": 0, "total_latency": 0.0}
+            for tier in self.tiers
+        ]
+
+    def needs_escalation(self, analysis, tier):
+        """
+        Decide whether a tier's answer should be re-scored by the next tier.
+
+        Args:
+            analysis (dict): Parsed intent analysis from the tier
+            tier (int): Index of the tier that produced it
+
+        Returns:
+            bool: True if a later tier should classify the item
+        """
+        if tier >= len(self.tiers) - 1:
+            return False
+        confidence = analysis.get("confidence", 0.0)
+        return (analysis.get("intent_category") in self.escalate_categories
+                or self.uncertain_min <= confidence < self.uncertain_max)
+
+    def record(self, tier, latency, outcome):
+        """
+        Count a classification made outside classify(), e.g. a batch call.
+
+        Args:
+            tier (int): Tier index
+            latency (float): Seconds the call took
+            outcome (str): "final", "escalated" or "failed"
+        """
+        with self._lock:
+            stats = self._stats[tier]
+            stats["calls"] += 1
+            stats["total_latency"] += latency
+            if outcome == "escalated":
+                stats["escalated"] += 1
+            elif outcome == "failed":
+                stats["failures"] += 1
+
+    def classify(self, executor, prompt, start_tier=0, previous=None, stop=None):
+        """
+        Classify a prompt, escalating through the tiers as needed.
+
+        Args:
+            executor (ModelExecutor): Executor to make the calls through
+            prompt (str): Intent detection prompt
+            start_tier (int): First tier to ask
+            previous (dict, optional): Answer of the tier before start_tier, if any
+            stop (callable, optional): Early stop check for streamed answers (see generate_json)
+
+        Returns:
+            tuple: (parsed analysis, name of the model that produced it, the
+                escalated answer as {model, intent_category, confidence} or None)
+
+        Raises:
+            Exception: The last tier's error if it fails
+        """
+        escalated_from = previous
+        for tier in range(start_tier, len(self.tiers)):
+            backend = self.tiers[tier]
+            started = time.monotonic()
+            try:
+                analysis, _ = generate_json(executor, backend, prompt, INTENT_SCHEMA, "intent", stop=stop)
+            except Exception as e:
+                self.record(tier, time.monotonic() - started, "failed")
+                if tier == len(self.tiers) - 1:
+                    raise
+                logger.warning(f"Cascade tier {backend.name} failed ({str(e)}), escalating")
+                continue
+
+            if not self.needs_escalation(analysis, tier):
+                self.record(tier, time.monotonic() - started, "final")
+                return analysis, backend.name, escalated_from
+
+            self.record(tier, time.monotonic() - started, "escalated")
+            escalated_from = {
+                "model": backend.name,
+                "intent_category": analysis.get("intent_category"),
+                "confidence": analysis.get("confidence")
+            }
+
+    def stats(self):
+        """Get per-tier call, escalation and latency counters."""
+        with self._lock:
+            return [
+                {
+                    "model": stats["model"],
+                    "calls": stats["calls"],
+                    "escalated": stats["escalated"],
+                    "failures": stats["failures"],
+                    "escalation_rate": round(stats["escalated"] / stats["calls"], 3) if stats["calls"] else 0.0,
+                    "avg_latency_seconds": (round(stats["total_latency"] / stats["calls"], 3)
+                                            if stats["calls"] else 0.0)
+                }
+                for stats in self._stats
+            ]
+
+def create_cascade(main_backend, tier_models=None):
+    """
+    Build the cascade configured in config, ending with the main model.
+
+    Args:
+        main_backend (ModelBackend): The main (strongest) model, used as the last tier
+        tier_models (list, optional): Cheaper model names, cheapest first
+            (defaults to config.MODEL_CASCADE_TIERS)
+
+    Returns:
+        ModelCascade: The cascade, or None if no cheaper tiers are configured
+    """
+    if tier_models is None:
+        tier_models = config.MODEL_CASCADE_TIERS
+
+    tiers = [create_backend(model_name=model_name) for model_name in tier_models]
+    if not tiers:
+        return None
+
+    logger.info(f"Intent detection cascade: {' > '.join([tier.name for tier in tiers] + [main_backend.name])}")
+    return ModelCascade(tiers + [main_backend])
@@ -0,0 +1,257 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from google.api_core import exceptions as google_exceptions
+import config
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Errors worth retrying; the first two mean the quota is exhausted
+RATE_LIMIT_ERRORS = (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)
+RETRYABLE_ERRORS = RATE_LIMIT_ERRORS + (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded
+)
+
+class AdaptiveConcurrencyLimit:
+    """
+    Concurrency limit for model calls, adjusted with AIMD.
+
+    Every fast successful call raises the limit by 1/limit (about +1 per
+    round of calls); a 429 halves it, and a call slower than the latency
+    target shrinks it by 10%. Decreases are applied at most once per latency
+    target interval, so a burst of failures from calls that were already in
+    flight only counts once.
+    """
+
+    def __init__(self, initial=None, minimum=None, maximum=None, latency_target=None):
+        self.minimum = max(1, config.MODEL_MIN_CONCURRENCY if minimum is None else minimum)
+        self.maximum = max(self.minimum, config.MODEL_MAX_CONCURRENCY if maximum is None else maximum)
+        initial = config.MODEL_INITIAL_CONCURRENCY if initial is None else initial
+        self.latency_target = config.MODEL_LATENCY_TARGET_SECONDS if latency_target is None else latency_target
+
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout=None):
+        """
+        Wait for a free slot.
+
+        Args:
+            timeout (float, optional): Seconds to wait at most
+
+        Returns:
+            bool: True if a slot was taken, False on timeout
+        """
+        with self._condition:
+            acquired = self._condition.wait_for(lambda: self.in_flight < int(self.limit), timeout)
+            if acquired:
+                self.in_flight += 1
+            return acquired
+
+    def release(self, latency, outcome):
+        """
+        Free a slot and adapt the limit to the call's outcome.
+
+        Args:
+            latency (float): Seconds the call took
+            outcome (str): "ok", "rate_limited" or "error"
+        """
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+
+            if outcome == "rate_limited":
+                self._decrease(now, 0.5)
+            elif outcome == "ok" and latency > self.latency_target:
+                self._decrease(now, 0.9)
+            elif outcome == "ok":
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+            self._condition.notify_all()
+
+    def _decrease(self, now, factor):
+        if now - self._last_decrease < self.latency_target:
+            return
+        self._last_decrease = now
+        old_limit = self.limit
+        self.limit = max(self.minimum, self.limit * factor)
+        logger.info(f"Model concurrency limit lowered from {old_limit:.1f} to {self.limit:.1f}")
+
+class ModelExecutor:
+    """
+    Runs model calls concurrently under an adaptive limit.
+
+    Each call gets retries with full-jitter exponential backoff on 429/5xx
+    errors and an overall deadline. A call that misses its deadline is
+    abandoned: the caller gets DeadlineExceeded right away, and the call's
+    slot is released only when the underlying request actually finishes.
+    """
+
+    def __init__(self, max_concurrency=None, max_retries=None, backoff_base=None, backoff_max=None,
+                 deadline_seconds=None, limit=None):
+        self.limit = limit or AdaptiveConcurrencyLimit(maximum=max_concurrency)
+        self.max_retries = config.MODEL_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = config.MODEL_BACKOFF_BASE_SECONDS if backoff_base is None else backoff_base
+        self.backoff_max = config.MODEL_BACKOFF_MAX_SECONDS if backoff_max is None else backoff_max
+        self.deadline_seconds = config.MODEL_CALL_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds
+
+        # Abandoned calls keep their thread until they finish, so allow some headroom
+        self._call_pool = ThreadPoolExecutor(max_workers=self.limit.maximum * 2, thread_name_prefix="model-call")
+        self._lock = threading.Lock()
+
+        # Counters
+        self.calls = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failures = 0
+        self.deadline_exceeded = 0
+        self.total_latency = 0.0
+
+    def _record(self, future, started):
+        """Done callback for a call: release its slot and update the counters."""
+        latency = time.monotonic() - started
+        error = future.exception()
+        if error is None:
+            outcome = "ok"
+        elif isinstance(error, RATE_LIMIT_ERRORS):
+            outcome = "rate_limited"
+        else:
+            outcome = "error"
+
+        self.limit.release(latency, outcome)
+        with self._lock:
+            self.calls += 1
+            self.total_latency += latency
+            if outcome == "rate_limited":
+                self.rate_limited += 1
+            elif outcome == "error":
+                self.failures += 1
+
+    def _deadline_exceeded(self, message):
+        with self._lock:
+            self.deadline_exceeded += 1
+        return google_exceptions.DeadlineExceeded(message)
+
+    def call(self, func, *args, deadline=None, **kwargs):
+        """
+        Call a function that makes one model request, with retries and a deadline.
+
+        Args:
+            func (callable): The request, e.g. backend.generate_content
+            *args, **kwargs: Arguments for func
+            deadline (float, optional): Seconds for all attempts together
+                (defaults to config.MODEL_CALL_DEADLINE_SECONDS)
+
+        Returns:
+            The return value of func
+
+        Raises:
+            google.api_core.exceptions.DeadlineExceeded: If the deadline passes
+            Exception: The last error once retries are exhausted, or any non-retryable error
+        """
+        deadline_at = time.monotonic() + (self.deadline_seconds if deadline is None else deadline)
+        attempt = 0
+
+        while True:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0 or not self.limit.acquire(timeout=remaining):
+                raise self._deadline_exceeded("No model capacity before the call deadline")
+
+            started = time.monotonic()
+            future = self._call_pool.submit(func, *args, **kwargs)
+            future.add_done_callback(lambda done, started=started: self._record(done, started))
+
+            try:
+                return future.result(timeout=max(deadline_at - time.monotonic(), 0))
+            except FutureTimeoutError:
+                raise self._deadline_exceeded("Model call exceeded its deadline")
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+
+                # Full jitter: sleep a random share of the exponential backoff
+                backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                if time.monotonic() + backoff >= deadline_at:
+                    raise
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                logger.warning(f"Model call failed ({type(e).__name__}), retry {attempt} in {backoff:.1f}s")
+                time.sleep(backoff)
+
+    def generate_content(self, backend, prompt, deadline=None, response_schema=None):
+        """
+        Generate content with a model backend through the executor.
+
+        Args:
+            backend (ModelBackend): The backend to call
+            prompt (str): The prompt
+            deadline (float, optional): Seconds for all attempts together
+            response_schema (dict, optional): Schema for structured output mode
+
+        Returns:
+            The backend's response
+        """
+        if response_schema is None:
+            return self.call(backend.generate_content, prompt, deadline=deadline)
+        return self.call(backend.generate_content, prompt, deadline=deadline, response_schema=response_schema)
+
+    def map(self, func, items):
+        """
+        Apply a function to every item concurrently, keeping the input order.
+
+        The function is expected to make its model requests through this
+        executor, so the adaptive limit, not the number of worker threads,
+        decides how many requests are in flight.
+
+        Args:
+            func (callable): Function taking one item
+            items (iterable): Items to process
+
+        Returns:
+            list: Results in the same order as items
+        """
+        items = list(items)
+        if len(items) <= 1:
+            return [func(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=min(len(items), self.limit.maximum),
+                                thread_name_prefix="model-task") as pool:
+            return list(pool.map(func, items))
+
+    def stats(self):
+        """Get the current limit and call counters."""
+        with self._lock:
+            return {
+                "concurrency_limit": round(self.limit.limit, 2),
+                "in_flight": self.limit.in_flight,
+                "calls": self.calls,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "failures": self.failures,
+                "deadline_exceeded": self.deadline_exceeded,
+                "avg_latency_seconds": round(self.total_latency / self.calls, 3) if self.calls else 0.0
+            }
+
+# One executor for the whole process, since every model call shares the same quota
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    """Get the process-wide ModelExecutor, creating it if needed."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ModelExecutor()
+        return _executor
@@ -57,4 +57,74 @@ class MonitoringSession(Base):
     
     # Foreign key to RedditAccount
     reddit_account_id = Column(Integer, ForeignKey("reddit_accounts.id"))
-    reddit_account = relationship("RedditAccount", back_populates="monitoring_sessions") 
\ No newline at end of file
+    reddit_account = relationship("RedditAccount", back_populates="monitoring_sessions")
+    
+    # Relationship with SubredditCursor
+    subreddit_cursors = relationship("SubredditCursor", back_populates="monitoring_session", cascade="all, delete-orphan")
+
+class SubredditCursor(Base):
+    __tablename__ = "subreddit_cursors"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    subreddit = Column(String, index=True)  # Stored lowercase
+    
+    # High-water mark: newest post seen in the last scrape
+    last_fullname = Column(String, nullable=True)  # e.g. t3_abc123
+    last_created_utc = Column(Float, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Foreign key to MonitoringSession (null for cycles run outside a session, e.g. the CLI)
+    monitoring_session_id = Column(Integer, ForeignKey("monitoring_sessions.id"), nullable=True, index=True)
+    monitoring_session = relationship("MonitoringSession", back_populates="subreddit_cursors")
+
+class SeenItem(Base):
+    __tablename__ = "seen_items"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    fullname = Column(String, unique=True, index=True)  # t3_ for posts, t1_ for comments
+    content_hash = Column(String)  # Hash of the analyzed text, used to detect edits
+    intent_category = Column(String, nullable=True)  # Intent the item was analyzed as
+    message_sent = Column(Boolean, default=False)  # Whether a DM was sent in response to it
+    first_seen = Column(DateTime, default=datetime.utcnow)
+    last_seen = Column(DateTime, default=datetime.utcnow, index=True)
+
+class IntentCacheEntry(Base):
+    __tablename__ = "intent_cache"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String, unique=True, index=True)  # model:prompt version:text hash
+    prompt_version = Column(String, index=True)  # Hash of the prompt template, used for invalidation
+    model_name = Column(String)
+    result = Column(Text)  # JSON-encoded intent analysis
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    last_used = Column(DateTime, default=datetime.utcnow, index=True)
+
+class CycleCheckpoint(Base):
+    __tablename__ = "cycle_checkpoints"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    parameters = Column(Text)  # JSON-encoded run_monitoring_cycle arguments, reused on resume
+    status = Column(String, default="running", index=True)  # running, completed or failed
+    results = Column(Text, nullable=True)  # JSON-encoded cycle results, once completed or failed
+    started_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+    
+    # Foreign key to MonitoringSession (null for cycles run outside a session, e.g. the CLI)
+    monitoring_session_id = Column(Integer, ForeignKey("monitoring_sessions.id"), nullable=True, index=True)
+    
+    # Relationship with CycleCheckpointItem
+    items = relationship("CycleCheckpointItem", back_populates="checkpoint", cascade="all, delete-orphan")
+
+class CycleCheckpointItem(Base):
+    __tablename__ = "cycle_checkpoint_items"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    item_key = Column(String, index=True)  # post:<fullname> or response:<fullname>
+    stage = Column(String)  # scraped, analyzed, responded or sent
+    data = Column(Text)  # JSON-encoded post (with its analysis) or response
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Foreign key to CycleCheckpoint
+    checkpoint_id = Column(Integer, ForeignKey("cycle_checkpoints.id"), index=True)
+    checkpoint = relationship("CycleCheckpoint", back_populates="items")
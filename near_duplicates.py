@@ -0,0 +1,168 @@
+import logging
+import re
+import threading
+import zlib
+from collections import OrderedDict
+import numpy as np
+import config
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# MinHash parameters: 128 hash functions split into 32 LSH bands of 4 rows.
+# Pairs with Jaccard similarity 0.5 become candidates ~87% of the time, 0.7+ almost always.
+NUM_PERMUTATIONS = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+_PRIME = np.uint64(4294967311)  # Smallest prime above 2^32
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, 2 ** 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+_B = _rng.randint(0, 2 ** 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+def shingles(text, size=3):
+    """Word shingles of a text, lowercased."""
+    tokens = TOKEN_PATTERN.findall((text or "").lower())
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set(), len(tokens)
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}, len(tokens)
+
+def minhash(text):
+    """
+    MinHash signature of a text's word 3-shingles.
+
+    Returns:
+        tuple: (signature as a uint64 array, or None for empty text; number of tokens)
+    """
+    text_shingles, token_count = shingles(text)
+    if not text_shingles:
+        return None, token_count
+
+    hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in text_shingles),
+                         dtype=np.uint64, count=len(text_shingles))
+    # (a * x + b) mod p for every hash function and shingle, minimized over shingles
+    signature = ((np.outer(_A, hashes) + _B[:, None]) % _PRIME).min(axis=1)
+    return signature, token_count
+
+def _bands(signature):
+    return [(band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes()) for band in range(BANDS)]
+
+class NearDuplicateIndex:
+    """
+    MinHash LSH index for finding reworded or cross-posted copies of analyzed text.
+
+    Signatures are bucketed per LSH band, so a lookup only compares against
+    entries sharing at least one band; candidates are then checked against
+    the similarity threshold using the estimated Jaccard similarity of their
+    word 3-shingles. The index keeps the most recently used entries up to
+    its size limit.
+    """
+
+    def __init__(self, threshold=None, min_tokens=None, max_entries=None):
+        """
+        Initialize an empty index.
+
+        Args:
+            threshold (float, optional): Minimum estimated Jaccard similarity for a duplicate
+                (defaults to config.NEAR_DUPLICATE_THRESHOLD)
+            min_tokens (int, optional): Shorter texts are never matched (defaults to config.NEAR_DUPLICATE_MIN_TOKENS)
+            max_entries (int, optional): Entries kept (defaults to config.NEAR_DUPLICATE_INDEX_SIZE)
+        """
+        self.threshold = config.NEAR_DUPLICATE_THRESHOLD if threshold is None else threshold
+        self.min_tokens = config.NEAR_DUPLICATE_MIN_TOKENS if min_tokens is None else min_tokens
+        self.max_entries = config.NEAR_DUPLICATE_INDEX_SIZE if max_entries is None else max_entries
+
+        self._entries = OrderedDict()  # key -> (signature, payload)
+        self._buckets = {}  # (band, band bytes) -> set of keys
+        self._lock = threading.Lock()
+
+        # Counters
+        self.lookups = 0
+        self.matches = 0
+
+    def signature(self, text):
+        """MinHash signature of a text, or None if it is too short to match reliably."""
+        signature, token_count = minhash(text)
+        return signature if token_count >= self.min_tokens else None
+
+    def find(self, text=None, signature=None, exclude=None):
+        """
+        Find the most similar indexed entry at or above the threshold.
+
+        Args:
+            text (str, optional): Text to look up
+            signature (numpy.ndarray, optional): Precomputed signature, instead of text
+            exclude (str, optional): Key to skip, e.g. the looked-up item's own earlier entry
+
+        Returns:
+            tuple: (key, payload, similarity) of the best entry, or None
+        """
+        if signature is None:
+            signature = self.signature(text)
+        if signature is None:
+            return None
+
+        with self._lock:
+            self.lookups += 1
+            candidates = set()
+            for bucket in _bands(signature):
+                candidates |= self._buckets.get(bucket, set())
+
+            best = None
+            candidates.discard(exclude)
+            for key in candidates:
+                other, payload = self._entries[key]
+                similarity = float(np.mean(signature == other))
+                if similarity >= self.threshold and (best is None or similarity > best[2]):
+                    best = (key, payload, round(similarity, 3))
+
+            if best is not None:
+                self.matches += 1
+                self._entries.move_to_end(best[0])
+            return best
+
+    def add(self, key, text=None, payload=None, signature=None):
+        """
+        Index a text under a key.
+
+        Args:
+            key (str): Identifier, e.g. a Reddit fullname
+            text (str, optional): Text to index
+            payload: Anything to return with matches
+            signature (numpy.ndarray, optional): Precomputed signature, instead of text
+        """
+        if signature is None:
+            signature = self.signature(text)
+        if signature is None:
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (signature, payload)
+            for bucket in _bands(signature):
+                self._buckets.setdefault(bucket, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        """Drop a key from the index; caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for bucket in _bands(entry[0]):
+            keys = self._buckets.get(bucket)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._buckets[bucket]
+
+    def stats(self):
+        """Get lookup counters and size."""
+        with self._lock:
+            return {"entries": len(self._entries), "lookups": self.lookups, "matches": self.matches}
@@ -0,0 +1,185 @@
+import logging
+import queue
+import threading
+import time
+import config
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's input; each worker takes one and exits
+_DONE = object()
+
+class Stage:
+    """
+    One step of a Pipeline: a function applied to each input item by a pool of worker threads.
+
+    The function returns an iterable of items for the next stage (or None to
+    pass nothing on); a generator's items are passed on as they are yielded.
+    Inputs wait in a bounded queue, so a stage that falls behind blocks the
+    stage feeding it instead of buffering the whole cycle.
+    """
+
+    def __init__(self, name, func, workers=1, queue_size=None):
+        """
+        Initialize the stage.
+
+        Args:
+            name (str): Name used in logs and stats
+            func (callable): Function of one item returning an iterable of output items, or None
+            workers (int): Worker threads
+            queue_size (int, optional): Capacity of the input queue (defaults to config.PIPELINE_QUEUE_SIZE)
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+        self.queue = queue.Queue(maxsize=config.PIPELINE_QUEUE_SIZE if queue_size is None else queue_size)
+
+        self._lock = threading.Lock()
+        self._running = 0
+        self._started = None
+        self._finished = None
+
+        # Counters
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.idle_seconds = 0.0  # Waiting for input
+        self.blocked_seconds = 0.0  # Waiting for room in the next stage's queue
+        self._depth_total = 0
+        self._depth_samples = 0
+        self.max_queue_depth = 0
+
+    def _add(self, **counters):
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def _get(self):
+        """Take the next input, recording the queue depth and the time spent waiting."""
+        depth = self.queue.qsize()
+        waited_from = time.monotonic()
+        item = self.queue.get()
+        with self._lock:
+            self.idle_seconds += time.monotonic() - waited_from
+            self._depth_total += depth
+            self._depth_samples += 1
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+        return item
+
+    def _work(self, next_stage):
+        """Worker loop: process inputs until the end marker, then close the next stage if last out."""
+        while True:
+            item = self._get()
+            if item is _DONE:
+                break
+
+            # Outputs are handed on as they are produced, so a generator's first items
+            # reach the next stage while it is still working on the rest
+            started = time.monotonic()
+            blocked = 0.0
+            outputs = 0
+            errors = 0
+            try:
+                for output in self.func(item) or ():
+                    if next_stage is not None:
+                        waited_from = time.monotonic()
+                        next_stage.queue.put(output)
+                        blocked += time.monotonic() - waited_from
+                    outputs += 1
+            except Exception as e:
+                logger.error(f"Pipeline stage {self.name} failed on an item: {str(e)}")
+                errors = 1
+            self._add(items_in=1, items_out=outputs, errors=errors, blocked_seconds=blocked,
+                      busy_seconds=time.monotonic() - started - blocked)
+
+        with self._lock:
+            self._running -= 1
+            last = self._running == 0
+            if last:
+                self._finished = time.monotonic()
+        if last and next_stage is not None:
+            for _ in range(next_stage.workers):
+                next_stage.queue.put(_DONE)
+
+    def start(self, next_stage):
+        """Start the worker threads, feeding outputs to next_stage (None for the last stage)."""
+        self._started = time.monotonic()
+        self._running = self.workers
+        threads = [threading.Thread(target=self._work, args=(next_stage,), name=f"pipeline-{self.name}-{index}",
+                                    daemon=True)
+                   for index in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def stats(self):
+        """Get throughput, queue depth, idle and backpressure counters."""
+        with self._lock:
+            elapsed = ((self._finished or time.monotonic()) - self._started) if self._started else 0.0
+            return {
+                "workers": self.workers,
+                "items_in": self.items_in,
+                "items_out": self.items_out,
+                "errors": self.errors,
+                "throughput_per_second": round(self.items_in / elapsed, 3) if elapsed else 0.0,
+                "avg_queue_depth": round(self._depth_total / self._depth_samples, 2) if self._depth_samples else 0.0,
+                "max_queue_depth": self.max_queue_depth,
+                "busy_seconds": round(self.busy_seconds, 2),
+                "idle_seconds": round(self.idle_seconds, 2),
+                "blocked_seconds": round(self.blocked_seconds, 2),
+                "utilization": round(self.busy_seconds / (elapsed * self.workers), 3) if elapsed else 0.0
+            }
+
+class Pipeline:
+    """
+    A chain of Stages connected by bounded queues.
+
+    Every stage runs at once on its own workers, so items flow through as
+    soon as the previous stage hands them over and I/O in different stages
+    overlaps. When a stage's queue is full, the stage before it waits
+    (backpressure), which keeps memory bounded by the queue sizes.
+    """
+
+    def __init__(self, stages):
+        """
+        Initialize the pipeline.
+
+        Args:
+            stages (list): Stages, in order
+        """
+        self.stages = list(stages)
+
+    def run(self, items):
+        """
+        Feed items to the first stage and wait until every stage has drained.
+
+        Args:
+            items (iterable): Inputs of the first stage
+
+        Returns:
+            dict: Stats per stage name (see Stage.stats)
+        """
+        threads = []
+        for stage, next_stage in zip(self.stages, self.stages[1:] + [None]):
+            threads.extend(stage.start(next_stage))
+
+        first = self.stages[0]
+        for item in items:
+            first.queue.put(item)
+        for _ in range(first.workers):
+            first.queue.put(_DONE)
+
+        for thread in threads:
+            thread.join()
+
+        return self.stats()
+
+    def stats(self):
+        """Get the stats of every stage, by name."""
+        return {stage.name: stage.stats() for stage in self.stages}
@@ -0,0 +1,281 @@
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+import zlib
+import numpy as np
+import config
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9$']+")
+
+def featurize(texts, n_features):
+    """
+    Hash word unigrams and bigrams of each text into a sparse feature matrix.
+
+    Args:
+        texts (list): Texts to featurize
+        n_features (int): Size of the hashed feature space
+
+    Returns:
+        tuple: (rows, cols, values) NumPy arrays in coordinate format; each
+            row is L2-normalized
+    """
+    rows, cols, values = [], [], []
+
+    for row, text in enumerate(texts):
+        tokens = TOKEN_PATTERN.findall((text or "").lower())
+        grams = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+        if not grams:
+            continue
+
+        indices = {}
+        for gram in grams:
+            index = zlib.crc32(gram.encode("utf-8")) % n_features
+            indices[index] = indices.get(index, 0) + 1
+
+        norm = sum(count * count for count in indices.values()) ** 0.5
+        rows.extend([row] * len(indices))
+        cols.extend(indices.keys())
+        values.extend(count / norm for count in indices.values())
+
+    return (
+        np.asarray(rows, dtype=np.int64),
+        np.asarray(cols, dtype=np.int64),
+        np.asarray(values, dtype=np.float64)
+    )
+
+def _sigmoid(scores):
+    return 1.0 / (1.0 + np.exp(-np.clip(scores, -30, 30)))
+
+class PreClassifier:
+    """
+    Logistic regression over hashed word n-grams, distilled from Gemini labels.
+
+    It predicts whether Gemini would find any buyer intent (LOW or above) in
+    a text. Items scoring below the threshold are marked NONE locally and
+    never reach the model. Scoring is vectorized over a whole batch.
+    """
+
+    def __init__(self, weights, bias=0.0, metadata=None):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.n_features = len(self.weights)
+        self.metadata = metadata or {}
+
+    def score(self, texts):
+        """
+        Score texts with the probability that they carry buyer intent.
+
+        Args:
+            texts (list): Texts to score
+
+        Returns:
+            numpy.ndarray: One probability per text
+        """
+        if not texts:
+            return np.zeros(0)
+        rows, cols, values = featurize(texts, self.n_features)
+        logits = np.bincount(rows, weights=self.weights[cols] * values, minlength=len(texts)) + self.bias
+        return _sigmoid(logits)
+
+    @classmethod
+    def train(cls, texts, labels, n_features=None, epochs=300, learning_rate=0.1, l2=1e-6):
+        """
+        Fit the model with full-batch Adam on class-balanced logistic loss.
+
+        Args:
+            texts (list): Training texts
+            labels (list): 1 where Gemini found buyer intent, else 0
+            n_features (int, optional): Hashed feature space size (defaults to config.PRECLASSIFIER_FEATURES)
+            epochs (int): Gradient steps
+            learning_rate (float): Adam step size
+            l2 (float): L2 regularization strength
+
+        Returns:
+            PreClassifier: The trained model
+        """
+        if n_features is None:
+            n_features = config.PRECLASSIFIER_FEATURES
+
+        labels = np.asarray(labels, dtype=np.float64)
+        count = len(labels)
+        rows, cols, values = featurize(texts, n_features)
+
+        # Weight the classes equally, since intent is much rarer than no intent
+        positives = max(labels.sum(), 1.0)
+        negatives = max(count - labels.sum(), 1.0)
+        sample_weights = np.where(labels == 1, count / (2 * positives), count / (2 * negatives))
+
+        weights = np.zeros(n_features)
+        bias = 0.0
+        first_moment, second_moment = np.zeros(n_features), np.zeros(n_features)
+        bias_moments = [0.0, 0.0]
+        beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+
+        for step in range(1, epochs + 1):
+            logits = np.bincount(rows, weights=weights[cols] * values, minlength=count) + bias
+            error = (_sigmoid(logits) - labels) * sample_weights / count
+
+            gradient = np.bincount(cols, weights=values * error[rows], minlength=n_features) + l2 * weights
+            bias_gradient = error.sum()
+
+            first_moment = beta1 * first_moment + (1 - beta1) * gradient
+            second_moment = beta2 * second_moment + (1 - beta2) * gradient ** 2
+            weights -= learning_rate * (first_moment / (1 - beta1 ** step)) / (
+                np.sqrt(second_moment / (1 - beta2 ** step)) + epsilon)
+
+            bias_moments[0] = beta1 * bias_moments[0] + (1 - beta1) * bias_gradient
+            bias_moments[1] = beta2 * bias_moments[1] + (1 - beta2) * bias_gradient ** 2
+            bias -= learning_rate * (bias_moments[0] / (1 - beta1 ** step)) / (
+                np.sqrt(bias_moments[1] / (1 - beta2 ** step)) + epsilon)
+
+        return cls(weights, bias, {"training_items": count, "training_positives": int(labels.sum())})
+
+    def save(self, path):
+        """Save the model to a .npz file."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, metadata=json.dumps(self.metadata))
+
+    @classmethod
+    def load(cls, path):
+        """Load a model saved with save()."""
+        with np.load(path) as data:
+            return cls(data["weights"], float(data["bias"]), json.loads(str(data["metadata"])))
+
+def load_preclassifier(path=None):
+    """
+    Load the trained pre-classifier.
+
+    Args:
+        path (str, optional): Model file (defaults to config.PRECLASSIFIER_MODEL_PATH)
+
+    Returns:
+        PreClassifier: The model, or None if it hasn't been trained yet
+    """
+    if path is None:
+        path = config.PRECLASSIFIER_MODEL_PATH
+
+    if not os.path.exists(path):
+        logger.warning(f"No pre-classifier model at {path}; run preclassifier.py to train one")
+        return None
+
+    try:
+        model = PreClassifier.load(path)
+        logger.info(f"Loaded pre-classifier trained on {model.metadata.get('training_items', '?')} items")
+        return model
+    except Exception as e:
+        logger.error(f"Error loading pre-classifier: {str(e)}")
+        return None
+
+def load_labeled_items(pattern="data/analyzed_data_*.json"):
+    """
+    Collect Gemini-labeled posts and comments from saved cycle results.
+
+    Items without a real model analysis (failures, skipped or pre-filtered
+    items) are left out, and duplicate texts are kept once.
+
+    Args:
+        pattern (str): Glob for analyzed_data files
+
+    Returns:
+        tuple: (texts, labels) with label 1 for LOW intent or above
+    """
+    texts, labels, seen = [], [], set()
+
+    def add(text, analysis):
+        if not analysis or not analysis.get("raw_analysis") or text in seen:
+            return
+        seen.add(text)
+        texts.append(text)
+        labels.append(0 if analysis.get("intent_category", "NONE") == "NONE" else 1)
+
+    for path in sorted(glob.glob(pattern)):
+        try:
+            with open(path, "r") as f:
+                posts = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping {path}: {str(e)}")
+            continue
+
+        for post in posts:
+            add(f"{post.get('title', '')} {post.get('content', '')}", post.get("intent_analysis"))
+            for comment in post.get("comments", []):
+                add(comment.get("content", ""), comment.get("intent_analysis"))
+
+    return texts, labels
+
+def recall_cost_report(scores, labels, thresholds=(0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7)):
+    """
+    Tabulate, per threshold, how many intent items survive and how many calls are still made.
+
+    Args:
+        scores (numpy.ndarray): Pre-classifier scores
+        labels (list): Gemini labels (1 = intent)
+        thresholds (iterable): Thresholds to evaluate
+
+    Returns:
+        list: Dicts with threshold, recall and llm_call_share
+    """
+    labels = np.asarray(labels)
+    positives = max(int(labels.sum()), 1)
+    report = []
+    for threshold in thresholds:
+        passed = scores >= threshold
+        report.append({
+            "threshold": threshold,
+            "recall": round(float((passed & (labels == 1)).sum()) / positives, 3),
+            "llm_call_share": round(float(passed.mean()) if len(passed) else 0.0, 3)
+        })
+    return report
+
+def main():
+    """Retrain the pre-classifier from stored analyses and report the recall/cost tradeoff."""
+    parser = argparse.ArgumentParser(description="Train the local intent pre-classifier")
+    parser.add_argument("--data", default="data/analyzed_data_*.json", help="Glob of stored cycle results")
+    parser.add_argument("--output", default=config.PRECLASSIFIER_MODEL_PATH, help="Where to save the model")
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--report-only", action="store_true", help="Evaluate the saved model without retraining")
+    args = parser.parse_args()
+
+    texts, labels = load_labeled_items(args.data)
+    if not texts:
+        logger.error(f"No labeled items found in {args.data}")
+        return
+    logger.info(f"Loaded {len(texts)} labeled items ({sum(labels)} with buyer intent)")
+
+    # Hold out a fifth of the items, chosen by text hash so the split is stable across runs
+    holdout = np.array([zlib.crc32(text.encode("utf-8")) % 5 == 0 for text in texts])
+    labels = np.asarray(labels)
+
+    if args.report_only:
+        model = load_preclassifier(args.output)
+        if model is None:
+            return
+        test_texts, test_labels = texts, labels
+    else:
+        train_texts = [text for text, held in zip(texts, holdout) if not held]
+        test_texts = [text for text, held in zip(texts, holdout) if held]
+        test_labels = labels[holdout]
+
+        model = PreClassifier.train(train_texts, labels[~holdout], epochs=args.epochs)
+        model.save(args.output)
+        logger.info(f"Saved pre-classifier to {args.output}")
+
+    scores = model.score(test_texts)
+    logger.info(f"Evaluated on {len(test_texts)} items ({int(test_labels.sum())} with buyer intent)")
+    for row in recall_cost_report(scores, test_labels):
+        marker = " (configured)" if abs(row["threshold"] - config.PRECLASSIFIER_THRESHOLD) < 1e-9 else ""
+        logger.info(f"Threshold {row['threshold']:.2f}: recall {row['recall']:.1%}, "
+                    f"LLM calls {row['llm_call_share']:.1%}{marker}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import logging
+import re
+import config
+from keyword_matcher import get_matcher
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+SENTENCE_PATTERN = re.compile(r"[^.!?\n]+(?:[.!?]+|\n+|$)")
+GAP_MARKER = "[...]"
+
+def estimate_tokens(text):
+    """Rough token count for English text (about four characters per token)."""
+    return (len(text or "") + 3) // 4
+
+def _sentences(text):
+    """Split text into (start, end) spans of sentences or lines."""
+    return [(match.start(), match.end()) for match in SENTENCE_PATTERN.finditer(text) if match.group().strip()]
+
+def fit_to_budget(text, budget=None, keywords=None, window=None):
+    """
+    Trim text to a token budget, keeping the parts that carry buying signal.
+
+    Text within the budget is returned unchanged. Longer text first keeps
+    sentences with a buyer intent keyword or a question, plus `window`
+    neighbouring sentences on each side, then fills the remaining budget with
+    the other sentences in reading order, starting from the opening. Kept
+    sentences are joined in their original order, with a marker where text
+    was cut. If the first sentence picked is over the budget on its own, its
+    beginning is kept and the rest of the budget still goes to the others.
+
+    Args:
+        text (str): Post or comment text
+        budget (int, optional): Token budget (defaults to config.PROMPT_CONTENT_TOKEN_BUDGET; 0 disables trimming)
+        keywords (iterable or KeywordMatcher, optional): Keywords marking relevant sentences
+            (defaults to config.BUYER_INTENT_KEYWORDS)
+        window (int, optional): Neighbouring sentences kept around each relevant one
+            (defaults to config.PROMPT_WINDOW_SENTENCES)
+
+    Returns:
+        str: The text, trimmed to roughly the budget
+    """
+    if budget is None:
+        budget = config.PROMPT_CONTENT_TOKEN_BUDGET
+    if window is None:
+        window = config.PROMPT_WINDOW_SENTENCES
+
+    original_tokens = estimate_tokens(text)
+    if not budget or original_tokens <= budget:
+        return text
+
+    spans = _sentences(text)
+    if not spans:
+        return text[:budget * 4]
+
+    # Sentences holding a keyword match or a question
+    match_starts = [match["start"] for match in get_matcher(keywords).find_all(text)]
+    relevant = set()
+    for index, (start, end) in enumerate(spans):
+        if text[start:end].rstrip().endswith("?") or any(start <= offset < end for offset in match_starts):
+            relevant.update(range(max(0, index - window), min(len(spans), index + window + 1)))
+
+    priority = sorted(relevant) + [index for index in range(len(spans)) if index not in relevant]
+    # An opening sentence over budget is cut to its share, leaving room for the other relevant ones
+    share = max(budget // max(len(relevant), 1), 1)
+
+    kept, used = {}, 0  # index -> (sentence text, whether it was cut short)
+    for index in priority:
+        start, end = spans[index]
+        piece = text[start:end].strip()
+        cost = estimate_tokens(piece)
+        if used + cost > budget:
+            if kept:
+                continue
+            piece, cost = piece[:share * 4].strip(), share
+            kept[index] = (piece, True)
+        else:
+            kept[index] = (piece, False)
+        used += cost
+
+    pieces, previous, cut = [], None, False
+    for index in sorted(kept):
+        if cut or index != (0 if previous is None else previous + 1):
+            pieces.append(GAP_MARKER)
+        piece, cut = kept[index]
+        pieces.append(piece)
+        previous = index
+    if cut or previous != len(spans) - 1:
+        pieces.append(GAP_MARKER)
+
+    trimmed = " ".join(pieces).strip()
+    logger.info(f"Trimmed prompt content from ~{original_tokens} to ~{estimate_tokens(trimmed)} tokens "
+                f"({len(kept)} of {len(spans)} sentences kept)")
+    return trimmed
@@ -0,0 +1,192 @@
+import logging
+import threading
+import time
+from prawcore import Requestor
+import config
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that adapts to Reddit's rate limit headers.
+
+    The bucket starts out refilling at the configured requests per minute.
+    Whenever a response carries X-Ratelimit-Remaining / X-Ratelimit-Reset,
+    the refill rate is recomputed so the remaining quota is spread evenly
+    over the rest of the window, and the bucket is topped up again once the
+    window resets.
+    """
+
+    def __init__(self, requests_per_minute=None, burst=None, name="default"):
+        if requests_per_minute is None:
+            requests_per_minute = config.REDDIT_REQUESTS_PER_MINUTE
+        if burst is None:
+            burst = config.REDDIT_RATE_LIMIT_BURST
+
+        self.name = name
+        self.capacity = max(1, burst)
+        self._default_rate = requests_per_minute / 60.0
+        self._refill_rate = self._default_rate
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._reset_at = None
+        self._lock = threading.Lock()
+
+        # Reporting
+        self.requests = 0
+        self.waits = 0
+        self.total_wait_seconds = 0.0
+        self.server_remaining = None
+        self.server_used = None
+
+    def _refill(self, now):
+        """Add tokens for the time elapsed since the last update."""
+        if self._reset_at is not None and now >= self._reset_at:
+            # The server-side window has reset; outstanding reservations still count
+            self._tokens = self.capacity + min(self._tokens, 0.0)
+            self._refill_rate = self._default_rate
+            self._reset_at = None
+            self.server_remaining = None
+        else:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._refill_rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """
+        Take tokens from the bucket, blocking until they are available.
+
+        Args:
+            tokens (int): Number of tokens (requests) to take
+
+        Returns:
+            float: Seconds spent waiting for quota
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= tokens
+            self.requests += 1
+
+            if self._tokens >= 0:
+                wait = 0.0
+            elif self._refill_rate > 0:
+                wait = -self._tokens / self._refill_rate
+            elif self._reset_at is not None:
+                wait = self._reset_at - now
+            else:
+                wait = 0.0
+
+            if wait > 0:
+                self.waits += 1
+                self.total_wait_seconds += wait
+
+        if wait > 0:
+            logger.debug(f"Rate limiter '{self.name}' waiting {wait:.2f}s for quota")
+            time.sleep(wait)
+        return wait
+
+    def update_from_headers(self, headers):
+        """
+        Adapt the bucket to the rate limit headers of a Reddit response.
+
+        Args:
+            headers (Mapping): Response headers
+        """
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+        used = headers.get("x-ratelimit-used")
+        if remaining is None or reset is None:
+            return
+
+        try:
+            remaining = float(remaining)
+            reset = max(float(reset), 1.0)
+        except (TypeError, ValueError):
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.server_remaining = remaining
+            self.server_used = int(float(used)) if used is not None else None
+            self._reset_at = now + reset
+
+            # Never hold more tokens than the server says we have left,
+            # and spread whatever remains evenly over the rest of the window
+            self._tokens = min(self._tokens, remaining)
+            self._refill_rate = max(remaining - max(self._tokens, 0.0), 0.0) / reset
+
+    def stats(self):
+        """
+        Report wait time and remaining headroom for this bucket.
+
+        Returns:
+            dict: Limiter statistics
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "name": self.name,
+                "requests": self.requests,
+                "waits": self.waits,
+                "total_wait_seconds": round(self.total_wait_seconds, 3),
+                "avg_wait_seconds": round(self.total_wait_seconds / self.requests, 3) if self.requests else 0.0,
+                "tokens_available": round(max(self._tokens, 0.0), 2),
+                "refill_per_minute": round(self._refill_rate * 60, 2),
+                "server_remaining": self.server_remaining,
+                "server_used": self.server_used,
+                "reset_in_seconds": round(self._reset_at - now, 1) if self._reset_at is not None else None
+            }
+
+# One bucket per OAuth account, shared by every scraper using that account
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(key):
+    """
+    Get the shared token bucket for an account key, creating it if needed.
+
+    Args:
+        key (str): Account key, e.g. "reddit_account:12" or "app"
+
+    Returns:
+        TokenBucket: The bucket for that account
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = TokenBucket(name=key)
+            _limiters[key] = limiter
+        return limiter
+
+def get_all_stats():
+    """Get statistics for every account's rate limiter."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
+
+class RateLimitedRequestor(Requestor):
+    """
+    prawcore requestor that routes every HTTP request through a TokenBucket.
+
+    Pass it to praw.Reddit as ``requestor_class`` with
+    ``requestor_kwargs={"limiter": bucket}``.
+    """
+
+    def __init__(self, *args, limiter=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limiter = limiter
+
+    def request(self, *args, **kwargs):
+        if self.limiter is not None:
+            self.limiter.acquire()
+        response = super().request(*args, **kwargs)
+        if self.limiter is not None:
+            self.limiter.update_from_headers(response.headers)
+        return response
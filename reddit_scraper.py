@@ -1,9 +1,15 @@
 import praw
 import time
+import asyncio
 import logging
+import threading
 from datetime import datetime, timedelta
 import requests
 import config
+from rate_limiter import get_limiter, RateLimitedRequestor
+from keyword_matcher import get_matcher
+from seen_store import content_hash, post_fullname, post_text
+from cursor_store import listing_position
 
 # Configure logging
 logging.basicConfig(
@@ -12,8 +18,28 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class AsyncRequestBudget:
+    """
+    Shared request budget for concurrent scraping.
+
+    Bounds the number of Reddit requests in flight. Request pacing itself is
+    done by the account's token bucket, which every PRAW request goes through.
+    Use as an async context manager around each request.
+    """
+
+    def __init__(self, max_concurrency):
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+        return False
+
 class RedditScraper:
-    def __init__(self, access_token=None, refresh_token=None, token_expires_at=None):
+    def __init__(self, access_token=None, refresh_token=None, token_expires_at=None, account_id=None):
         """
         Initialize the Reddit scraper with OAuth tokens.
         
@@ -21,50 +47,111 @@ class RedditScraper:
             access_token (str, optional): OAuth access token for Reddit API.
             refresh_token (str, optional): OAuth refresh token for Reddit API.
             token_expires_at (datetime, optional): When the access token expires.
+            account_id (int, optional): ID of the RedditAccount the tokens belong to.
+                Scrapers for the same account share one rate limiter.
         """
         self.access_token = access_token
         self.refresh_token = refresh_token
         self.token_expires_at = token_expires_at
         self.user_agent = "RedditBuyerIntentBot/1.0"
         
+        # Every Reddit request made by this scraper draws from the account's token bucket
+        self.rate_limiter = get_limiter(f"reddit_account:{account_id}" if account_id else "app")
+        
         # Use app credentials for OAuth
         self.client_id = config.REDDIT_CLIENT_ID
         self.client_secret = config.REDDIT_CLIENT_SECRET
         
-        # Initialize PRAW with the access token if available
-        if access_token:
-            self._init_with_token(access_token)
-        else:
-            # Fallback to app-only auth for non-authenticated operations
-            self._init_read_only()
+        # PRAW isn't thread-safe, so each thread making Reddit requests gets its own client (see reddit)
+        self._clients = threading.local()
+        self._client_generation = 0
+        
+        # Initialize PRAW with the access token if available, otherwise app-only auth
+        self.reddit = self._create_client()
             
         # Track when users were last messaged to avoid spam
         self.last_messaged = {}
+        
+        # Optional SeenItemStore; posts already analyzed with identical content are skipped
+        self.seen_store = None
+    
+    @classmethod
+    def for_account(cls, account):
+        """
+        Create a scraper that uses a Reddit account's OAuth tokens and rate limiter.
+        
+        Args:
+            account (RedditAccount): The account to scrape and send messages as
+            
+        Returns:
+            RedditScraper: Scraper drawing from the account's own token bucket
+        """
+        return cls(access_token=account.access_token,
+                   refresh_token=account.refresh_token,
+                   token_expires_at=account.token_expires_at,
+                   account_id=account.id)
+    
+    @property
+    def reddit(self):
+        """
+        PRAW client for the calling thread.
+        
+        The concurrent scraping engine's workers and the pipeline's stages
+        each get their own client, built with the scraper's current
+        credentials; all of them draw from the account's rate limiter.
+        """
+        if getattr(self._clients, "generation", None) != self._client_generation:
+            self._clients.reddit = self._create_client()
+            self._clients.generation = self._client_generation
+        return self._clients.reddit
+    
+    @reddit.setter
+    def reddit(self, client):
+        """Use a client on the calling thread; other threads build new ones with the current credentials."""
+        self._client_generation += 1
+        self._clients.reddit = client
+        self._clients.generation = self._client_generation
+    
+    def _create_client(self):
+        """Create a PRAW client with the access token if available, otherwise in read-only mode."""
+        if self.access_token:
+            return self._init_with_token(self.access_token)
+        return self._init_read_only()
     
     def _init_with_token(self, access_token):
-        """Initialize PRAW with an OAuth access token."""
+        """Create a PRAW client with an OAuth access token."""
         try:
-            self.reddit = praw.Reddit(
+            reddit = praw.Reddit(
                 client_id=self.client_id,
                 client_secret=self.client_secret,
                 user_agent=self.user_agent,
-                token_manager=self._get_token_manager(access_token)
+                token_manager=self._get_token_manager(access_token),
+                oauth_url=config.REDDIT_OAUTH_URL,
+                reddit_url=config.REDDIT_URL,
+                requestor_class=RateLimitedRequestor,
+                requestor_kwargs={"limiter": self.rate_limiter}
             )
             logger.info("Reddit API client initialized with OAuth token")
+            return reddit
         except Exception as e:
             logger.error(f"Failed to initialize Reddit API client with OAuth: {str(e)}")
             raise
     
     def _init_read_only(self):
-        """Initialize PRAW in read-only mode."""
+        """Create a PRAW client in read-only mode."""
         try:
-            self.reddit = praw.Reddit(
+            reddit = praw.Reddit(
                 client_id=self.client_id,
                 client_secret=self.client_secret,
-                user_agent=self.user_agent
+                user_agent=self.user_agent,
+                oauth_url=config.REDDIT_OAUTH_URL,
+                reddit_url=config.REDDIT_URL,
+                requestor_class=RateLimitedRequestor,
+                requestor_kwargs={"limiter": self.rate_limiter}
             )
-            self.reddit.read_only = True
+            reddit.read_only = True
             logger.info("Reddit API client initialized in read-only mode")
+            return reddit
         except Exception as e:
             logger.error(f"Failed to initialize Reddit API client: {str(e)}")
             raise
@@ -104,7 +191,7 @@ class RedditScraper:
                     self.access_token = token_data['access_token']
                     expires_in = token_data.get('expires_in', 3600)
                     self.token_expires_at = now + timedelta(seconds=expires_in)
-                    self._init_with_token(self.access_token)
+                    self.reddit = self._create_client()
                     return True
             except Exception as e:
                 logger.error(f"Failed to refresh access token: {str(e)}")
@@ -121,12 +208,14 @@ class RedditScraper:
                 "refresh_token": self.refresh_token
             }
             
+            self.rate_limiter.acquire()
             response = requests.post(
-                "https://www.reddit.com/api/v1/access_token",
+                f"{config.REDDIT_URL}/api/v1/access_token",
                 auth=auth,
                 headers=headers,
                 data=data
             )
+            self.rate_limiter.update_from_headers(response.headers)
             
             if response.status_code == 200:
                 return response.json()
@@ -165,7 +254,7 @@ class RedditScraper:
             logger.error(f"Failed to connect to Reddit: {str(e)}")
             return False
         
-    def scrape_subreddit(self, subreddit_name, keywords=None, limit=None):
+    def scrape_subreddit(self, subreddit_name, keywords=None, limit=None, cursor_store=None, fetch_comments=True):
         """
         Scrape posts from a subreddit that contain any of the given keywords.
         
@@ -173,6 +262,10 @@ class RedditScraper:
             subreddit_name (str): Name of the subreddit to scrape
             keywords (list): List of keywords to filter posts by
             limit (int): Maximum number of posts to retrieve
+            cursor_store (SubredditCursorStore, optional): High-water marks for incremental
+                scraping. When given, only posts newer than the last scrape are fetched.
+            fetch_comments (bool): Fetch comments along with each matching post. When False,
+                posts are returned with an empty comments list for fetch_comments() to fill later.
             
         Returns:
             list: List of dictionaries containing post data
@@ -192,53 +285,304 @@ class RedditScraper:
         scraped_data = []
         
         try:
-            subreddit = self.reddit.subreddit(subreddit_name)
-            
             # Get new posts from the subreddit
-            for post in subreddit.new(limit=limit):
-                # Apply rate limiting to comply with Reddit API policies
-                time.sleep(config.API_RATE_LIMIT_SECONDS)
-                
-                # Check if the post contains any of the keywords
-                post_text = f"{post.title} {post.selftext}".lower()
-                
-                # Extract post data if it contains any of the keywords
-                if any(keyword.lower() in post_text for keyword in keywords):
-                    post_data = {
-                        'id': post.id,
-                        'title': post.title,
-                        'content': post.selftext,
-                        'author': str(post.author),
-                        'url': post.url,
-                        'created_utc': post.created_utc,
-                        'subreddit': subreddit_name,
-                        'type': 'post',
-                        'comments': []
-                    }
-                    
-                    # Get top-level comments
-                    post.comments.replace_more(limit=0)  # Skip "load more comments" links
-                    for comment in post.comments:
-                        time.sleep(config.API_RATE_LIMIT_SECONDS)
-                        if comment.author:  # Check if the comment has an author (not deleted)
-                            comment_data = {
-                                'id': comment.id,
-                                'content': comment.body,
-                                'author': str(comment.author),
-                                'created_utc': comment.created_utc
-                            }
-                            post_data['comments'].append(comment_data)
-                    
-                    scraped_data.append(post_data)
+            # Rate limiting is applied per request by the account's token bucket
+            posts = self._fetch_new_posts(subreddit_name, limit, cursor_store)
+            scraped_data = self._process_posts(subreddit_name, posts, keywords, fetch_comments)
                     
+            self._advance_cursor(subreddit_name, posts, cursor_store)
             logger.info(f"Scraped {len(scraped_data)} posts from r/{subreddit_name}")
             
         except Exception as e:
             logger.error(f"Error scraping r/{subreddit_name}: {str(e)}")
             
         return scraped_data
+
+    def _process_posts(self, subreddit_name, posts, keywords, fetch_comments=True):
+        """Keep the posts that contain any of the keywords and optionally attach their comments."""
+        matcher = get_matcher(keywords)
+        scraped_data = []
+        for post in posts:
+            # Extract post data if it contains any of the keywords
+            matched_keywords = self._matches_keywords(post, matcher)
+            if matched_keywords:
+                post_data = self._post_to_dict(post, subreddit_name, matched_keywords)
+                self._flag_seen_post(post_data)
+                if fetch_comments:
+                    post_data['comments'] = self._collect_comments(post)
+                    post_data['comments_fetched'] = True
+                scraped_data.append(post_data)
+        return scraped_data
+
+    def _is_known_post(self, post, cursor):
+        """Check if a post is at or behind a subreddit's high-water mark."""
+        if not cursor:
+            return False
+        if post.name == cursor['last_fullname']:
+            return True
+        if cursor['last_created_utc'] is None:
+            return False
+        # Posts from the same second as the mark are only known if they aren't newer than it
+        return (listing_position(post.name, post.created_utc)
+                <= listing_position(cursor['last_fullname'], cursor['last_created_utc']))
+
+    def _fetch_new_posts(self, subreddit_name, limit, cursor_store=None):
+        """
+        Fetch the newest posts of a subreddit, stopping at the stored high-water mark.
+        
+        Listings are paged lazily, so breaking out as soon as a known post is
+        reached means no further pages are requested.
+        """
+        cursor = cursor_store.get(subreddit_name) if cursor_store else None
+        
+        posts = []
+        for post in self.reddit.subreddit(subreddit_name).new(limit=limit):
+            if self._is_known_post(post, cursor):
+                break
+            posts.append(post)
+        
+        if cursor:
+            logger.info(f"Fetched {len(posts)} new posts from r/{subreddit_name} since last cycle")
+        return posts
+
+    def _fetch_new_posts_combined(self, group, limit, cursor_store=None):
+        """
+        Fetch the newest posts of several subreddits with one combined listing.
+        
+        Requests r/a+b+c/new and routes each post back to the subreddit it came
+        from. A combined listing is sorted by time across all its subreddits, so
+        paging continues until every subreddit in the group has reached either
+        its high-water mark or its post limit (capped at limit * len(group)
+        posts in total). Subreddits still short of both when the cap is hit
+        (crowded out by busier ones) are fetched on their own instead.
+        
+        Returns:
+            dict: Subreddit name (as given) mapped to its list of new posts
+        """
+        cursors = {name: cursor_store.get(name) if cursor_store else None for name in group}
+        routes = {name.lower(): name for name in group}
+        posts_by_subreddit = {name: [] for name in group}
+        done = set()
+        cap = limit * len(group)
+        listed = 0
+        
+        for post in self.reddit.subreddit("+".join(group)).new(limit=cap):
+            listed += 1
+            name = routes.get(post.subreddit.display_name.lower())
+            if name is None or name in done:
+                continue
+            
+            if self._is_known_post(post, cursors[name]):
+                done.add(name)
+            else:
+                posts_by_subreddit[name].append(post)
+                if len(posts_by_subreddit[name]) >= limit:
+                    done.add(name)
+            
+            if len(done) == len(group):
+                break
+        
+        if listed >= cap and len(done) < len(group):
+            pending = [name for name in group if name not in done]
+            logger.info(f"Combined listing hit its cap; fetching {', '.join('r/' + name for name in pending)} separately")
+            for name in pending:
+                posts_by_subreddit[name] = self._fetch_new_posts(name, limit, cursor_store)
+        
+        return posts_by_subreddit
+
+    def _group_subreddits(self, subreddit_list, group_size=None):
+        """Split subreddits into groups for combined listing requests."""
+        if group_size is None:
+            group_size = config.COMBINED_LISTING_GROUP_SIZE
+        group_size = max(1, group_size)
+        return [subreddit_list[i:i + group_size] for i in range(0, len(subreddit_list), group_size)]
+
+    def _advance_cursor(self, subreddit_name, posts, cursor_store=None):
+        """Record the newest fetched post as the subreddit's high-water mark."""
+        if cursor_store and posts:
+            newest = max(posts, key=lambda post: listing_position(post.name, post.created_utc))
+            cursor_store.advance(subreddit_name, newest.name, newest.created_utc)
+
+    def _flag_seen_post(self, post_data):
+        """
+        Check a post against the seen store.
+        
+        Posts already analyzed with identical content are flagged as seen but
+        kept, so new comments on them are still fetched (the intent detector
+        skips the post body and any comments it has seen, and deferred comment
+        fetches are gated on the post's earlier intent). Edited posts are
+        flagged so they get analyzed again.
+        """
+        if not self.seen_store:
+            return
+            
+        status = self.seen_store.status(post_fullname(post_data), content_hash(post_text(post_data)))
+        if status == "seen":
+            post_data['seen'] = True
+        elif status == "edited":
+            post_data['edited'] = True
+            logger.info(f"Post {post_data['id']} was edited since it was last analyzed; re-queueing")
+
+    def _matches_keywords(self, post, matcher):
+        """Get the keywords found in the post title or body (empty if none match)."""
+        return matcher.matched_keywords(f"{post.title} {post.selftext}")
+
+    def _post_to_dict(self, post, subreddit_name, matched_keywords=None):
+        """Convert a PRAW submission into the scraper's post dictionary."""
+        return {
+            'id': post.id,
+            'title': post.title,
+            'content': post.selftext,
+            'author': str(post.author),
+            'url': post.url,
+            'created_utc': post.created_utc,
+            'subreddit': subreddit_name,
+            'type': 'post',
+            'matched_keywords': matched_keywords or [],
+            'comments': [],
+            'comments_fetched': False
+        }
+
+    def _comment_to_dict(self, comment, depth=0):
+        """Convert a PRAW comment into the scraper's comment dictionary."""
+        return {
+            'id': comment.id,
+            'content': comment.body,
+            'author': str(comment.author),
+            'created_utc': comment.created_utc,
+            'score': getattr(comment, 'score', 0),
+            'parent_id': getattr(comment, 'parent_id', None),
+            'depth': depth
+        }
+
+    def _collect_comments(self, post, max_depth=1, max_comments=None):
+        """
+        Fetch a post's comment tree in a single request and flatten it.
+        
+        Comments are walked breadth-first, so the budget is spent on top-level
+        comments before replies. "Load more comments" stubs are skipped.
+        
+        Args:
+            post: PRAW submission
+            max_depth (int): Levels of the tree to include (1 = top-level comments only)
+            max_comments (int, optional): Maximum number of comments to return
+        """
+        post.comments.replace_more(limit=0)  # Skip "load more comments" links
+        
+        comments = []
+        level = list(post.comments)
+        depth = 0
+        while level and depth < max_depth:
+            next_level = []
+            for comment in level:
+                if max_comments is not None and len(comments) >= max_comments:
+                    return comments
+                if comment.author:  # Check if the comment has an author (not deleted)
+                    comments.append(self._comment_to_dict(comment, depth))
+                next_level.extend(getattr(comment, 'replies', []))
+            level = next_level
+            depth += 1
+        return comments
+
+    def fetch_comments(self, posts, max_depth=None, max_comments=None):
+        """
+        Fetch comments for posts scraped with fetch_comments=False.
+        
+        This is the deferred comment stage: it is meant to run only for posts
+        that passed the intent gate. Each post's comment tree is fetched in one
+        request, limited to max_comments, and flattened into the post's
+        existing comments list.
+        
+        Args:
+            posts (list): Post dictionaries from the scraper
+            max_depth (int): Levels of the comment tree to include (defaults to config.COMMENT_FETCH_MAX_DEPTH)
+            max_comments (int): Maximum comments per post (defaults to config.COMMENT_FETCH_MAX_COUNT)
+            
+        Returns:
+            list: The same posts with their comments filled in
+        """
+        if max_depth is None:
+            max_depth = config.COMMENT_FETCH_MAX_DEPTH
+            
+        if max_comments is None:
+            max_comments = config.COMMENT_FETCH_MAX_COUNT
+            
+        if self.access_token and not self.refresh_token_if_needed():
+            logger.error("Failed to refresh token, cannot fetch comments")
+            return posts
+            
+        for post in posts:
+            if post.get('comments_fetched'):
+                continue
+            try:
+                post['comments'] = self._fetch_comment_tree(post['id'], max_depth, max_comments)
+                post['comments_fetched'] = True
+            except Exception as e:
+                logger.error(f"Error fetching comments for post {post['id']}: {str(e)}")
+                
+        logger.info(f"Fetched comments for {len(posts)} posts")
+        return posts
+
+    async def fetch_comments_async(self, posts, max_depth=None, max_comments=None, max_concurrency=None):
+        """
+        Fetch comments for posts scraped with fetch_comments=False, concurrently.
+        
+        Args:
+            posts (list): Post dictionaries from the scraper
+            max_depth (int): Levels of the comment tree to include (defaults to config.COMMENT_FETCH_MAX_DEPTH)
+            max_comments (int): Maximum comments per post (defaults to config.COMMENT_FETCH_MAX_COUNT)
+            max_concurrency (int): Maximum number of Reddit requests in flight
+            
+        Returns:
+            list: The same posts with their comments filled in
+        """
+        if max_depth is None:
+            max_depth = config.COMMENT_FETCH_MAX_DEPTH
+            
+        if max_comments is None:
+            max_comments = config.COMMENT_FETCH_MAX_COUNT
+            
+        if max_concurrency is None:
+            max_concurrency = config.SCRAPER_MAX_CONCURRENCY
+            
+        if self.access_token and not self.refresh_token_if_needed():
+            logger.error("Failed to refresh token, cannot fetch comments")
+            return posts
+            
+        budget = AsyncRequestBudget(max_concurrency)
+        
+        async def fetch_post_comments(post):
+            try:
+                async with budget:
+                    post['comments'] = await asyncio.to_thread(self._fetch_comment_tree, post['id'],
+                                                               max_depth, max_comments)
+                post['comments_fetched'] = True
+            except Exception as e:
+                logger.error(f"Error fetching comments for post {post['id']}: {str(e)}")
+                
+        await asyncio.gather(*[fetch_post_comments(post) for post in posts if not post.get('comments_fetched')])
+        
+        logger.info(f"Fetched comments for {len(posts)} posts")
+        return posts
+
+    def _fetch_listed_post_comments(self, post_id):
+        """
+        Fetch the comments of a post from a listing, using the calling thread's client.
+        
+        The listed submission is bound to the client of the thread that
+        fetched the listing, so it is looked up again by id.
+        """
+        return self._collect_comments(self.reddit.submission(id=post_id))
     
-    def scrape_multiple_subreddits(self, subreddit_list=None, keywords=None, limit=None):
+    def _fetch_comment_tree(self, post_id, max_depth, max_comments):
+        """Fetch one post's comment tree, asking Reddit for no more than the comment budget."""
+        submission = self.reddit.submission(id=post_id)
+        submission.comment_sort = "top"
+        submission.comment_limit = max_comments
+        return self._collect_comments(submission, max_depth, max_comments)
+
+    def scrape_multiple_subreddits(self, subreddit_list=None, keywords=None, limit=None, cursor_store=None,
+                                   combined=None, fetch_comments=True):
         """
         Scrape posts from multiple subreddits.
         
@@ -246,6 +590,10 @@ class RedditScraper:
             subreddit_list (list): List of subreddit names to scrape
             keywords (list): List of keywords to filter posts by
             limit (int): Maximum number of posts to retrieve per subreddit
+            cursor_store (SubredditCursorStore, optional): High-water marks for incremental scraping
+            combined (bool): Fetch listings for groups of subreddits in single combined
+                requests (defaults to config.COMBINED_LISTINGS_ENABLED)
+            fetch_comments (bool): Fetch comments along with each matching post
             
         Returns:
             list: Combined list of post data from all subreddits
@@ -253,13 +601,311 @@ class RedditScraper:
         if subreddit_list is None:
             subreddit_list = config.MONITORED_SUBREDDITS
             
+        if combined is None:
+            combined = config.COMBINED_LISTINGS_ENABLED
+            
+        if combined:
+            return self.scrape_subreddits_combined(subreddit_list, keywords, limit, cursor_store,
+                                                   fetch_comments=fetch_comments)
+            
         all_data = []
         
         for subreddit in subreddit_list:
-            subreddit_data = self.scrape_subreddit(subreddit, keywords, limit)
+            subreddit_data = self.scrape_subreddit(subreddit, keywords, limit, cursor_store, fetch_comments)
             all_data.extend(subreddit_data)
+
+        return all_data
+
+    def scrape_subreddits_combined(self, subreddit_list=None, keywords=None, limit=None, cursor_store=None,
+                                   group_size=None, fetch_comments=True):
+        """
+        Scrape posts from multiple subreddits using combined listing requests.
+        
+        Subreddits are grouped into r/a+b+c/new listings, so the number of
+        listing requests grows with the volume of new posts rather than with
+        the number of monitored subreddits. Results are routed back to their
+        original subreddit and returned in the same shape and order as
+        scrape_multiple_subreddits.
+        
+        Args:
+            subreddit_list (list): List of subreddit names to scrape
+            keywords (list): List of keywords to filter posts by
+            limit (int): Maximum number of posts to retrieve per subreddit
+            cursor_store (SubredditCursorStore, optional): High-water marks for incremental scraping
+            group_size (int): Subreddits per combined request (defaults to config.COMBINED_LISTING_GROUP_SIZE)
+            fetch_comments (bool): Fetch comments along with each matching post
             
+        Returns:
+            list: Combined list of post data from all subreddits
+        """
+        if subreddit_list is None:
+            subreddit_list = config.MONITORED_SUBREDDITS
+            
+        # Ensure token is valid if we have one
+        if self.access_token and not self.refresh_token_if_needed():
+            logger.error("Failed to refresh token, cannot scrape subreddits")
+            return []
+            
+        if keywords is None:
+            keywords = config.BUYER_INTENT_KEYWORDS
+            
+        if limit is None:
+            limit = config.MAX_POSTS_PER_SUBREDDIT
+            
+        all_data = []
+        
+        for group in self._group_subreddits(subreddit_list, group_size):
+            logger.info(f"Scraping r/{'+'.join(group)} for buyer intent keywords")
+            try:
+                posts_by_subreddit = self._fetch_new_posts_combined(group, limit, cursor_store)
+            except Exception as e:
+                logger.error(f"Error fetching combined listing for r/{'+'.join(group)}: {str(e)}")
+                continue
+                
+            for subreddit_name in group:
+                posts = posts_by_subreddit[subreddit_name]
+                try:
+                    subreddit_data = self._process_posts(subreddit_name, posts, keywords, fetch_comments)
+                    self._advance_cursor(subreddit_name, posts, cursor_store)
+                    logger.info(f"Scraped {len(subreddit_data)} posts from r/{subreddit_name}")
+                    all_data.extend(subreddit_data)
+                except Exception as e:
+                    logger.error(f"Error scraping r/{subreddit_name}: {str(e)}")
+                    
         return all_data
+
+    def iter_scrape_subreddits(self, subreddit_list=None, keywords=None, limit=None, cursor_store=None,
+                               combined=None, fetch_comments=True):
+        """
+        Stream matching posts from multiple subreddits one at a time.
+        
+        Generator counterpart of scrape_multiple_subreddits: each post is
+        yielded as soon as it (and, if requested, its comments) has been
+        fetched, so downstream stages can start before the whole cycle has
+        been scraped. A subreddit's high-water mark is only advanced once all
+        of its posts have been consumed.
+        
+        Args:
+            subreddit_list (list): List of subreddit names to scrape
+            keywords (list): List of keywords to filter posts by
+            limit (int): Maximum number of posts to retrieve per subreddit
+            cursor_store (SubredditCursorStore, optional): High-water marks for incremental scraping
+            combined (bool): Fetch listings for groups of subreddits in single combined
+                requests (defaults to config.COMBINED_LISTINGS_ENABLED)
+            fetch_comments (bool): Fetch comments along with each matching post
+            
+        Yields:
+            dict: Post data in the same shape as scrape_subreddit returns
+        """
+        if subreddit_list is None:
+            subreddit_list = config.MONITORED_SUBREDDITS
+            
+        if keywords is None:
+            keywords = config.BUYER_INTENT_KEYWORDS
+            
+        if limit is None:
+            limit = config.MAX_POSTS_PER_SUBREDDIT
+            
+        if combined is None:
+            combined = config.COMBINED_LISTINGS_ENABLED
+            
+        # Ensure token is valid if we have one
+        if self.access_token and not self.refresh_token_if_needed():
+            logger.error("Failed to refresh token, cannot scrape subreddits")
+            return
+            
+        matcher = get_matcher(keywords)
+        
+        for subreddit_name, posts in self._iter_new_posts(subreddit_list, limit, cursor_store, combined):
+            scraped = 0
+            for post in posts:
+                matched_keywords = self._matches_keywords(post, matcher)
+                if not matched_keywords:
+                    continue
+                    
+                post_data = self._post_to_dict(post, subreddit_name, matched_keywords)
+                self._flag_seen_post(post_data)
+                if fetch_comments:
+                    try:
+                        post_data['comments'] = self._collect_comments(post)
+                        post_data['comments_fetched'] = True
+                    except Exception as e:
+                        logger.error(f"Error fetching comments for post {post.id}: {str(e)}")
+                        
+                scraped += 1
+                yield post_data
+                
+            self._advance_cursor(subreddit_name, posts, cursor_store)
+            logger.info(f"Scraped {scraped} posts from r/{subreddit_name}")
+
+    def _iter_new_posts(self, subreddit_list, limit, cursor_store, combined):
+        """Yield (subreddit name, new posts) for each subreddit, one listing request at a time."""
+        if combined:
+            for group in self._group_subreddits(subreddit_list):
+                try:
+                    posts_by_subreddit = self._fetch_new_posts_combined(group, limit, cursor_store)
+                except Exception as e:
+                    logger.error(f"Error fetching combined listing for r/{'+'.join(group)}: {str(e)}")
+                    continue
+                for subreddit_name in group:
+                    yield subreddit_name, posts_by_subreddit[subreddit_name]
+        else:
+            for subreddit_name in subreddit_list:
+                try:
+                    posts = self._fetch_new_posts(subreddit_name, limit, cursor_store)
+                except Exception as e:
+                    logger.error(f"Error scraping r/{subreddit_name}: {str(e)}")
+                    continue
+                yield subreddit_name, posts
+
+    async def scrape_multiple_subreddits_async(self, subreddit_list=None, keywords=None, limit=None,
+                                               max_concurrency=None, cursor_store=None, combined=None,
+                                               fetch_comments=True):
+        """
+        Scrape posts from multiple subreddits concurrently.
+
+        Listings and comment trees are fetched in worker threads, so several
+        subreddits and posts are in flight at once, while every request still
+        draws from the account's shared token bucket.
+
+        Args:
+            subreddit_list (list): List of subreddit names to scrape
+            keywords (list): List of keywords to filter posts by
+            limit (int): Maximum number of posts to retrieve per subreddit
+            max_concurrency (int): Maximum number of Reddit requests in flight
+            cursor_store (SubredditCursorStore, optional): High-water marks for incremental scraping
+            combined (bool): Fetch listings for groups of subreddits in single combined
+                requests (defaults to config.COMBINED_LISTINGS_ENABLED)
+            fetch_comments (bool): Fetch comments along with each matching post
+
+        Returns:
+            list: Combined list of post data from all subreddits, in the same
+                shape and order as scrape_multiple_subreddits
+        """
+        if subreddit_list is None:
+            subreddit_list = config.MONITORED_SUBREDDITS
+
+        if max_concurrency is None:
+            max_concurrency = config.SCRAPER_MAX_CONCURRENCY
+
+        if combined is None:
+            combined = config.COMBINED_LISTINGS_ENABLED
+
+        if keywords is None:
+            keywords = config.BUYER_INTENT_KEYWORDS
+
+        if limit is None:
+            limit = config.MAX_POSTS_PER_SUBREDDIT
+
+        # Ensure token is valid before fanning out
+        if self.access_token and not self.refresh_token_if_needed():
+            logger.error("Failed to refresh token, cannot scrape subreddits")
+            return []
+
+        budget = AsyncRequestBudget(max_concurrency)
+
+        if combined:
+            tasks = [
+                self._scrape_group_async(group, keywords, limit, budget, cursor_store, fetch_comments)
+                for group in self._group_subreddits(subreddit_list)
+            ]
+        else:
+            tasks = [
+                self._scrape_subreddit_async(subreddit, keywords, limit, budget, cursor_store, fetch_comments)
+                for subreddit in subreddit_list
+            ]
+        results = await asyncio.gather(*tasks)
+
+        all_data = []
+        for subreddit_data in results:
+            all_data.extend(subreddit_data)
+
+        logger.info(f"Scraped {len(all_data)} posts from {len(subreddit_list)} subreddits concurrently")
+        return all_data
+
+    async def _scrape_subreddit_async(self, subreddit_name, keywords, limit, budget, cursor_store=None,
+                                      fetch_comments=True):
+        """Scrape a single subreddit using the shared async request budget."""
+        logger.info(f"Scraping r/{subreddit_name} for buyer intent keywords")
+
+        try:
+            # Reddit returns up to 100 posts per listing request
+            async with budget:
+                posts = await asyncio.to_thread(self._fetch_new_posts, subreddit_name, limit, cursor_store)
+
+            return await self._process_posts_async(subreddit_name, posts, keywords, budget, cursor_store,
+                                                   fetch_comments)
+
+        except Exception as e:
+            logger.error(f"Error scraping r/{subreddit_name}: {str(e)}")
+            return []
+
+    async def _scrape_group_async(self, group, keywords, limit, budget, cursor_store=None, fetch_comments=True):
+        """Scrape a group of subreddits through one combined listing."""
+        logger.info(f"Scraping r/{'+'.join(group)} for buyer intent keywords")
+
+        try:
+            async with budget:
+                posts_by_subreddit = await asyncio.to_thread(self._fetch_new_posts_combined, group, limit,
+                                                             cursor_store)
+        except Exception as e:
+            logger.error(f"Error fetching combined listing for r/{'+'.join(group)}: {str(e)}")
+            return []
+
+        results = await asyncio.gather(*[
+            self._process_posts_async(subreddit_name, posts_by_subreddit[subreddit_name], keywords, budget,
+                                      cursor_store, fetch_comments)
+            for subreddit_name in group
+        ])
+
+        group_data = []
+        for subreddit_data in results:
+            group_data.extend(subreddit_data)
+        return group_data
+
+    async def _process_posts_async(self, subreddit_name, posts, keywords, budget, cursor_store=None,
+                                   fetch_comments=True):
+        """Keep the matching posts, fetch their comments concurrently and advance the cursor."""
+        matcher = get_matcher(keywords)
+
+        def select_posts():
+            selected = []
+            for post in posts:
+                matched_keywords = self._matches_keywords(post, matcher)
+                if matched_keywords:
+                    post_data = self._post_to_dict(post, subreddit_name, matched_keywords)
+                    self._flag_seen_post(post_data)
+                    selected.append((post, post_data))
+            return selected
+
+        matching_posts = await asyncio.to_thread(select_posts)
+
+        async def fetch_post(post, post_data):
+            if not fetch_comments:
+                return post_data
+            try:
+                async with budget:
+                    post_data['comments'] = await asyncio.to_thread(self._fetch_listed_post_comments, post.id)
+                post_data['comments_fetched'] = True
+            except Exception as e:
+                logger.error(f"Error fetching comments for post {post.id}: {str(e)}")
+            return post_data
+
+        scraped_data = await asyncio.gather(*[fetch_post(post, post_data)
+                                              for post, post_data in matching_posts])
+
+        await asyncio.to_thread(self._advance_cursor, subreddit_name, posts, cursor_store)
+        logger.info(f"Scraped {len(scraped_data)} posts from r/{subreddit_name}")
+        return list(scraped_data)
+    
+    def get_rate_limit_stats(self):
+        """
+        Get quota wait time and remaining headroom for this scraper's account.
+        
+        Returns:
+            dict: Token bucket statistics
+        """
+        return self.rate_limiter.stats()
     
     def can_message_user(self, username):
         """
@@ -1,8 +1,16 @@
 import logging
-import google.generativeai as genai
 import json
 import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
 import config
+from model_backend import create_backend
+from model_executor import get_executor
+from prompt_builder import fit_to_budget
+from structured_output import RESPONSE_SCHEMA, generate_json
 
 # Configure logging
 logging.basicConfig(
@@ -12,21 +20,39 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class ResponseGenerator:
-    def __init__(self):
-        """Initialize the Gemini API client for response generation."""
+    def __init__(self, backend=None):
+        """
+        Initialize the model client for response generation.
+        
+        Args:
+            backend (ModelBackend, optional): Model backend to use; defaults to the
+                one selected by config.MODEL_BACKEND (Gemini unless set to "local")
+        """
         try:
-            # Configure the Gemini API
-            genai.configure(api_key=config.GEMINI_API_KEY)
+            # Set up the model backend (Gemini, or the local stand-in)
+            self.model = backend if backend is not None else create_backend()
             
-            # Set up the gemini-pro model
-            self.model = genai.GenerativeModel('gemini-pro')
+            # Shared executor that runs model calls concurrently with retries and deadlines
+            self.executor = get_executor()
             
             # Load custom prompt if available
             self.custom_prompt_template = self._load_custom_prompt()
             
-            logger.info("Gemini API client initialized for response generation")
+            # Responses by Reddit fullname, reused for near-duplicates when enabled
+            self.reuse_duplicate_responses = config.NEAR_DUPLICATE_ENABLED and config.NEAR_DUPLICATE_REUSE_RESPONSES
+            self._responses_by_fullname = OrderedDict()
+            self._responses_lock = threading.Lock()
+            
+            # Speculative responses, started while their item is still being classified
+            self._speculative = {}  # fullname -> (Future, start time)
+            self._speculative_lock = threading.Lock()
+            self._speculation_pool = None
+            self.speculation_counts = {"started": 0, "used": 0, "cancelled": 0, "wasted": 0, "failed": 0}
+            self.speculation_seconds_saved = 0.0
+            
+            logger.info(f"Model backend {self.model.name} initialized for response generation")
         except Exception as e:
-            logger.error(f"Failed to initialize Gemini API client for response generation: {str(e)}")
+            logger.error(f"Failed to initialize model backend for response generation: {str(e)}")
             raise
     
     def _load_custom_prompt(self):
@@ -54,24 +80,72 @@ class ResponseGenerator:
             dict: Response data containing subject, message, and metadata
         """
         try:
-            # Determine if this is a post or comment
-            content_type = content_data.get('type', 'post')
-            author = content_data.get('author', 'Redditor')
-            content = content_data.get('content', '')
-            
-            if content_type == 'post':
-                title = content_data.get('title', '')
-                content_text = f"Title: {title}\n\nContent: {content}"
-            else:
-                content_text = f"Comment: {content}"
-            
-            # Get intent analysis data
-            intent_analysis = content_data.get('intent_analysis', {})
-            intent_category = intent_analysis.get('intent_category', 'NONE')
-            products_services = intent_analysis.get('products_services', [])
-            needs = intent_analysis.get('needs', [])
-            timeframe = intent_analysis.get('timeframe', 'unknown')
+            return self._generate_response(content_data, include_resources)
+        except Exception as e:
+            logger.error(f"Error generating response: {str(e)}")
+            # Return a default response in case of error
+            return {
+                "subject": "Regarding your Reddit post",
+                "message": "I noticed your post and thought I might be able to help. Would you be interested in discussing this further?",
+                "author": content_data.get('author', 'Redditor'),
+                "intent_category": content_data.get('intent_analysis', {}).get('intent_category', 'NONE'),
+                "products_services": [],
+                "content_type": content_data.get('type', 'post'),
+                "include_resources": include_resources,
+                "fullname": self._fullname(content_data)
+            }
+    
+    def _generate_response(self, content_data, include_resources=True, deadline=None):
+        """
+        Generate a response, raising on failure instead of falling back to a default message.
+        
+        Args:
+            content_data (dict): Post/comment data with intent analysis
+            include_resources (bool): Whether to include resources/links in the response
+            deadline (float, optional): Seconds allowed for the model calls
             
+        Returns:
+            dict: Response data containing subject, message, and metadata
+        """
+        # Determine if this is a post or comment
+        content_type = content_data.get('type', 'post')
+        author = content_data.get('author', 'Redditor')
+        # Keep long posts within the token budget, around the buying signal
+        content = fit_to_budget(content_data.get('content', ''))
+        
+        if content_type == 'post':
+            title = content_data.get('title', '')
+            content_text = f"Title: {title}\n\nContent: {content}"
+        else:
+            content_text = f"Comment: {content}"
+        
+        # Get intent analysis data
+        intent_analysis = content_data.get('intent_analysis', {})
+        intent_category = intent_analysis.get('intent_category', 'NONE')
+        products_services = intent_analysis.get('products_services', [])
+        needs = intent_analysis.get('needs', [])
+        timeframe = intent_analysis.get('timeframe', 'unknown')
+        
+        # A near-duplicate of content we already wrote to can reuse that message
+        duplicate_of = intent_analysis.get('duplicate_of')
+        reused = self._reuse_duplicate_response(duplicate_of, author)
+        if reused is not None:
+            reused["fullname"] = self._fullname(content_data)
+            return reused
+        
+        # Items analyzed in combined mode come with a draft written in the same call,
+        # and speculative mode may have started one while the item was classified
+        draft = intent_analysis.get('draft_response') if not self.custom_prompt_template else None
+        if not intent_analysis.get('speculative'):
+            if not include_resources:
+                # Drafts are written with resources, so this response can't use one
+                draft = None
+                self.discard_speculative(content_data)
+            elif not draft:
+                draft = self._take_speculative(content_data)
+        if draft:
+            response_data = draft
+        else:
             # Use custom prompt if available, otherwise use default
             if self.custom_prompt_template:
                 try:
@@ -92,50 +166,171 @@ class ResponseGenerator:
             else:
                 prompt = self._get_default_prompt(content_text, intent_category, products_services, needs, timeframe, include_resources)
             
-            # Generate response from Gemini
-            response = self.model.generate_content(prompt)
-            
-            # Extract the JSON data from the response
-            response_text = response.text
-            
-            # Find JSON content within the response
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            
-            if start_idx >= 0 and end_idx > start_idx:
-                json_str = response_text[start_idx:end_idx]
-                response_data = json.loads(json_str)
+            # Generate and parse the response, with a repair retry for malformed output
+            response_data, _ = generate_json(self.executor, self.model, prompt, RESPONSE_SCHEMA, "response",
+                                             deadline=deadline)
+        
+        # Create response data with metadata
+        result = {
+            "subject": response_data.get("subject", "Regarding your Reddit post"),
+            "message": response_data.get("message", ""),
+            "author": author,
+            "intent_category": intent_category,
+            "products_services": products_services,
+            "content_type": content_type,
+            "include_resources": include_resources,
+            "fullname": self._fullname(content_data)
+        }
+        if duplicate_of:
+            result["duplicate_of"] = duplicate_of
+        
+        if self.reuse_duplicate_responses:
+            self._remember_response(content_data, result)
+        
+        logger.info(f"Generated response for {author} with {intent_category} buyer intent")
+        return result
+    
+    def _fullname(self, content_data):
+        """Reddit fullname of a post or comment dictionary."""
+        prefix = "t3" if 'comments' in content_data else "t1"
+        return f"{prefix}_{content_data.get('id')}"
+    
+    def _remember_response(self, content_data, result):
+        """Keep a generated response so near-duplicates of its content can reuse it."""
+        with self._responses_lock:
+            self._responses_by_fullname[self._fullname(content_data)] = result
+            while len(self._responses_by_fullname) > config.NEAR_DUPLICATE_INDEX_SIZE:
+                self._responses_by_fullname.popitem(last=False)
+    
+    # ---- Speculative responses -------------------------------------------------
+    
+    def speculate(self, content_data):
+        """
+        Start generating a response for an item before its intent is known.
+        
+        The draft is written as if the item were HIGH intent. It is used by
+        generate_response if the item qualifies, and discarded otherwise.
+        
+        Args:
+            content_data (dict): Post or comment dictionary from the scraper
+        """
+        fullname = self._fullname(content_data)
+        speculative_data = dict(content_data, intent_analysis={"intent_category": "HIGH", "speculative": True})
+        
+        with self._speculative_lock:
+            if fullname in self._speculative:
+                return
+            if self._speculation_pool is None:
+                self._speculation_pool = ThreadPoolExecutor(max_workers=config.RESPONSE_GENERATION_WORKERS,
+                                                            thread_name_prefix="speculative-response")
+            future = self._speculation_pool.submit(self._timed_generate_response, speculative_data)
+            self._speculative[fullname] = (future, time.monotonic())
+            self.speculation_counts["started"] += 1
+    
+    def _timed_generate_response(self, content_data):
+        """Generate a response and report how long it took."""
+        started = time.monotonic()
+        result = self._generate_response(content_data, deadline=config.RESPONSE_GENERATION_TIMEOUT_SECONDS)
+        return result, time.monotonic() - started
+    
+    def discard_speculative(self, content_data=None):
+        """
+        Drop speculative responses that won't be used: cancel them if they
+        haven't started, otherwise count their call as wasted.
+        
+        Args:
+            content_data (dict, optional): The item whose draft to drop; all
+                remaining drafts when omitted (e.g. at the end of a cycle)
+        """
+        with self._speculative_lock:
+            if content_data is None:
+                entries = list(self._speculative.values())
+                self._speculative.clear()
             else:
-                # If no JSON found, try to parse the whole response
-                response_data = json.loads(response_text)
-            
-            # Create response data with metadata
-            result = {
-                "subject": response_data.get("subject", "Regarding your Reddit post"),
-                "message": response_data.get("message", ""),
-                "author": author,
-                "intent_category": intent_category,
-                "products_services": products_services,
-                "content_type": content_type,
-                "include_resources": include_resources
-            }
-            
-            logger.info(f"Generated response for {author} with {intent_category} buyer intent")
-            return result
+                entry = self._speculative.pop(self._fullname(content_data), None)
+                entries = [entry] if entry else []
             
+            for future, _ in entries:
+                self.speculation_counts["cancelled" if future.cancel() else "wasted"] += 1
+    
+    def _take_speculative(self, content_data):
+        """Wait for and return an item's speculative draft ({subject, message}), or None."""
+        with self._speculative_lock:
+            entry = self._speculative.pop(self._fullname(content_data), None)
+        if entry is None:
+            return None
+        
+        future, _ = entry
+        waited_from = time.monotonic()
+        try:
+            speculative, duration = future.result(timeout=config.RESPONSE_GENERATION_TIMEOUT_SECONDS)
+            # Saved: the generation time, less whatever part of it we still had to wait for
+            saved = duration - (time.monotonic() - waited_from)
         except Exception as e:
-            logger.error(f"Error generating response: {str(e)}")
-            # Return a default response in case of error
+            logger.warning(f"Speculative response failed ({str(e)}); generating it again")
+            with self._speculative_lock:
+                self.speculation_counts["failed"] += 1
+            return None
+        
+        with self._speculative_lock:
+            self.speculation_counts["used"] += 1
+            self.speculation_seconds_saved += saved
+        return {"subject": speculative["subject"], "message": speculative["message"]}
+    
+    def speculation_stats(self):
+        """Get counts of speculative responses by outcome and the latency they saved."""
+        with self._speculative_lock:
+            finished = sum(self.speculation_counts[key] for key in ("used", "cancelled", "wasted", "failed"))
             return {
-                "subject": "Regarding your Reddit post",
-                "message": "I noticed your post and thought I might be able to help. Would you be interested in discussing this further?",
-                "author": content_data.get('author', 'Redditor'),
-                "intent_category": intent_analysis.get('intent_category', 'NONE'),
-                "products_services": [],
-                "content_type": content_data.get('type', 'post'),
-                "include_resources": include_resources
+                **self.speculation_counts,
+                "pending": len(self._speculative),
+                "waste_rate": round(self.speculation_counts["wasted"] / finished, 3) if finished else 0.0,
+                "seconds_saved": round(self.speculation_seconds_saved, 2)
             }
     
+    def _reuse_duplicate_response(self, duplicate_of, author):
+        """
+        Get a copy of the response written for the original of a near-duplicate.
+        
+        Returns:
+            dict: The reused response addressed to the new author, or None
+        """
+        if not self.reuse_duplicate_responses or not duplicate_of:
+            return None
+        
+        with self._responses_lock:
+            original = self._responses_by_fullname.get(duplicate_of['fullname'])
+        if original is None:
+            return None
+        
+        message = self._readdress(original["message"], original["author"], author)
+        if message is None:
+            return None
+        
+        result = dict(original)
+        result["message"] = message
+        result["author"] = author
+        result["duplicate_of"] = duplicate_of
+        logger.info(f"Reused response for {author} from near-duplicate {duplicate_of['fullname']}")
+        return result
+    
+    def _readdress(self, message, old_author, new_author):
+        """
+        Swap the username in a message's greeting line.
+        
+        Only whole-word mentions in the greeting are replaced, so a short name
+        that happens to occur inside other words is left alone.
+        
+        Returns:
+            str: The message addressed to new_author, or None if the old name
+                appears anywhere else and can't be replaced safely
+        """
+        mention = re.compile(rf"(?<![\w-]){re.escape(old_author)}(?![\w-])")
+        greeting, newline, body = message.partition("\n")
+        if mention.search(body) or len(mention.findall(greeting)) > 1:
+            return None
+        return mention.sub(lambda match: new_author, greeting) + newline + body
+    
     def _get_default_prompt(self, content_text, intent_category, products_services, needs, timeframe, include_resources):
         """Get the default prompt for response generation."""
         return f"""
@@ -166,19 +361,75 @@ class ResponseGenerator:
         Return ONLY valid JSON with these fields, nothing else.
         """
     
-    def batch_generate_responses(self, filtered_content, min_intent="MEDIUM"):
+    def batch_generate_responses(self, filtered_content, min_intent="MEDIUM", completed=None):
         """
         Generate responses for a batch of high-intent Reddit content.
         
+        With more than one response worker, responses are generated
+        concurrently and returned in the order they complete.
+        
         Args:
             filtered_content (list): List of posts with intent analysis
             min_intent (str): Minimum intent category to generate responses for
+            completed (callable, optional): See iter_generate_responses
             
         Returns:
             list: List of response data for high-intent content
         """
-        responses = []
+        return list(self.iter_generate_responses(filtered_content, min_intent, completed))
+    
+    def iter_generate_responses(self, filtered_content, min_intent="MEDIUM", completed=None):
+        """
+        Stream responses for high-intent Reddit content as each one is generated.
+        
+        Generator counterpart of batch_generate_responses, so the first lead is
+        available as soon as its response is ready. Each response is generated
+        within config.RESPONSE_GENERATION_TIMEOUT_SECONDS; with more than one
+        response worker (config.RESPONSE_GENERATION_WORKERS), up to that many
+        are generated at once and yielded as they complete. A response that
+        fails or times out is yielded with an error and no message, instead of
+        the default message, so it is never sent and the rest still are.
+        
+        Args:
+            filtered_content (iterable): Posts with intent analysis
+            min_intent (str): Minimum intent category to generate responses for
+            completed (callable, optional): Returns the response already generated for
+                a post or comment, or None; those are yielded as is instead of
+                generated again (used when resuming a checkpointed cycle)
+            
+        Yields:
+            dict: Response data for each qualifying post or comment
+        """
+        targets = self.response_targets(filtered_content, min_intent)
+        workers = config.RESPONSE_GENERATION_WORKERS
+        
+        if workers <= 1:
+            for content_data in targets:
+                previous = completed(content_data) if completed else None
+                yield previous if previous is not None else self.generate_response_or_error(content_data)
+            return
         
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="response") as pool:
+            in_flight = set()
+            for content_data in targets:
+                previous = completed(content_data) if completed else None
+                if previous is not None:
+                    yield previous
+                    continue
+                
+                in_flight.add(pool.submit(self.generate_response_or_error, content_data))
+                
+                # Hand back whatever has finished; wait only when all workers are busy
+                done, in_flight = wait(in_flight, timeout=0 if len(in_flight) < workers else None,
+                                       return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            
+            for future in as_completed(in_flight):
+                yield future.result()
+    
+    def response_targets(self, filtered_content, min_intent):
+        """Yield the posts and comments that qualify for a response, comments with their post's context."""
         intent_levels = {
             "HIGH": 3,
             "MEDIUM": 2,
@@ -193,8 +444,7 @@ class ResponseGenerator:
             
             # Generate response for the post if it has sufficient intent
             if post_intent_level >= min_intent_level:
-                post_response = self.generate_response(post)
-                responses.append(post_response)
+                yield post
             
             # Generate responses for high-intent comments
             for comment in post['comments']:
@@ -206,7 +456,33 @@ class ResponseGenerator:
                     comment['post_url'] = post.get('url', '')
                     comment['subreddit'] = post.get('subreddit', '')
                     
-                    comment_response = self.generate_response(comment)
-                    responses.append(comment_response)
+                    yield comment
+    
+    def generate_response_or_error(self, content_data):
+        """
+        Generate one response, turning any failure into an error result with no message.
+        
+        Used by the cycle's response stages, so a failed response is reported
+        instead of falling back to the default message.
         
-        return responses 
\ No newline at end of file
+        Args:
+            content_data (dict): Post or comment dictionary from the scraper
+            
+        Returns:
+            dict: Response data, with an "error" key if generation failed
+        """
+        try:
+            return self._generate_response(content_data, deadline=config.RESPONSE_GENERATION_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.error(f"Error generating response for {content_data.get('author', 'Redditor')}: {str(e)}")
+            return {
+                "subject": "",
+                "message": "",
+                "author": content_data.get('author', 'Redditor'),
+                "intent_category": content_data.get('intent_analysis', {}).get('intent_category', 'NONE'),
+                "products_services": [],
+                "content_type": content_data.get('type', 'post'),
+                "include_resources": True,
+                "fullname": self._fullname(content_data),
+                "error": f"{type(e).__name__}: {str(e)}"
+            }
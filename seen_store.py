@@ -0,0 +1,243 @@
+import hashlib
+import logging
+import math
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import SeenItem
+from database import engine, SessionLocal
+import config
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def content_hash(text):
+    """Hash the text of a post or comment, ignoring surrounding whitespace and case."""
+    normalized = " ".join((text or "").split()).lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+def post_fullname(post):
+    """Get the Reddit fullname of a scraped post."""
+    return f"t3_{post['id']}"
+
+def comment_fullname(comment):
+    """Get the Reddit fullname of a scraped comment."""
+    return f"t1_{comment['id']}"
+
+def post_text(post):
+    """Get the text of a scraped post that is hashed for the seen store."""
+    return f"{post.get('title', '')}\n{post.get('content', '')}"
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over string keys.
+
+    Answers "definitely not present" without false negatives, so the seen
+    store only has to hit the database for keys the filter reports as
+    possibly present.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+class SeenItemStore:
+    """
+    Persistent record of which posts and comments have already been analyzed.
+
+    Items are keyed by Reddit fullname plus a hash of their content, and keep
+    the intent they were analyzed as and whether a DM was sent for them. An
+    in-memory Bloom filter answers most lookups for new items without
+    touching the database; possible hits are confirmed against the
+    seen_items table. An item whose fullname is known but whose content hash
+    changed is reported as edited so it gets analyzed again.
+    """
+
+    def __init__(self, session_factory=SessionLocal, retention_days=None, bloom_capacity=None):
+        """
+        Initialize the store and warm the Bloom filter from the database.
+
+        Args:
+            session_factory (callable): SQLAlchemy session factory
+            retention_days (int, optional): Forget items not seen for this many days
+                (defaults to config.SEEN_STORE_RETENTION_DAYS)
+            bloom_capacity (int, optional): Expected number of items (defaults to config.SEEN_STORE_BLOOM_CAPACITY)
+        """
+        if retention_days is None:
+            retention_days = config.SEEN_STORE_RETENTION_DAYS
+        if bloom_capacity is None:
+            bloom_capacity = config.SEEN_STORE_BLOOM_CAPACITY
+
+        self.session_factory = session_factory
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        # Each item adds two keys: its fullname and its fullname plus content hash
+        self._bloom = BloomFilter(bloom_capacity * 2)
+
+        # Counters
+        self.bloom_rejections = 0
+        self.database_lookups = 0
+
+        # Make sure the table exists for processes that don't run db_init (e.g. the CLI)
+        SeenItem.__table__.create(bind=engine, checkfirst=True)
+        self._load()
+
+    def _load(self):
+        """Prune expired items and add the rest to the Bloom filter."""
+        db = self.session_factory()
+        try:
+            cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+            db.query(SeenItem).filter(SeenItem.last_seen < cutoff).delete(synchronize_session=False)
+            db.commit()
+
+            loaded = 0
+            for fullname, item_hash in db.query(SeenItem.fullname, SeenItem.content_hash).yield_per(1000):
+                self._bloom.add(fullname)
+                self._bloom.add(f"{fullname}:{item_hash}")
+                loaded += 1
+            logger.info(f"Loaded {loaded} seen items into the Bloom filter")
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error loading seen items: {str(e)}")
+        finally:
+            db.close()
+
+    def status(self, fullname, item_hash):
+        """
+        Check whether an item was already analyzed.
+
+        Args:
+            fullname (str): Reddit fullname of the post or comment
+            item_hash (str): content_hash() of its text
+
+        Returns:
+            str: "seen" if analyzed with identical content, "edited" if analyzed
+                with different content, or "new"
+        """
+        with self._lock:
+            if fullname not in self._bloom:
+                self.bloom_rejections += 1
+                return "new"
+            self.database_lookups += 1
+
+        item = self._get(fullname)
+        if item is None:
+            return "new"
+        return "seen" if item["content_hash"] == item_hash else "edited"
+
+    def get_seen(self, fullname, item_hash):
+        """
+        Get the record of an item already analyzed with identical content.
+
+        Args:
+            fullname (str): Reddit fullname of the post or comment
+            item_hash (str): content_hash() of its text
+
+        Returns:
+            dict: Its "intent_category" and "message_sent", or None if it wasn't
+                analyzed or was edited since
+        """
+        with self._lock:
+            if f"{fullname}:{item_hash}" not in self._bloom:
+                self.bloom_rejections += 1
+                return None
+            self.database_lookups += 1
+
+        item = self._get(fullname)
+        if item is None or item["content_hash"] != item_hash:
+            return None
+        return {"intent_category": item["intent_category"], "message_sent": item["message_sent"]}
+
+    def is_seen(self, fullname, item_hash):
+        """Check whether an item was already analyzed with identical content."""
+        return self.get_seen(fullname, item_hash) is not None
+
+    def _get(self, fullname):
+        """Load an item's stored fields, or None if it isn't stored."""
+        db = self.session_factory()
+        try:
+            item = db.query(SeenItem).filter(SeenItem.fullname == fullname).first()
+            if item is None:
+                return None
+            return {
+                "content_hash": item.content_hash,
+                "intent_category": item.intent_category,
+                "message_sent": bool(item.message_sent)
+            }
+        except SQLAlchemyError as e:
+            logger.error(f"Error checking seen item {fullname}: {str(e)}")
+            return None
+        finally:
+            db.close()
+
+    def mark_many(self, items):
+        """
+        Record items as analyzed.
+
+        Args:
+            items (list): (fullname, content hash, intent category, message sent) tuples
+        """
+        if not items:
+            return
+
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            records = {fullname: (item_hash, category, sent) for fullname, item_hash, category, sent in items}
+            existing = {
+                item.fullname: item
+                for item in db.query(SeenItem).filter(SeenItem.fullname.in_(list(records)))
+            }
+            for fullname, (item_hash, category, sent) in records.items():
+                item = existing.get(fullname)
+                if item is None:
+                    db.add(SeenItem(fullname=fullname, content_hash=item_hash, intent_category=category,
+                                    message_sent=sent, first_seen=now, last_seen=now))
+                else:
+                    item.content_hash = item_hash
+                    item.intent_category = category
+                    item.message_sent = sent
+                    item.last_seen = now
+            db.commit()
+
+            with self._lock:
+                for fullname, (item_hash, _, _) in records.items():
+                    self._bloom.add(fullname)
+                    self._bloom.add(f"{fullname}:{item_hash}")
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error saving seen items: {str(e)}")
+        finally:
+            db.close()
+
+    def mark(self, fullname, item_hash, intent_category, message_sent=False):
+        """Record a single item as analyzed."""
+        self.mark_many([(fullname, item_hash, intent_category, message_sent)])
+
+    def stats(self):
+        """Get lookup counters for the store."""
+        with self._lock:
+            return {
+                "bloom_rejections": self.bloom_rejections,
+                "database_lookups": self.database_lookups
+            }
@@ -0,0 +1,490 @@
+import json
+import logging
+import re
+import threading
+import time
+import config
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Response schemas, in the OpenAPI subset Gemini accepts as response_schema
+INTENT_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "intent_category": {"type": "STRING", "enum": list(config.INTENT_CATEGORIES)},
+        "confidence": {"type": "NUMBER"},
+        "products_services": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "needs": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "timeframe": {"type": "STRING"},
+        "recommended_response": {"type": "STRING"}
+    },
+    "required": ["intent_category", "confidence"]
+}
+
+BATCH_INTENT_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {"id": {"type": "STRING"}, **INTENT_SCHEMA["properties"]},
+        "required": ["id"] + INTENT_SCHEMA["required"]
+    }
+}
+
+RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "subject": {"type": "STRING"},
+        "message": {"type": "STRING"}
+    },
+    "required": ["subject", "message"]
+}
+
+COMBINED_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {**INTENT_SCHEMA["properties"], "draft_response": RESPONSE_SCHEMA},
+    "required": INTENT_SCHEMA["required"]
+}
+
+_DECODER = json.JSONDecoder(strict=False)  # Models often put raw newlines inside strings
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_WORD = re.compile(r"[^\W\d_]+")  # Letters, including non-ASCII ones
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+_MAX_CUT_ATTEMPTS = 8
+
+class StructuredOutputError(ValueError):
+    """
+    Raised when model output holds no JSON value matching the expected schema.
+
+    Attributes:
+        text (str): The model output
+        problems (list): What was wrong with the best candidate
+        candidate (str): The complete but invalid JSON-like text that came
+            closest, or None if the output was prose or cut off
+    """
+
+    def __init__(self, message, text="", problems=None, candidate=None):
+        super().__init__(message)
+        self.text = text
+        self.problems = problems or []
+        self.candidate = candidate
+
+# ---- Parsing ---------------------------------------------------------------
+
+def _scan(text, start, quotes="\"'"):
+    """
+    Scan a JSON-like value starting at an opening bracket.
+
+    Strings are skipped, so brackets inside them don't count. Single quotes
+    only delimit strings when included in quotes, since in prose they are
+    more often apostrophes.
+
+    Returns:
+        tuple: (end index after the closing bracket, or None if the text ends
+            first; cut points for output that ends early, as (index, brackets
+            open there, quote of an unterminated string) at the end of the
+            text and at each comma, latest first)
+    """
+    stack = []
+    commas = []
+    quote = None
+    index = start
+    length = len(text)
+
+    while index < length:
+        char = text[index]
+        if quote:
+            if char == "\\":
+                index += 1
+            elif char == quote:
+                quote = None
+        elif char in quotes:
+            quote = char
+        elif char in _CLOSERS:
+            stack.append(char)
+        elif char in "}]":
+            if not stack or _CLOSERS[stack[-1]] != char:
+                return None, []
+            stack.pop()
+            if not stack:
+                return index + 1, []
+        elif char == ",":
+            commas.append((index, list(stack), None))
+        index += 1
+
+    return None, [(length, stack, quote)] + commas[::-1]
+
+def _repair(segment):
+    """
+    Fix the JSON slips models make most often.
+
+    Converts single-quoted strings to double-quoted ones, Python literals to
+    JSON ones and drops trailing commas.
+    """
+    pieces = []
+    quote = None
+    index = 0
+    length = len(segment)
+
+    while index < length:
+        char = segment[index]
+        if quote:
+            if char == "\\" and index + 1 < length:
+                following = segment[index + 1]
+                # \' is not a JSON escape
+                pieces.append("'" if following == "'" else char + following)
+                index += 2
+                continue
+            if char == quote:
+                quote = None
+                pieces.append('"')
+            elif char == '"':
+                pieces.append('\\"')
+            else:
+                pieces.append(char)
+        elif char in "\"'":
+            quote = char
+            pieces.append('"')
+        elif char.isalpha():
+            word = _WORD.match(segment, index).group()
+            pieces.append(_PYTHON_LITERALS.get(word, word))
+            index += len(word)
+            continue
+        else:
+            pieces.append(char)
+        index += 1
+
+    return _TRAILING_COMMA.sub(r"\1", "".join(pieces))
+
+def _close_truncated(text, start, cut_points):
+    """
+    Recover a value from output that was cut off.
+
+    Open strings and brackets are closed at the end of the text; if that
+    doesn't decode, the text is cut back to each earlier comma in turn,
+    dropping the partial element.
+    """
+    for end, stack, quote in cut_points[:_MAX_CUT_ATTEMPTS]:
+        segment = text[start:end] + (quote or "")
+        segment = re.sub(r"[\s,:]+$", "", segment)
+        value = _decode(segment + "".join(_CLOSERS[bracket] for bracket in reversed(stack)))
+        if value is not None:
+            return value
+    return None
+
+def _decode(segment):
+    """Decode a segment as is, then after repairs; None if neither works."""
+    for candidate in (segment, None):
+        if candidate is None:
+            candidate = _repair(segment)
+        try:
+            value, end = _DECODER.raw_decode(candidate)
+        except ValueError:
+            continue
+        if not candidate[end:].strip():
+            return value
+    return None
+
+def iter_json_values(text):
+    """
+    Yield the JSON objects and arrays found in model output, left to right.
+
+    Prose, code fences and trailing text around the values are skipped.
+    Values with common slips (single quotes, trailing commas, Python
+    literals) are repaired, and output that was cut off has its open
+    brackets closed. When a complete value can't be decoded even so,
+    scanning resumes inside it, so the intact objects of a broken array are
+    still found.
+
+    Args:
+        text (str): Model output
+
+    Yields:
+        tuple: (value, complete) where complete is False for values
+            recovered from cut-off output
+    """
+    text = text or ""
+    position = _next_bracket(text, 0)
+
+    while position >= 0:
+        # JSON quoting first; single-quoted strings only when that doesn't give a value
+        end, cut_points = _scan(text, position, '"')
+        value = _decode(text[position:end]) if end is not None else None
+        if value is None:
+            lenient_end, lenient_cut_points = _scan(text, position)
+            if lenient_end is not None:
+                end, value = lenient_end, _decode(text[position:lenient_end])
+            elif end is None and lenient_cut_points != cut_points:
+                # Only text that doesn't close with JSON quoting can be cut off output;
+                # try closing an open single-quoted string before the JSON cut points
+                cut_points = lenient_cut_points[:1] + cut_points
+        if value is not None:
+            yield value, True
+            position = _next_bracket(text, end)
+            continue
+        if end is None and cut_points:
+            value = _close_truncated(text, position, cut_points)
+            if value is not None:
+                yield value, False
+                return
+        position = _next_bracket(text, position + 1)
+
+def _next_bracket(text, start):
+    indices = [index for index in (text.find("{", start), text.find("[", start)) if index >= 0]
+    return min(indices) if indices else -1
+
+# ---- Validation ------------------------------------------------------------
+
+def validate(value, schema, path="$"):
+    """
+    Check a value against a response schema.
+
+    Supports the subset used here: type, properties, required, items and enum.
+
+    Args:
+        value: Decoded JSON value
+        schema (dict): Schema such as INTENT_SCHEMA
+        path (str): Location of the value, for messages
+
+    Returns:
+        list: Problems found; empty if the value matches
+    """
+    kind = schema.get("type", "").upper()
+    checks = {
+        "OBJECT": lambda v: isinstance(v, dict),
+        "ARRAY": lambda v: isinstance(v, list),
+        "STRING": lambda v: isinstance(v, str),
+        "NUMBER": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+        "INTEGER": lambda v: isinstance(v, int) and not isinstance(v, bool),
+        "BOOLEAN": lambda v: isinstance(v, bool)
+    }
+    if kind in checks and not checks[kind](value):
+        return [f"{path} should be of type {kind.lower()}"]
+
+    problems = []
+    if "enum" in schema and value not in schema["enum"]:
+        problems.append(f"{path} should be one of {', '.join(schema['enum'])}")
+    if kind == "OBJECT":
+        for key in schema.get("required", []):
+            if key not in value:
+                problems.append(f"{path}.{key} is missing")
+        for key, subschema in schema.get("properties", {}).items():
+            if key in value:
+                problems.extend(validate(value[key], subschema, f"{path}.{key}"))
+    elif kind == "ARRAY" and "items" in schema:
+        for index, item in enumerate(value):
+            problems.extend(validate(item, schema["items"], f"{path}[{index}]"))
+    return problems
+
+def parse_json(text, schema=None):
+    """
+    Get the first value in model output that matches a schema.
+
+    Args:
+        text (str): Model output
+        schema (dict, optional): Expected schema; without one the first value is returned
+
+    Returns:
+        The decoded value
+
+    Raises:
+        StructuredOutputError: If no value matches
+    """
+    problems, candidate = [], None
+
+    for value, complete in iter_json_values(text):
+        value_problems = validate(value, schema) if schema else []
+        if not value_problems:
+            return value
+        # Keep the first value of the expected shape; nested values are only fallbacks
+        if not problems and not validate(value, {"type": schema.get("type", "")}):
+            problems = value_problems
+            # Only complete values are worth asking the model to fix
+            candidate = json.dumps(value) if complete else None
+
+    if not problems:
+        candidate = _malformed_candidate(text)
+        problems = ["output is not valid JSON" if candidate else "no JSON value found"]
+    raise StructuredOutputError(f"Model output is not valid JSON for the schema: {'; '.join(problems)}",
+                                text, problems, candidate)
+
+def _malformed_candidate(text):
+    """The first complete bracketed span, for output that didn't decode."""
+    position = _next_bracket(text or "", 0)
+    while position >= 0:
+        end, _ = _scan(text, position)
+        if end is not None:
+            return text[position:end]
+        position = _next_bracket(text, position + 1)
+    return None
+
+# ---- Metrics ---------------------------------------------------------------
+
+class ParseMetrics:
+    """Counts parse outcomes per kind of model output (intent, response, ...)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, kind, outcome):
+        """
+        Count one outcome.
+
+        Args:
+            kind (str): Output kind, e.g. "intent"
+            outcome (str): "parsed", "parse_failed", "repaired", "repair_failed" or
+                "stopped_early" (a streamed answer settled before it was complete;
+                also counted as parsed)
+        """
+        with self._lock:
+            counts = self._counts.setdefault(kind, {"parsed": 0, "parse_failed": 0, "repaired": 0, "repair_failed": 0,
+                                                    "stopped_early": 0})
+            counts[outcome] += 1
+
+    def snapshot(self):
+        """Get a copy of the counts so far, to pass to stats(since=...) later."""
+        with self._lock:
+            return {kind: dict(counts) for kind, counts in self._counts.items()}
+
+    def stats(self, since=None):
+        """
+        Get counts and the first-attempt parse failure rate per kind.
+
+        Counts are process-wide, so concurrent cycles are included in each other's.
+
+        Args:
+            since (dict, optional): A snapshot(); only outcomes recorded after it are counted
+        """
+        since = since or {}
+        with self._lock:
+            stats = {}
+            for kind, totals in self._counts.items():
+                baseline = since.get(kind, {})
+                counts = {outcome: count - baseline.get(outcome, 0) for outcome, count in totals.items()}
+                attempts = counts["parsed"] + counts["parse_failed"]
+                stats[kind] = {
+                    **counts,
+                    "parse_failure_rate": round(counts["parse_failed"] / attempts, 3) if attempts else 0.0
+                }
+            return stats
+
+parse_metrics = ParseMetrics()
+
+# ---- Generation ------------------------------------------------------------
+
+def schema_instruction(schema):
+    """Prompt text asking for JSON that matches a schema."""
+    return ("Respond with only a JSON value (no code fences or commentary) matching this schema:\n"
+            f"{json.dumps(schema)}")
+
+def _repair_prompt(candidate, problems, schema):
+    return (
+        "The JSON below does not match the required schema.\n"
+        f"Problems: {'; '.join(problems)}\n\n"
+        f"JSON:\n{candidate}\n\n"
+        "Fix only these problems and keep every other value unchanged. "
+        f"{schema_instruction(schema)}"
+    )
+
+def _read_stream(backend, prompt, response_schema, stop):
+    """
+    Read a streamed answer until it ends or stop() settles it.
+
+    Returns:
+        tuple: (text read, value returned by stop or None)
+    """
+    text = ""
+    stream = backend.stream_content(prompt, response_schema=response_schema)
+    try:
+        for chunk in stream:
+            text += chunk
+            value = stop(text)
+            if value is not None:
+                return text, value
+    finally:
+        # Stops the generation if we didn't read to the end
+        stream.close()
+    return text, None
+
+def generate_json(executor, backend, prompt, schema, kind, repair_retries=None, stop=None, deadline=None):
+    """
+    Ask the model for JSON matching a schema and parse it.
+
+    In structured output mode the schema is sent with the request, so the
+    model is constrained to produce it. If the answer still doesn't parse, a
+    repair is attempted: complete but invalid JSON is sent back with the
+    problems found, which is much cheaper than the original prompt, while
+    prose or cut-off output gets the original prompt again with an explicit
+    JSON instruction.
+
+    Args:
+        executor (ModelExecutor): Executor to make the calls through
+        backend (ModelBackend): Model backend
+        prompt (str): The prompt
+        schema (dict): Expected schema
+        kind (str): Output kind for the parse metrics
+        repair_retries (int, optional): Repair attempts (defaults to config.STRUCTURED_OUTPUT_REPAIR_RETRIES)
+        stop (callable, optional): Streams the first answer and calls stop() with
+            the text so far after each chunk; once it returns a value, the rest of
+            the generation is abandoned and that value is the result
+        deadline (float, optional): Seconds for all calls together, repairs included
+            (defaults to the executor's per-call deadline for each call)
+
+    Returns:
+        tuple: (parsed value, raw text of the answer that parsed)
+
+    Raises:
+        StructuredOutputError: If the output still doesn't match after the repair attempts
+    """
+    if repair_retries is None:
+        repair_retries = config.STRUCTURED_OUTPUT_REPAIR_RETRIES
+    response_schema = schema if config.STRUCTURED_OUTPUT_ENABLED else None
+    deadline_at = None if deadline is None else time.monotonic() + deadline
+
+    def remaining():
+        return None if deadline_at is None else max(deadline_at - time.monotonic(), 0)
+
+    if stop is None:
+        response_text = executor.generate_content(backend, prompt, deadline=remaining(),
+                                                  response_schema=response_schema).text
+    else:
+        response_text, value = executor.call(_read_stream, backend, prompt, response_schema, stop,
+                                             deadline=remaining())
+        if value is not None:
+            parse_metrics.record(kind, "parsed")
+            parse_metrics.record(kind, "stopped_early")
+            return value, response_text
+
+    try:
+        value = parse_json(response_text, schema)
+        parse_metrics.record(kind, "parsed")
+        return value, response_text
+    except StructuredOutputError as e:
+        parse_metrics.record(kind, "parse_failed")
+        error = e
+
+    for attempt in range(repair_retries):
+        logger.warning(f"Unparseable {kind} output ({'; '.join(error.problems)}), repair attempt {attempt + 1}")
+        if error.candidate:
+            repair = _repair_prompt(error.candidate, error.problems, schema)
+        else:
+            repair = f"{prompt}\n\n{schema_instruction(schema)}"
+
+        response_text = executor.generate_content(backend, repair, deadline=remaining(),
+                                                  response_schema=response_schema).text
+        try:
+            value = parse_json(response_text, schema)
+            parse_metrics.record(kind, "repaired")
+            return value, response_text
+        except StructuredOutputError as e:
+            error = e
+
+    if repair_retries:
+        parse_metrics.record(kind, "repair_failed")
+    raise error
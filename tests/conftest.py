@@ -0,0 +1,25 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Stores created by tests write to a scratch database, never the development one
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+
+import config
+
+
+@pytest.fixture(autouse=True)
+def reddit_credentials(monkeypatch):
+    """Placeholder app credentials, so RedditScraper can build its (unused) PRAW client."""
+    monkeypatch.setattr(config, "REDDIT_CLIENT_ID", "client-id")
+    monkeypatch.setattr(config, "REDDIT_CLIENT_SECRET", "client-secret")
+
+
+@pytest.fixture(autouse=True)
+def local_model_backend(monkeypatch):
+    """Use the local model stand-in, so no test calls Gemini."""
+    monkeypatch.setattr(config, "MODEL_BACKEND", "local")
@@ -0,0 +1,48 @@
+import pytest
+
+from checkpoint_store import CycleCheckpointStore
+
+
+@pytest.fixture
+def store():
+    return CycleCheckpointStore()
+
+
+def make_post(post_id):
+    return {"id": post_id, "title": "CRM?", "content": "Looking for a CRM", "comments": []}
+
+
+def test_interrupted_cycle_resumes_with_its_progress(store):
+    progress = store.start({"limit": 5}, monitoring_session_id=101)
+    progress.save_posts([make_post("a"), make_post("b")], "scraped")
+    progress.save_posts([make_post("a")], "analyzed")
+    progress.save_response({"fullname": "t3_a", "message": "Hi"}, "sent")
+
+    resumed = store.resume_latest(101)
+
+    assert resumed.checkpoint_id == progress.checkpoint_id
+    assert resumed.parameters == {"limit": 5}
+    assert resumed.resumed and not resumed.failed
+    assert resumed.is_analyzed(make_post("a")) and not resumed.is_analyzed(make_post("b"))
+    assert resumed.was_sent({"fullname": "t3_a"})
+
+
+def test_failed_cycle_keeps_its_error_and_can_be_resumed(store):
+    progress = store.start({"limit": 5}, monitoring_session_id=102)
+    progress.save_posts([make_post("c")], "scraped")
+    progress.fail({"posts_scraped": 1, "error": "listing request failed"})
+
+    resumed = store.resume_latest(102)
+    unfinished = [cycle for cycle in store.unfinished() if cycle["id"] == progress.checkpoint_id]
+
+    assert resumed.failed
+    assert [post["id"] for post in resumed.stored_posts()] == ["c"]
+    assert unfinished[0]["status"] == "failed"
+    assert unfinished[0]["error"] == "listing request failed"
+
+
+def test_completed_cycle_is_not_resumed(store):
+    progress = store.start({"limit": 5}, monitoring_session_id=103)
+    progress.complete({"posts_scraped": 0, "error": None})
+
+    assert store.resume_latest(103) is None
@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+
+from cursor_store import SubredditCursorStore, listing_position
+from reddit_scraper import RedditScraper
+
+
+def _post(post_id, created_utc):
+    return SimpleNamespace(name=f"t3_{post_id}", created_utc=created_utc)
+
+
+def test_listing_position_orders_same_second_posts_by_id():
+    assert listing_position("t3_abc12", 100.0) < listing_position("t3_abc13", 100.0)
+    assert listing_position("t3_zzzzz", 99.0) < listing_position("t3_abc12", 100.0)
+
+
+def test_same_second_post_newer_than_mark_is_not_known():
+    scraper = RedditScraper()
+    cursor = {"last_fullname": "t3_abc12", "last_created_utc": 100.0}
+
+    assert scraper._is_known_post(_post("abc12", 100.0), cursor)
+    assert scraper._is_known_post(_post("abc11", 100.0), cursor)
+    assert scraper._is_known_post(_post("abc99", 99.0), cursor)
+    assert not scraper._is_known_post(_post("abc13", 100.0), cursor)
+    assert not scraper._is_known_post(_post("abc10", 101.0), cursor)
+
+
+def test_held_advances_apply_on_release():
+    store = SubredditCursorStore(monitoring_session_id=9001)
+    store.hold()
+    store.advance("Python", "t3_b", 200.0)
+    store.advance("python", "t3_a", 100.0)
+
+    assert store.get("python") is None
+
+    store.release()
+
+    assert store.get("python") == {"last_fullname": "t3_b", "last_created_utc": 200.0}
@@ -0,0 +1,94 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from intent_cache import IntentCache, cache_key, prompt_version
+from models import IntentCacheEntry
+from database import SessionLocal
+
+RESULT = {"intent_category": "HIGH", "confidence": 0.9, "raw_analysis": {"intent_category": "HIGH"}}
+VERSION = prompt_version("Classify: {text}")
+
+
+def _key(text):
+    return cache_key(text, VERSION, "test-model")
+
+
+def test_concurrent_lookups_for_one_key_compute_once():
+    cache = IntentCache()
+    key = _key("coalesce me")
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return dict(RESULT)
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(cache.get_or_compute(key, VERSION, "test-model", compute)))
+    first.start()
+    started.wait()
+    waiters = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute(key, VERSION, "test-model", compute)))
+        for _ in range(4)
+    ]
+    for thread in waiters:
+        thread.start()
+    for thread in [first] + waiters:
+        thread.join()
+
+    assert len(calls) == 1
+    assert [result["intent_category"] for result in results] == ["HIGH"] * 5
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_failed_results_are_not_cached():
+    cache = IntentCache()
+    key = _key("model failed")
+    failed = {"intent_category": "NONE", "confidence": 0.0, "raw_analysis": None}
+
+    cache.get_or_compute(key, VERSION, "test-model", lambda: failed)
+
+    assert cache.get(key) is None
+    assert cache.get_or_compute(key, VERSION, "test-model", lambda: dict(RESULT))["intent_category"] == "HIGH"
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = IntentCache(memory_size=2)
+    for text in ("one", "two"):
+        cache.put(_key(text), VERSION, "test-model", RESULT)
+    cache.get(_key("one"))
+    cache.put(_key("three"), VERSION, "test-model", RESULT)
+
+    assert list(cache._memory) == [_key("one"), _key("three")]
+    # The evicted entry is still served from the database
+    assert cache.get(_key("two")) is not None
+    assert cache.stats()["persistent_hits"] == 1
+
+
+def test_expired_entries_are_misses():
+    cache = IntentCache()
+    key = _key("stale")
+    cache.put(key, VERSION, "test-model", RESULT)
+
+    old = datetime.utcnow() - cache.ttl - timedelta(minutes=1)
+    cache._memory[key] = (VERSION, old, RESULT)
+    db = SessionLocal()
+    db.query(IntentCacheEntry).filter(IntentCacheEntry.cache_key == key).update({"created_at": old})
+    db.commit()
+    db.close()
+
+    assert cache.get(key) is None
+
+
+def test_invalidating_a_prompt_version_drops_its_entries():
+    cache = IntentCache()
+    retired = prompt_version("Old prompt: {text}")
+    cache.put(cache_key("text", retired, "test-model"), retired, "test-model", RESULT)
+    cache.put(_key("text"), VERSION, "test-model", RESULT)
+
+    assert cache.invalidate_prompt_version(retired) == 1
+    assert cache.get(cache_key("text", retired, "test-model")) is None
+    assert cache.get(_key("text")) is not None
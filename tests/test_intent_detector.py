@@ -0,0 +1,96 @@
+import pytest
+
+from intent_detector import IntentDetector
+from near_duplicates import NearDuplicateIndex
+
+PARTIAL_MEDIUM = '{"intent_category": "MEDIUM", "confidence": 0.8, "products_services": ["CRM"], "needs": ["pri'
+
+
+@pytest.fixture
+def detector():
+    detector = IntentDetector()
+    detector.stream_min_intent = "MEDIUM"  # Streaming enabled with the default minimum
+    return detector
+
+
+def test_streamed_answer_stops_below_the_cycles_min_intent(detector):
+    analysis = detector._settled_below_min_intent(PARTIAL_MEDIUM, "HIGH")
+
+    assert analysis["intent_category"] == "MEDIUM"
+    assert analysis["stopped_early"] is True
+
+
+def test_streamed_answer_at_the_cycles_min_intent_is_read_in_full(detector):
+    assert detector._settled_below_min_intent(PARTIAL_MEDIUM, "MEDIUM") is None
+    assert detector._stream_min_intent("LOW") == "LOW"
+    assert detector._stream_min_intent(None) == "MEDIUM"
+
+
+def test_answer_cut_short_is_only_reused_by_cycles_that_skip_its_category(detector):
+    result = {"intent_category": "MEDIUM", "raw_analysis": {"intent_category": "MEDIUM", "stopped_early": True}}
+
+    assert detector._is_complete_for(result, "HIGH")
+    assert not detector._is_complete_for(result, "MEDIUM")
+    assert detector._is_complete_for({"intent_category": "MEDIUM", "raw_analysis": {}}, "LOW")
+
+
+class DictCache:
+    """In-memory stand-in for IntentCache."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def get_or_compute(self, key, version, model_name, compute):
+        if key not in self.entries:
+            self.entries[key] = compute()
+        return dict(self.entries[key])
+
+
+def test_combined_analyses_are_cached_apart_from_plain_ones(detector, monkeypatch):
+    analysis = {"intent_category": "HIGH", "confidence": 0.9, "raw_analysis": {"intent_category": "HIGH"}}
+    draft = {"subject": "Hi", "message": "Hello"}
+    monkeypatch.setattr(detector, "_detect_intent_with_draft_uncached",
+                        lambda text, context: {**analysis, "draft_response": draft})
+    monkeypatch.setattr(detector, "_detect_intent_uncached", lambda text, context, **kwargs: dict(analysis))
+    detector.intent_cache = DictCache()
+
+    assert detector.detect_intent_with_draft("Need a CRM for 5 people")["draft_response"] == draft
+    assert "draft_response" not in detector.detect_intent("Need a CRM for 5 people")
+    assert detector.detect_intent_with_draft("Need a CRM for 5 people")["draft_response"] == draft
+
+
+def test_failed_combined_call_falls_back_without_caching_under_the_combined_key(detector, monkeypatch):
+    analysis = {"intent_category": "HIGH", "confidence": 0.9, "raw_analysis": {"intent_category": "HIGH"}}
+    calls = []
+
+    def combined(text, context):
+        calls.append(text)
+        if len(calls) == 1:
+            raise RuntimeError("model unavailable")
+        return {**analysis, "draft_response": {"subject": "Hi", "message": "Hello"}}
+
+    monkeypatch.setattr(detector, "_detect_intent_with_draft_uncached", combined)
+    monkeypatch.setattr(detector, "_detect_intent_uncached", lambda text, context, **kwargs: dict(analysis))
+    detector.intent_cache = DictCache()
+
+    assert "draft_response" not in detector.detect_intent_with_draft("Need a CRM for 5 people")
+    assert "draft_response" in detector.detect_intent_with_draft("Need a CRM for 5 people")
+
+
+def test_likely_high_check_uses_the_cycles_keywords(detector):
+    item = {"text": "Our team wants a ticketing tool and a helpdesk plugin"}
+
+    assert not detector._is_likely_high(item, min_keywords=2)
+    assert detector._is_likely_high(item, min_keywords=2, keywords=["ticketing tool", "helpdesk"])
+
+
+def test_edited_item_is_not_matched_against_its_own_earlier_text(detector):
+    detector.near_duplicates = NearDuplicateIndex(threshold=0.5, min_tokens=5)
+    text = "Looking for a CRM that handles email sequences and pipeline tracking for a sales team of five people"
+    detector.near_duplicates.add("t3_abc", text, payload={"fullname": "t3_abc", "link": "", "analysis": {}})
+    item = {"fullname": "t3_abc", "link": "", "text": text + " edit: budget is 50 per seat", "target": {}}
+
+    remaining, duplicates = detector._split_near_duplicates([item])
+
+    assert remaining == [item] and duplicates == []
+    assert "intent_analysis" not in item["target"]
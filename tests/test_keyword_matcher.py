@@ -0,0 +1,43 @@
+from keyword_matcher import KeywordMatcher, get_matcher
+
+
+def test_finds_overlapping_keywords_in_one_pass():
+    matcher = KeywordMatcher(["he", "she", "his", "hers"])
+
+    assert matcher.find_all("ushers") == [
+        {"keyword": "she", "start": 1, "end": 4},
+        {"keyword": "he", "start": 2, "end": 4},
+        {"keyword": "hers", "start": 2, "end": 6},
+    ]
+
+
+def test_matching_is_case_insensitive_and_supports_phrases():
+    matcher = KeywordMatcher(["Looking for", "recommend", "  "])
+
+    assert matcher.keywords == ["looking for", "recommend"]
+    assert matcher.matched_keywords("LOOKING FOR a tool, can you Recommend one? I'm looking for it") == [
+        "looking for", "recommend"]
+
+
+def test_whole_words_skips_matches_inside_words():
+    loose = KeywordMatcher(["app", "vs"])
+    strict = KeywordMatcher(["app", "vs"], whole_words=True)
+    text = "Happy with Notion vs Asana, or is there a better app?"
+
+    assert loose.matched_keywords(text) == ["app", "vs"]
+    assert strict.matched_keywords(text) == ["vs", "app"]
+    assert strict.search("vs_code") is False
+
+
+def test_empty_inputs():
+    assert KeywordMatcher([]).search("anything") is False
+    assert KeywordMatcher(["buy"]).find_all("") == []
+    assert KeywordMatcher(["buy"]).matched_keywords(None) == []
+
+
+def test_get_matcher_reuses_the_compiled_automaton():
+    first = get_matcher(["Buy", "recommend"], whole_words=False)
+
+    assert get_matcher(["recommend", "buy "], whole_words=False) is first
+    assert get_matcher(["recommend", "buy"], whole_words=True) is not first
+    assert get_matcher(first) is first
@@ -0,0 +1,144 @@
+import time
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from model_executor import AdaptiveConcurrencyLimit, ModelExecutor
+
+
+def test_successful_calls_raise_the_limit_additively():
+    limit = AdaptiveConcurrencyLimit(initial=2, minimum=1, maximum=10, latency_target=5)
+
+    for _ in range(2):
+        assert limit.acquire(timeout=0)
+        limit.release(0.1, "ok")
+
+    # +1/2, then +1/2.5
+    assert limit.limit == pytest.approx(2.9)
+    assert limit.in_flight == 0
+
+
+def test_rate_limit_halves_the_limit_once_per_interval():
+    limit = AdaptiveConcurrencyLimit(initial=8, minimum=1, maximum=10, latency_target=60)
+
+    for _ in range(3):
+        limit.acquire(timeout=0)
+    for _ in range(3):
+        limit.release(0.1, "rate_limited")
+
+    # A burst of 429s from calls already in flight only counts once
+    assert limit.limit == 4
+
+
+def test_slow_calls_shrink_the_limit_but_not_below_the_minimum():
+    limit = AdaptiveConcurrencyLimit(initial=2, minimum=2, maximum=10, latency_target=0)
+
+    limit.acquire(timeout=0)
+    limit.release(1.0, "ok")
+    assert limit.limit == 2
+
+    limit.limit = 5.0
+    limit.acquire(timeout=0)
+    limit.release(1.0, "ok")
+    assert limit.limit == pytest.approx(4.5)
+
+
+def test_limit_is_capped_at_the_maximum():
+    limit = AdaptiveConcurrencyLimit(initial=3, minimum=1, maximum=3, latency_target=5)
+
+    limit.acquire(timeout=0)
+    limit.release(0.1, "ok")
+
+    assert limit.limit == 3
+
+
+def test_acquire_waits_for_a_free_slot():
+    limit = AdaptiveConcurrencyLimit(initial=1, minimum=1, maximum=4, latency_target=5)
+
+    assert limit.acquire(timeout=0)
+    assert not limit.acquire(timeout=0.05)
+    limit.release(0.1, "error")
+    assert limit.acquire(timeout=0)
+
+
+def _executor(**kwargs):
+    limit = AdaptiveConcurrencyLimit(initial=2, minimum=1, maximum=4, latency_target=60)
+    options = dict(max_retries=3, backoff_base=0.001, backoff_max=0.01, deadline_seconds=5, limit=limit)
+    options.update(kwargs)
+    return ModelExecutor(**options)
+
+
+def _settle(executor):
+    """Wait for the done callbacks of finished calls to release their slots."""
+    deadline = time.monotonic() + 1
+    while executor.limit.in_flight and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_rate_limited_calls_are_retried():
+    executor = _executor()
+    attempts = []
+
+    def call():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise google_exceptions.ResourceExhausted("quota")
+        return "ok"
+
+    assert executor.call(call) == "ok"
+    _settle(executor)
+    stats = executor.stats()
+    assert len(attempts) == 3
+    assert stats["retries"] == 2
+    assert stats["rate_limited"] == 2
+    assert stats["calls"] == 3
+
+
+def test_exhausted_retries_raise_and_lower_the_limit():
+    executor = _executor(max_retries=2)
+    attempts = []
+
+    def call():
+        attempts.append(1)
+        raise google_exceptions.TooManyRequests("slow down")
+
+    with pytest.raises(google_exceptions.TooManyRequests):
+        executor.call(call)
+    _settle(executor)
+
+    assert len(attempts) == 3
+    assert executor.stats()["concurrency_limit"] == 1
+
+
+def test_non_retryable_errors_are_raised_at_once():
+    executor = _executor()
+    attempts = []
+
+    def call():
+        attempts.append(1)
+        raise ValueError("bad prompt")
+
+    with pytest.raises(ValueError):
+        executor.call(call)
+    assert len(attempts) == 1
+
+
+def test_call_past_its_deadline_is_abandoned():
+    executor = _executor()
+
+    started = time.monotonic()
+    with pytest.raises(google_exceptions.DeadlineExceeded):
+        executor.call(time.sleep, 0.5, deadline=0.05)
+
+    assert time.monotonic() - started < 0.4
+    assert executor.stats()["deadline_exceeded"] == 1
+    # The abandoned call keeps its slot until it actually finishes
+    assert executor.limit.in_flight == 1
+    _settle(executor)
+    assert executor.limit.in_flight == 0
+
+
+def test_map_keeps_the_input_order():
+    executor = _executor()
+
+    assert executor.map(lambda item: executor.call(lambda: item * 2), range(6)) == [0, 2, 4, 6, 8, 10]
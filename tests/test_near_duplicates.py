@@ -0,0 +1,72 @@
+from near_duplicates import NearDuplicateIndex, minhash
+
+POST = ("Looking for a CRM that works for a small sales team of five people, "
+        "ideally with email tracking and a decent mobile app. Budget is around fifty dollars a month.")
+REWORDED = ("Looking for a CRM that works for a small sales team of five people, "
+            "ideally with email tracking and a good mobile app. Budget is around fifty dollars a month.")
+UNRELATED = ("Just got back from a hiking trip in the mountains and the views were incredible, "
+             "would definitely recommend the northern trail to anyone who likes long walks.")
+
+
+def _index(**kwargs):
+    options = dict(threshold=0.5, min_tokens=5, max_entries=100)
+    options.update(kwargs)
+    return NearDuplicateIndex(**options)
+
+
+def test_reworded_copy_is_found():
+    index = _index()
+    index.add("t3_first", POST, payload="first")
+
+    key, payload, similarity = index.find(REWORDED)
+
+    assert (key, payload) == ("t3_first", "first")
+    assert 0.5 <= similarity < 1.0
+    assert index.find(UNRELATED) is None
+    assert index.stats() == {"entries": 1, "lookups": 2, "matches": 1}
+
+
+def test_identical_text_matches_exactly():
+    index = _index()
+    index.add("t3_first", POST)
+
+    assert index.find(POST)[2] == 1.0
+
+
+def test_excluded_key_is_not_matched():
+    index = _index()
+    index.add("t3_first", POST)
+
+    assert index.find(REWORDED, exclude="t3_first") is None
+
+
+def test_short_texts_are_neither_indexed_nor_matched():
+    index = _index(min_tokens=10)
+    index.add("t1_short", "thanks, will try it")
+
+    assert index.stats()["entries"] == 0
+    assert index.find("thanks, will try it") is None
+    assert minhash("")[0] is None
+
+
+def test_readding_a_key_replaces_its_entry():
+    index = _index()
+    index.add("t3_first", POST)
+    index.add("t3_first", UNRELATED)
+
+    assert index.find(POST) is None
+    assert index.find(UNRELATED)[0] == "t3_first"
+    assert index.stats()["entries"] == 1
+
+
+def test_least_recently_used_entries_are_dropped():
+    index = _index(max_entries=2)
+    index.add("t3_a", POST)
+    index.add("t3_b", UNRELATED)
+    # Matching t3_a makes it the most recently used entry, so t3_b goes first
+    index.find(REWORDED)
+    index.add("t3_c", "a completely different thread about gardening tools and soil")
+
+    assert index.find(POST)[0] == "t3_a"
+    assert index.find(UNRELATED) is None
+    assert index._buckets and all("t3_b" not in keys for keys in index._buckets.values())
@@ -0,0 +1,39 @@
+import threading
+
+from pipeline import Pipeline, Stage
+
+
+def test_generator_outputs_reach_the_next_stage_as_they_are_yielded():
+    first_received = threading.Event()
+    received = []
+
+    def produce(count):
+        yield 1
+        # Only continues once the next stage has the first item
+        assert first_received.wait(timeout=5)
+        yield from range(2, count + 1)
+
+    def consume(item):
+        received.append(item)
+        first_received.set()
+
+    stats = Pipeline([Stage("produce", produce), Stage("consume", consume)]).run([3])
+
+    assert received == [1, 2, 3]
+    assert stats["produce"]["items_out"] == 3
+    assert stats["produce"]["errors"] == 0
+
+
+def test_outputs_before_a_failure_are_passed_on_and_counted():
+    received = []
+
+    def produce(item):
+        yield item
+        raise RuntimeError("listing request failed")
+
+    stats = Pipeline([Stage("produce", produce), Stage("consume", received.append)]).run(["a", "b"])
+
+    assert sorted(received) == ["a", "b"]
+    assert stats["produce"]["items_in"] == 2
+    assert stats["produce"]["items_out"] == 2
+    assert stats["produce"]["errors"] == 2
@@ -0,0 +1,77 @@
+import json
+
+import numpy as np
+
+from preclassifier import PreClassifier, featurize, load_labeled_items, load_preclassifier, recall_cost_report
+
+INTENT = [
+    "looking for a crm recommendation for my sales team",
+    "can anyone recommend a good invoicing tool to buy",
+    "what is the best project management software to purchase",
+    "we need a new helpdesk tool any recommendations",
+]
+NO_INTENT = [
+    "here is a photo of my cat sleeping",
+    "just finished my first marathon today",
+    "the weather has been lovely this week",
+    "sharing my favourite pasta recipe with everyone",
+]
+
+
+def test_featurize_normalizes_each_row():
+    rows, cols, values = featurize(["buy a crm", "", "crm crm"], 1024)
+
+    assert set(rows) == {0, 2}
+    for row in (0, 2):
+        assert np.isclose(np.sum(values[rows == row] ** 2), 1.0)
+    assert (cols < 1024).all()
+
+
+def test_trained_model_separates_intent_from_chatter():
+    model = PreClassifier.train(INTENT + NO_INTENT, [1] * 4 + [0] * 4, n_features=2 ** 12, epochs=200)
+
+    scores = model.score(["any recommendation for a crm to buy", "my cat had a lovely sleep"])
+
+    assert scores[0] > 0.5 > scores[1]
+    assert model.metadata == {"training_items": 8, "training_positives": 4}
+    assert len(model.score([])) == 0
+
+
+def test_saved_model_scores_the_same_after_loading(tmp_path):
+    model = PreClassifier.train(INTENT + NO_INTENT, [1] * 4 + [0] * 4, n_features=2 ** 10, epochs=50)
+    path = str(tmp_path / "models" / "preclassifier.npz")
+    model.save(path)
+
+    loaded = load_preclassifier(path)
+
+    assert np.allclose(loaded.score(INTENT), model.score(INTENT))
+    assert loaded.metadata == model.metadata
+    assert load_preclassifier(str(tmp_path / "missing.npz")) is None
+
+
+def test_labeled_items_skip_unanalyzed_and_duplicate_texts(tmp_path):
+    posts = [{
+        "title": "CRM?", "content": "Need one",
+        "intent_analysis": {"intent_category": "HIGH", "raw_analysis": {}},
+        "comments": [
+            {"content": "Try HubSpot", "intent_analysis": {"intent_category": "NONE", "raw_analysis": {"a": 1}}},
+            {"content": "Try HubSpot", "intent_analysis": {"intent_category": "LOW", "raw_analysis": {"a": 1}}},
+            {"content": "Pre-filtered", "intent_analysis": {"intent_category": "NONE", "raw_analysis": None}},
+        ]
+    }]
+    (tmp_path / "analyzed_data_1.json").write_text(json.dumps(posts))
+
+    texts, labels = load_labeled_items(str(tmp_path / "analyzed_data_*.json"))
+
+    # The post's analysis has an empty raw_analysis, so only the first HubSpot comment counts
+    assert texts == ["Try HubSpot"]
+    assert labels == [0]
+
+
+def test_recall_cost_report():
+    report = recall_cost_report(np.array([0.9, 0.6, 0.2, 0.1]), [1, 1, 0, 1], thresholds=(0.05, 0.5))
+
+    assert report == [
+        {"threshold": 0.05, "recall": 1.0, "llm_call_share": 1.0},
+        {"threshold": 0.5, "recall": 0.667, "llm_call_share": 0.5},
+    ]
@@ -0,0 +1,19 @@
+from prompt_builder import GAP_MARKER, estimate_tokens, fit_to_budget
+
+
+def test_text_within_budget_is_unchanged():
+    assert fit_to_budget("Need a CRM. Any ideas?", budget=50, keywords=["crm"]) == "Need a CRM. Any ideas?"
+    assert fit_to_budget("Need a CRM. " * 100, budget=0, keywords=["crm"]) == "Need a CRM. " * 100
+
+
+def test_long_preamble_is_cut_to_its_share_and_other_questions_are_kept():
+    preamble = "We looked at a CRM for our team " + "and talked about it for weeks " * 20 + "."
+    filler = " ".join(f"Filler sentence number {number}." for number in range(20))
+    text = f"{preamble} {filler} Which CRM would you recommend for five people?"
+
+    trimmed = fit_to_budget(text, budget=60, keywords=["crm"], window=0)
+
+    assert trimmed.startswith("We looked at a CRM")
+    assert trimmed.endswith("Which CRM would you recommend for five people?")
+    assert trimmed.count(GAP_MARKER) == 2
+    assert estimate_tokens(trimmed) <= 60 + 10  # Allowing for gap markers
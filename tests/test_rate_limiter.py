@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+
+from rate_limiter import get_limiter
+from reddit_scraper import RedditScraper
+
+
+def _account(account_id):
+    return SimpleNamespace(id=account_id, access_token=None, refresh_token=None,
+                           token_expires_at=None)
+
+
+def test_accounts_get_separate_buckets():
+    first = RedditScraper.for_account(_account(101))
+    second = RedditScraper.for_account(_account(102))
+
+    assert first.rate_limiter is not second.rate_limiter
+    assert first.rate_limiter is get_limiter("reddit_account:101")
+    assert second.rate_limiter is get_limiter("reddit_account:102")
+
+
+def test_same_account_shares_bucket():
+    assert RedditScraper.for_account(_account(103)).rate_limiter is RedditScraper.for_account(_account(103)).rate_limiter
+
+
+def test_scraper_without_account_uses_app_bucket():
+    assert RedditScraper().rate_limiter is get_limiter("app")
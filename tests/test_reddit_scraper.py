@@ -0,0 +1,98 @@
+import threading
+from types import SimpleNamespace
+
+from reddit_scraper import RedditScraper
+
+
+def _post(subreddit, post_id, created_utc, comments=()):
+    return SimpleNamespace(id=post_id, name=f"t3_{post_id}", created_utc=created_utc,
+                           subreddit=SimpleNamespace(display_name=subreddit),
+                           title="Looking for a CRM", selftext="Any recommendations?", author="op", url="",
+                           comments=FakeComments(comments))
+
+
+def _comment(comment_id, body):
+    return SimpleNamespace(id=comment_id, body=body, author="commenter", created_utc=0, replies=[])
+
+
+class FakeComments(list):
+    def replace_more(self, limit=None):
+        return []
+
+
+class FakeSeenStore:
+    def __init__(self, seen_fullnames):
+        self.seen_fullnames = seen_fullnames
+
+    def status(self, fullname, item_hash):
+        return "seen" if fullname in self.seen_fullnames else "new"
+
+
+class FakeReddit:
+    """Serves /new listings from a list of posts, newest first."""
+
+    def __init__(self, posts):
+        self.posts = posts
+        self.requests = []
+
+    def subreddit(self, name):
+        names = {part.lower() for part in name.split("+")}
+
+        def new(limit):
+            self.requests.append((name, limit))
+            return [post for post in self.posts if post.subreddit.display_name.lower() in names][:limit]
+
+        return SimpleNamespace(new=new)
+
+
+def test_combined_listing_falls_back_for_crowded_out_subreddits():
+    posts = [_post("busy", f"b{i}", 1000 - i) for i in range(6)] + [_post("quiet", "q1", 900)]
+    scraper = RedditScraper()
+    scraper.reddit = FakeReddit(posts)
+
+    posts_by_subreddit = scraper._fetch_new_posts_combined(["busy", "quiet"], limit=2)
+
+    assert [post.name for post in posts_by_subreddit["busy"]] == ["t3_b0", "t3_b1"]
+    assert [post.name for post in posts_by_subreddit["quiet"]] == ["t3_q1"]
+    assert scraper.reddit.requests == [("busy+quiet", 4), ("quiet", 2)]
+
+
+def test_combined_listing_skips_fallback_when_every_subreddit_is_done():
+    posts = [_post("a", "a1", 1000), _post("b", "b1", 999), _post("a", "a2", 998), _post("b", "b2", 997)]
+    scraper = RedditScraper()
+    scraper.reddit = FakeReddit(posts)
+
+    posts_by_subreddit = scraper._fetch_new_posts_combined(["a", "b"], limit=2)
+
+    assert [post.name for post in posts_by_subreddit["a"]] == ["t3_a1", "t3_a2"]
+    assert [post.name for post in posts_by_subreddit["b"]] == ["t3_b1", "t3_b2"]
+    assert scraper.reddit.requests == [("a+b", 4)]
+
+
+def test_seen_post_is_kept_so_its_new_comments_are_fetched():
+    post = _post("crm", "p1", 1000, comments=[_comment("c1", "Old comment"), _comment("c2", "New comment")])
+    scraper = RedditScraper()
+    scraper.reddit = FakeReddit([post])
+    scraper.seen_store = FakeSeenStore({"t3_p1"})
+
+    scraped = scraper.scrape_subreddit("crm", keywords=["crm"], limit=5)
+
+    assert len(scraped) == 1
+    assert scraped[0]["seen"] is True
+    assert [comment["id"] for comment in scraped[0]["comments"]] == ["c1", "c2"]
+
+
+def test_each_thread_gets_its_own_reddit_client(monkeypatch):
+    scraper = RedditScraper()
+    main_client = FakeReddit([])
+    scraper.reddit = main_client
+    monkeypatch.setattr(scraper, "_create_client", lambda: FakeReddit([]))
+    worker_clients = []
+
+    worker = threading.Thread(target=lambda: worker_clients.extend([scraper.reddit, scraper.reddit]))
+    worker.start()
+    worker.join()
+
+    assert scraper.reddit is main_client
+    assert worker_clients[0] is worker_clients[1]
+    assert worker_clients[0] is not main_client
@@ -0,0 +1,69 @@
+import pytest
+
+from response_generator import ResponseGenerator
+
+
+@pytest.fixture
+def generator():
+    generator = ResponseGenerator()
+    generator.reuse_duplicate_responses = True
+    return generator
+
+
+def _remember(generator, fullname, author, message):
+    generator._responses_by_fullname[fullname] = {"author": author, "subject": "Hi", "message": message}
+
+
+def test_reused_response_only_readdresses_the_greeting(generator):
+    _remember(generator, "t3_a", "al", "Hi al,\nI saw you're looking at local almanac tools.")
+
+    reused = generator._reuse_duplicate_response({"fullname": "t3_a"}, "bob")
+
+    assert reused["message"] == "Hi bob,\nI saw you're looking at local almanac tools."
+    assert reused["author"] == "bob"
+
+
+def test_reused_response_keeps_names_with_punctuation(generator):
+    _remember(generator, "t3_a", "a-b", "Hey u/a-b! Thanks for the question.")
+
+    assert generator._reuse_duplicate_response({"fullname": "t3_a"}, "c_d")["message"] == \
+        "Hey u/c_d! Thanks for the question."
+
+
+def test_response_mentioning_the_author_past_the_greeting_is_not_reused(generator):
+    _remember(generator, "t3_a", "sam", "Hi sam,\nAs sam mentioned, pricing matters.")
+
+    assert generator._reuse_duplicate_response({"fullname": "t3_a"}, "bob") is None
+
+
+def test_speculative_draft_discarded_without_resources_is_not_counted_as_used(generator):
+    item = {"id": "abc", "type": "post", "title": "Need a CRM", "content": "Any picks?", "author": "sam",
+            "intent_analysis": {"intent_category": "HIGH", "confidence": 0.9}}
+    generator.speculate(item)
+
+    generator.generate_response(item, include_resources=False)
+
+    stats = generator.speculation_stats()
+    assert stats["used"] == 0
+    assert stats["cancelled"] + stats["wasted"] == 1
+    assert stats["pending"] == 0
+
+
+def test_failed_response_does_not_stop_the_rest(generator, monkeypatch):
+    monkeypatch.setattr("config.RESPONSE_GENERATION_WORKERS", 1)
+    items = [{"id": post_id, "type": "post", "title": "Need a CRM", "content": "Any picks?", "author": post_id,
+              "comments": [], "intent_analysis": {"intent_category": "HIGH", "confidence": 0.9}}
+             for post_id in ("bad", "good")]
+    generate = generator._generate_response
+
+    def flaky(content_data, *args, **kwargs):
+        if content_data["id"] == "bad":
+            raise RuntimeError("model unavailable")
+        return generate(content_data, *args, **kwargs)
+
+    monkeypatch.setattr(generator, "_generate_response", flaky)
+
+    responses = list(generator.iter_generate_responses(items, min_intent="MEDIUM"))
+
+    assert [bool(response.get("error")) for response in responses] == [True, False]
+    assert responses[0]["message"] == ""
@@ -0,0 +1,49 @@
+import pytest
+
+from intent_detector import IntentDetector
+from seen_store import SeenItemStore, content_hash
+
+ANALYSIS = {"intent_category": "MEDIUM", "confidence": 0.8, "raw_analysis": {"intent_category": "MEDIUM"}}
+
+
+@pytest.fixture
+def store():
+    return SeenItemStore()
+
+
+def make_post(post_id, content="Looking for a CRM for a team of five"):
+    return {"id": post_id, "title": "CRM?", "content": content, "subreddit": "sales", "author": "op", "comments": []}
+
+
+def test_edited_item_is_requeued(store):
+    store.mark("t3_edit", content_hash("original text"), "LOW")
+
+    assert store.status("t3_edit", content_hash("original text")) == "seen"
+    assert store.status("t3_edit", content_hash("edited text")) == "edited"
+    assert store.get_seen("t3_edit", content_hash("edited text")) is None
+    assert store.status("t3_other", content_hash("original text")) == "new"
+
+
+def test_analysis_alone_does_not_mark_items_seen(store, monkeypatch):
+    detector = IntentDetector()
+    detector.seen_store = store
+    monkeypatch.setattr(detector, "detect_intent", lambda text, context=None, min_intent=None: dict(ANALYSIS))
+    post = make_post("crash")
+
+    detector.analyze_post(post, include_comments=False, min_intent="MEDIUM")
+
+    assert store.get_seen("t3_crash", content_hash("CRM?\nLooking for a CRM for a team of five")) is None
+    assert detector.seen_items(post) == [("t3_crash", content_hash("CRM?\nLooking for a CRM for a team of five"),
+                                          "MEDIUM")]
+
+
+def test_unanswered_lead_is_analyzed_again_by_a_cycle_that_would_respond(store):
+    detector = IntentDetector()
+    detector.seen_store = store
+    item_hash = content_hash("some text")
+    store.mark("t3_lead", item_hash, "MEDIUM")
+    store.mark("t3_sent", item_hash, "MEDIUM", message_sent=True)
+
+    assert detector._previous_intent("t3_lead", item_hash, "HIGH") == "MEDIUM"
+    assert detector._previous_intent("t3_lead", item_hash, "LOW") is None
+    assert detector._previous_intent("t3_sent", item_hash, "LOW") == "MEDIUM"
@@ -0,0 +1,48 @@
+from structured_output import INTENT_SCHEMA, ParseMetrics, iter_json_values, parse_json
+
+
+def test_non_ascii_prose_before_the_payload():
+    text = '[résumé] Voilà: {"intent_category": "HIGH", "confidence": 0.9}'
+
+    assert parse_json(text, INTENT_SCHEMA) == {"intent_category": "HIGH", "confidence": 0.9}
+
+
+def test_apostrophe_in_bracketed_prose_before_the_payload():
+    text = '(see [the user\'s post]) {"intent_category": "HIGH", "confidence": 0.9}'
+
+    assert parse_json(text, INTENT_SCHEMA) == {"intent_category": "HIGH", "confidence": 0.9}
+
+
+def test_single_quoted_value_with_brackets_in_strings():
+    text = "{'intent_category': 'HIGH', 'confidence': 0.9, 'needs': ['a]b'],}"
+
+    assert list(iter_json_values(text)) == [
+        ({"intent_category": "HIGH", "confidence": 0.9, "needs": ["a]b"]}, True)
+    ]
+
+
+def test_truncated_output_is_closed():
+    text = '{"intent_category": "HIGH", "confidence": 0.9, "recommended_response": "it\'s gre'
+
+    assert list(iter_json_values(text)) == [
+        ({"intent_category": "HIGH", "confidence": 0.9, "recommended_response": "it's gre"}, False)
+    ]
+
+
+def test_truncated_single_quoted_output_is_closed():
+    assert list(iter_json_values("{'intent_category': 'HIGH', 'needs': ['it")) == [
+        ({"intent_category": "HIGH", "needs": ["it"]}, False)
+    ]
+
+
+
+def test_parse_metrics_since_snapshot():
+    metrics = ParseMetrics()
+    metrics.record("intent", "parsed")
+    metrics.record("intent", "parse_failed")
+    baseline = metrics.snapshot()
+    metrics.record("intent", "parsed")
+
+    assert metrics.stats(since=baseline)["intent"]["parsed"] == 1
+    assert metrics.stats(since=baseline)["intent"]["parse_failure_rate"] == 0.0
+    assert metrics.stats()["intent"]["parsed"] == 2